@@ -0,0 +1,166 @@
+# AI/backtest.py
+"""
+XGBoost 신호 + open_position의 ROI 기반 TP/SL + IDLE(900초) 청산을 재현하는 벡터화 백테스트.
+
+- 저장된 분봉 전체에 대해 피처 계산 → predict_proba 배치 추론 → decide_action과 같은 신뢰도 규칙
+- 진입: 신호 봉의 종가, TP/SL: entry * (1 ± roi/leverage) (open_position과 동일)
+- 청산: 이후 idle_bars 안에서 high/low가 TP/SL을 먼저 건드린 쪽, 같은 봉에서 둘 다면 SL(보수적),
+        끝까지 없으면 idle_bars 번째 봉 종가에 IDLE 청산
+- main 루프의 대기 시간(HOLD 후 180초, 거래 후 300초)을 봉 단위 쿨다운으로 반영
+"""
+import argparse
+import numpy as np
+import pandas as pd
+from joblib import load
+from numpy.lib.stride_tricks import sliding_window_view
+from AI.utils import load_config, FEATURES, active_model_path
+from AI.features_np import compute_features_np
+from AI.inference import FastPredictor
+from AI.kline_store import open_kline_store
+
+SELL, HOLD, BUY = 0, 1, 2
+
+def signals_from_proba(proba: np.ndarray, min_conf: float) -> np.ndarray:
+    """decide_action의 규칙: 최대 확률이면서 min_conf 이상인 BUY/SELL, 나머지 HOLD (+1/-1/0)"""
+    top = proba.max(axis=1)
+    buy = (proba[:, BUY] >= top) & (proba[:, BUY] >= min_conf)
+    sell = ~buy & (proba[:, SELL] >= top) & (proba[:, SELL] >= min_conf)
+    return buy.astype(np.int8) - sell.astype(np.int8)
+
+def first_hit(window: np.ndarray, level: np.ndarray, above: bool, horizon: int) -> np.ndarray:
+    """각 행에서 window가 level을 처음 건드린 위치(0..horizon-1), 없으면 horizon"""
+    hit = window >= level[:, None] if above else window <= level[:, None]
+    idx = hit.argmax(axis=1)
+    return np.where(hit.any(axis=1), idx, horizon)
+
+def simulate_exits(high, low, close, entry_idx, side, leverage, gain_pct, loss_pct, idle_bars):
+    """
+    진입 후보별 청산 결과를 한 번에 계산.
+    반환: (exit_offset[1..idle_bars], exit_price, reason[0=TP,1=SL,2=IDLE])
+    """
+    n = len(close)
+    entry = close[entry_idx]
+    long_ = side > 0
+    tp = np.where(long_, entry * (1 + gain_pct / leverage), entry * (1 - gain_pct / leverage))
+    sl = np.where(long_, entry * (1 - loss_pct / leverage), entry * (1 + loss_pct / leverage))
+
+    # 진입 봉 다음부터 idle_bars개의 high/low (끝부분은 마지막 값으로 패딩)
+    pad_h = np.concatenate([high, np.full(idle_bars, high[-1])])
+    pad_l = np.concatenate([low, np.full(idle_bars, low[-1])])
+    win_h = sliding_window_view(pad_h[1:], idle_bars)[entry_idx]
+    win_l = sliding_window_view(pad_l[1:], idle_bars)[entry_idx]
+
+    tp_at = np.where(long_, first_hit(win_h, tp, True, idle_bars), first_hit(win_l, tp, False, idle_bars))
+    sl_at = np.where(long_, first_hit(win_l, sl, False, idle_bars), first_hit(win_h, sl, True, idle_bars))
+
+    reason = np.full(len(entry_idx), 2, dtype=np.int8)
+    reason[tp_at < sl_at] = 0
+    reason[(sl_at <= tp_at) & (sl_at < idle_bars)] = 1
+    offset = np.where(reason == 0, tp_at, np.where(reason == 1, sl_at, idle_bars - 1)) + 1
+    idle_close = close[np.minimum(entry_idx + idle_bars, n - 1)]
+    exit_price = np.where(reason == 0, tp, np.where(reason == 1, sl, idle_close))
+    return offset, exit_price, reason
+
+def run_backtest(df: pd.DataFrame, model, min_conf: float, leverage: int = 80,
+                 gain_pct: float = 0.08, loss_pct: float = 0.3, idle_bars: int = 15,
+                 hold_wait_bars: int = 3, trade_wait_bars: int = 5,
+                 fee_each: float = 0.0004, slippage: float = 0.0002,
+                 margin_usdt: float = 100.0) -> dict:
+    """
+    df: 분봉(time/open/high/low/close/volume/taker_buy_base). model: predict_proba 가능한 분류기 (XGBoost면 FastPredictor 배치 추론).
+    반환: 요약 통계 dict + "trades" DataFrame
+    """
+    feat = compute_features_np(df).dropna(subset=FEATURES).reset_index(drop=True)
+    if feat.empty:
+        raise RuntimeError("Not enough data after feature engineering.")
+    proba = FastPredictor(model).predict_batch(feat[FEATURES].to_numpy())
+    signal = signals_from_proba(proba, min_conf)
+
+    high = feat["high"].to_numpy(float)
+    low = feat["low"].to_numpy(float)
+    close = feat["close"].to_numpy(float)
+    n = len(feat)
+
+    cand = np.flatnonzero(signal != 0)
+    cand = cand[cand < n - 1]
+    offset, exit_px, reason = simulate_exits(high, low, close, cand, signal[cand],
+                                             leverage, gain_pct, loss_pct, idle_bars)
+    by_bar = np.full(n, -1, dtype=np.int64)
+    by_bar[cand] = np.arange(len(cand))
+
+    # main 루프 순서대로 겹치지 않는 거래만 선택 (후보/대기 건너뛰기만 하는 가벼운 루프)
+    taken = []
+    t = 0
+    while t < n - 1:
+        k = by_bar[t]
+        if k < 0:
+            t += hold_wait_bars
+        else:
+            taken.append(k)
+            t += int(offset[k]) + trade_wait_bars
+    taken = np.asarray(taken, dtype=np.int64)
+
+    idx = cand[taken]
+    side = signal[idx].astype(float)
+    entry = close[idx]
+    exit_ = exit_px[taken]
+    cost = 2 * fee_each + slippage
+    roi = leverage * (side * (exit_ / entry - 1.0) - cost)
+    pnl = roi * margin_usdt
+    why = reason[taken]
+
+    trades = pd.DataFrame({
+        "time": feat["time"].to_numpy()[idx],
+        "side": np.where(side > 0, "BUY", "SELL"),
+        "confidence": proba[idx].max(axis=1),
+        "entry": entry, "exit": exit_,
+        "bars_held": offset[taken],
+        "reason": np.array(["TP", "SL", "IDLE"])[why],
+        "roi": roi, "pnl": pnl,
+    })
+    n_tr = len(trades)
+    return {
+        "bars": n,
+        "signals": int(len(cand)),
+        "trades": n_tr,
+        "tp": int((why == 0).sum()),
+        "sl": int((why == 1).sum()),
+        "idle": int((why == 2).sum()),
+        "win_rate": float((pnl > 0).mean()) if n_tr else None,
+        "total_pnl": float(pnl.sum()),
+        "avg_roi": float(roi.mean()) if n_tr else None,
+        "max_drawdown": float((np.maximum.accumulate(np.cumsum(pnl)) - np.cumsum(pnl)).max()) if n_tr else 0.0,
+        "trades_df": trades,
+    }
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--start", default=None, help="예: 2025-01-01")
+    ap.add_argument("--end", default=None)
+    ap.add_argument("--min-conf", type=float, default=0.7)
+    ap.add_argument("--leverage", type=int, default=80)
+    ap.add_argument("--gain-pct", type=float, default=0.08)
+    ap.add_argument("--loss-pct", type=float, default=0.3)
+    ap.add_argument("--margin", type=float, default=100.0, help="거래당 증거금(USDT)")
+    ap.add_argument("--trades-out", default=None, help="거래 내역 parquet 저장 경로")
+    args = ap.parse_args()
+
+    cfg = load_config()
+    start = pd.Timestamp(args.start, tz="UTC") if args.start else None
+    end = pd.Timestamp(args.end, tz="UTC") if args.end else None
+    df = open_kline_store(cfg).read(start=start, end=end)
+    model = load(active_model_path(cfg.model_path))
+
+    res = run_backtest(df, model, args.min_conf, leverage=args.leverage,
+                       gain_pct=args.gain_pct, loss_pct=args.loss_pct,
+                       fee_each=cfg.taker_fee_each, slippage=cfg.slippage,
+                       margin_usdt=args.margin)
+    trades = res.pop("trades_df")
+    for k, v in res.items():
+        print(f"{k:>14}: {v}")
+    if args.trades_out:
+        trades.to_parquet(args.trades_out)
+        print(f"Trades saved → {args.trades_out}")
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,87 @@
 import argparse
+import json
+import os
+import time
 import pandas as pd
-from AI.utils import load_config, ensure_dirs, compute_features, make_labels, FEATURES
+from AI.utils import (load_config, ensure_dirs, make_labels, FEATURES,
+                      FEATURE_LOOKBACK_BARS, feature_version)
+from AI.features_np import compute_features_np
+from AI.kline_store import PartitionedStore, open_kline_store
+from infra.market_feed import interval_ms
 
-def main():
-    cfg = load_config()
-    ensure_dirs()
-    df = pd.read_parquet(cfg.data_path)
-    if df.empty:
-        raise SystemExit("Empty price file. Run fetch_klines.py first.")
+META_FILE = "_meta.json"
+
+def read_meta(store: PartitionedStore) -> dict:
+    try:
+        with open(os.path.join(store.root, META_FILE), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def write_meta(store: PartitionedStore, meta: dict):
+    os.makedirs(store.root, exist_ok=True)
+    path = os.path.join(store.root, META_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(meta, f)
+    os.replace(path + ".tmp", path)
+
+def featurize(df: pd.DataFrame, horizon: int, theta: float) -> pd.DataFrame:
+    df_feat = compute_features_np(df)  # compute_features와 같은 값 (NumPy 구현)
+    df_lbl  = make_labels(df_feat, horizon, theta)
+    return df_lbl.dropna(subset=FEATURES + ["label"]).reset_index(drop=True)
+
+def _empty_dataset() -> pd.DataFrame:
+    return pd.DataFrame(columns=["time"] + FEATURES + ["label"])
 
-    df_feat = compute_features(df)
-    df_lbl  = make_labels(df_feat, cfg.horizon, cfg.theta)
+def build(cfg, full: bool = False, klines_df: pd.DataFrame | None = None) -> dict:
+    """
+    피처 저장소(cfg.train_path) 갱신.
+    - 저장된 feature_version이 다르거나 full=True면 전체 재빌드
+    - 아니면 마지막 처리 시점 이전 horizon개 봉(라벨이 미완성이던 꼬리)부터 다시 계산하고,
+      지표 lookback만큼 앞선 분봉을 함께 읽어 계산한 뒤 저장소에 병합
+    - klines_df: 전체 분봉을 이미 메모리에 갖고 있으면 전달(전체 재빌드 시 저장소 재읽기 생략)
+    반환의 "data"는 이번에 계산/병합한 피처 행
+    """
+    klines = open_kline_store(cfg)
+    feats = PartitionedStore(cfg.train_path)
+    version = feature_version(cfg)
+    meta = read_meta(feats)
+    step = pd.Timedelta(milliseconds=interval_ms(cfg.interval))
 
-    data = df_lbl.dropna(subset=FEATURES + ["label"]).reset_index(drop=True)
-    data.to_parquet(cfg.train_path)
-    print(f"Dataset saved: {len(data)} rows → {cfg.train_path}")
+    last_time = klines.last_time()
+    if last_time is None:
+        raise SystemExit("Empty price store. Run fetch_klines.py first.")
+
+    if full or meta.get("version") != version or feats.is_empty():
+        src = klines_df if klines_df is not None else klines.read()
+        data = featurize(src, cfg.horizon, cfg.theta)
+        feats.write_all(data)
+        mode, rows = "full", len(data)
+    else:
+        done = pd.Timestamp(meta["last_time"])
+        if done >= last_time:
+            return {"mode": "noop", "rows": 0, "version": version, "data": _empty_dataset()}
+        recompute_from = done - cfg.horizon * step
+        raw = klines.read(start=recompute_from - FEATURE_LOOKBACK_BARS * step)
+        data = featurize(raw, cfg.horizon, cfg.theta)
+        data = data[data["time"] >= recompute_from]
+        feats.append(data)
+        mode, rows = "incremental", len(data)
+
+    write_meta(feats, {"version": version, "features": FEATURES, "last_time": str(last_time)})
+    return {"mode": mode, "rows": rows, "version": version, "data": data}
+
+def main(full: bool = False):
+    cfg = load_config()
+    ensure_dirs()
+    t0 = time.perf_counter()
+    res = build(cfg, full=full)
+    print(f"Dataset {res['mode']}: {res['rows']} rows → {cfg.train_path} "
+          f"(version={res['version']}, {time.perf_counter() - t0:.2f}s)")
     print("Feature columns:", FEATURES)
 
 if __name__ == "__main__":
-    main()
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--full", action="store_true", help="피처 저장소 전체 재빌드")
+    args = ap.parse_args()
+    main(args.full)
@@ -1,8 +1,15 @@
 # decide.py
 import argparse
+import hashlib
+import io
+import os
+import threading
+import time
 import pandas as pd
 from joblib import load
-from AI.utils import load_config, get_um_client, compute_features, FEATURES
+from AI.utils import load_config, get_um_client, FEATURES, active_model_path, set_active_model
+from AI.features_np import compute_features_np
+from AI.inference import FastPredictor
 from datetime import datetime, timezone
 import numpy as np
 
@@ -30,41 +37,194 @@ def fetch_last_window_klines(client, symbol: str, interval: str, window: int) ->
     df.rename(columns={"tbbav": "taker_buy_base"}, inplace=True)
     return df[["time","open","high","low","close","volume","taker_buy_base"]].sort_values("time")
 
+class Decider:
+    """
+    config / UMFutures 클라이언트(HTTP 세션) / 모델을 상주시키는 의사결정기.
+    - 모델은 versions/ 포인터가 가리키는 파일(없으면 cfg.model_path)
+    - 모델 파일의 mtime이 바뀌면 내용 해시를 비교해 실제로 달라졌을 때만 재로딩
+    - 새 모델은 완전히 로딩된 뒤 참조 한 번으로 교체(atomic swap)
+    - 추론은 FastPredictor(booster inplace_predict, 1행 float32 버퍼)로
+    """
+    def __init__(self, cfg=None, client=None, feed=None):
+        self.cfg = cfg or load_config()
+        self.client = client or get_um_client(self.cfg.use_testnet, self.cfg.exchange)
+        self._reload_lock = threading.Lock()
+        self._model = None  # (model, mtime_ns, sha256, FastPredictor)
+        self.feed = None
+        self._engine = None
+        self._engine_lock = threading.Lock()
+        self.maybe_reload()
+        if feed is not None:
+            self.attach_feed(feed)
+
+    def attach_feed(self, feed):
+        """
+        MarketFeed 연결: 봉 마감마다 StreamingFeatures를 갱신해 두고,
+        decide()는 REST klines 대신 메모리의 피처 벡터를 사용
+        """
+        from AI.stream_features import StreamingFeatures
+
+        # 피드 락과 _engine_lock을 동시에 잡지 않음: 피드 조회는 항상 _engine_lock 밖에서
+        # (피드는 자기 락을 푼 뒤 콜백을 부르므로 순서가 뒤집혀도 교착 없음)
+        feed.on_bar(self._on_bar)
+        eng = StreamingFeatures().warmup(feed.window_df())
+        with self._engine_lock:
+            self._engine = eng
+        # 워밍업 중 마감돼 콜백이 건너뛴 봉 보충 (중복 봉은 엔진이 무시)
+        tail = feed.window_df()
+        if eng.last_time is not None:
+            tail = tail[tail["time"] > eng.last_time]
+        with self._engine_lock:
+            eng.warmup(tail)
+        self.feed = feed
+
+    def _on_bar(self, bar: dict):
+        with self._engine_lock:
+            if self._engine is not None:
+                self._engine.update(bar)
+
+    def _features_from_feed(self):
+        """피드가 최신 마감 봉까지 반영돼 있으면 (time, x), 아니면 None"""
+        feed = self.feed
+        if feed is None or not feed.is_current():
+            return None
+        last_open_ms = feed.last_open_ms  # 피드 락은 _engine_lock 밖에서
+        with self._engine_lock:
+            eng = self._engine
+            if eng is None or eng.last_time is None or eng.last_time.value // 1_000_000 != last_open_ms \
+                    or not eng.ready:
+                return None
+            return eng.last_time, eng.vector()
+
+    @property
+    def model(self):
+        return self._model[0] if self._model else None
+
+    def maybe_reload(self) -> bool:
+        """모델 파일(또는 포인터)이 바뀌었으면 재로딩. 교체했으면 True"""
+        path = active_model_path(self.cfg.model_path)
+        mtime = os.stat(path).st_mtime_ns
+        cur = self._model
+        if cur is not None and cur[1] == mtime:
+            return False
+
+        with self._reload_lock:
+            cur = self._model
+            if cur is not None and cur[1] == mtime:
+                return False
+            with open(path, "rb") as f:
+                blob = f.read()
+            digest = hashlib.sha256(blob).hexdigest()
+            if cur is not None and cur[2] == digest:
+                self._model = (cur[0], mtime, digest, cur[3])  # touch만 된 경우
+                return False
+            model = load(io.BytesIO(blob))
+            self._model = (model, mtime, digest, FastPredictor(model))
+            print(f"[MODEL] loaded {path} (sha256={digest[:12]})")
+            return True
+
+    def install(self, new_path: str) -> bool:
+        """
+        검증된 새 모델 파일(예: Retrainer 결과, versions/ 안)을 적용.
+        메모리 모델을 먼저 로딩한 뒤 versions/ 포인터를 원자 교체하고 참조를 바꾼다.
+        저장소의 cfg.model_path 파일은 덮어쓰지 않음. 로딩 중 예외가 나면 기존 모델과 포인터는 그대로.
+        """
+        with self._reload_lock:
+            with open(new_path, "rb") as f:
+                blob = f.read()
+            digest = hashlib.sha256(blob).hexdigest()
+            cur = self._model
+            if cur is not None and cur[2] == digest:
+                return False
+            model = load(io.BytesIO(blob))
+            set_active_model(self.cfg.model_path, new_path)
+            self._model = (model, os.stat(new_path).st_mtime_ns, digest, FastPredictor(model))
+            print(f"[MODEL] installed {new_path} (sha256={digest[:12]})")
+            return True
+
+    def decide(self, min_conf: float | None = None, window: int | None = None) -> dict:
+        """
+        호출 시점의 최신 분봉 데이터를 Testnet/Mainnet에서 가져와서
+        BUY/SELL/HOLD 신호와 확률을 리턴. timing에 단계별 소요(ms) 포함.
+        """
+        t0 = time.perf_counter()
+        cfg = self.cfg
+        win = window or int(getattr(cfg, "decision_window", 120))
+        self.maybe_reload()
+        _, _, digest, predictor = self._model
+        t1 = time.perf_counter()
+
+        live = self._features_from_feed()
+        if live is not None:
+            bar_time, x = live
+            close = self.feed.last_close
+            source = "feed"
+            t2 = time.perf_counter()
+        else:
+            raw = fetch_last_window_klines(self.client, cfg.symbol, cfg.interval, win)
+            t2 = time.perf_counter()
+
+            feat = compute_features_np(raw).dropna(subset=FEATURES)
+            if feat.empty:
+                raise RuntimeError("Not enough data after feature engineering.")
+            x = feat[FEATURES].to_numpy()[-1]
+            bar_time, close = feat["time"].iloc[-1], raw["close"].iloc[-1]
+            source = "rest"
+        t3 = time.perf_counter()
+
+        proba = predictor.predict_one(x)  # [SELL, HOLD, BUY]
+        t4 = time.perf_counter()
+
+        p_sell, p_hold, p_buy = proba
+        use_conf = min_conf if min_conf is not None else cfg.min_conf
+
+        if p_buy >= max(proba) and p_buy >= use_conf:
+            action, conf = "BUY", float(p_buy)
+        elif p_sell >= max(proba) and p_sell >= use_conf:
+            action, conf = "SELL", float(p_sell)
+        else:
+            action, conf = "HOLD", float(max(proba))
+
+        return {
+            "time": str(bar_time),
+            "close": float(close),
+            "action": action,
+            "confidence": round(conf, 4),
+            "proba": [round(float(p), 4) for p in proba],
+            "window_used": win,
+            "source": source,
+            "model_version": digest[:12],
+            "timing": {
+                "model_check_ms": round((t1 - t0) * 1000, 3),
+                "fetch_ms": round((t2 - t1) * 1000, 3),
+                "features_ms": round((t3 - t2) * 1000, 3),
+                "predict_ms": round((t4 - t3) * 1000, 3),
+                "total_ms": round((t4 - t0) * 1000, 3),
+            },
+        }
+
+_decider = None
+_decider_lock = threading.Lock()
+
+def get_decider() -> Decider:
+    """프로세스 공용 Decider (최초 호출 시 생성)"""
+    global _decider
+    if _decider is None:
+        with _decider_lock:
+            if _decider is None:
+                _decider = Decider()
+    return _decider
+
+def use_market_feed(feed):
+    """공용 Decider가 MarketFeed의 실시간 창을 사용하도록 연결"""
+    get_decider().attach_feed(feed)
+
 def decide_action(min_conf: float | None = None, window: int | None = None) -> dict:
     """
     호출 시점의 최신 분봉 데이터를 Testnet/Mainnet에서 가져와서
-    BUY/SELL/HOLD 신호와 확률을 리턴.
+    BUY/SELL/HOLD 신호와 확률을 리턴. (공용 Decider 사용)
     """
-    cfg = load_config()
-    client = get_um_client(cfg.use_testnet)
-    win = window or int(getattr(cfg, "decision_window", 120))
-
-    raw = fetch_last_window_klines(client, cfg.symbol, cfg.interval, win)
-    feat = compute_features(raw).dropna(subset=FEATURES)
-    if feat.empty:
-        raise RuntimeError("Not enough data after feature engineering.")
-
-    x = feat.iloc[-1:][FEATURES].values
-    model = load(cfg.model_path)
-    proba = model.predict_proba(x)[0]  # [SELL, HOLD, BUY]
-    p_sell, p_hold, p_buy = proba
-    use_conf = min_conf if min_conf is not None else cfg.min_conf
-
-    if p_buy >= max(proba) and p_buy >= use_conf:
-        action, conf = "BUY", float(p_buy)
-    elif p_sell >= max(proba) and p_sell >= use_conf:
-        action, conf = "SELL", float(p_sell)
-    else:
-        action, conf = "HOLD", float(max(proba))
-
-    return {
-        "time": str(feat["time"].iloc[-1]),
-        "close": float(raw["close"].iloc[-1]),
-        "action": action,
-        "confidence": round(conf, 4),
-        "proba": [round(float(p), 4) for p in proba],
-        "window_used": win
-    }
+    return get_decider().decide(min_conf=min_conf, window=window)
 
 # CLI 실행도 가능하게 유지
 if __name__ == "__main__":
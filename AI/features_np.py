@@ -0,0 +1,229 @@
+# AI/features_np.py
+"""
+compute_features()의 NumPy 구현 (대량 구간용: 학습 창 150k봉, 전체 히스토리 재빌드, 백테스트).
+pandas rolling / ta 대신 연속 배열(float64 또는 float32) 위에서 계산한다.
+- 롤링 평균/표준편차/최소/최대/MAD: 창 길이만큼 어긋난 view를 누적 (임시 배열은 길이 n짜리 1~2개),
+  평균을 먼저 구하고 편차를 다시 누적하는 두 번 훑기라 누적합 방식의 상쇄 오차가 없음
+- RSI: Wilder EMA(ewm adjust=False)를 scipy.signal.lfilter 한 번으로
+- 결과 NaN 위치/0 나눗셈 처리는 pandas/ta 구현과 같음
+
+  python -m AI.features_np --check [--bars 20000]
+  python -m AI.features_np --bench [--bars 1000000]
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+from AI.utils import compute_features, FEATURES
+
+EPS = 1e-12
+
+def _nan_like(x: np.ndarray) -> np.ndarray:
+    return np.full(len(x), np.nan, dtype=x.dtype)
+
+def _lags(x: np.ndarray, w: int):
+    """창 끝이 i+w-1인 창들의 j번째 값 배열 x[j : j+m] (j = 0..w-1, m = n-w+1) — 복사 없는 view"""
+    m = len(x) - w + 1
+    return (x[j:j + m] for j in range(w))
+
+def rolling_mean_std(x: np.ndarray, w: int) -> tuple[np.ndarray, np.ndarray]:
+    """창 w의 평균, 표본표준편차(ddof=1). 처음 w-1개와 NaN이 낀 창은 NaN (rolling(w).mean()/std())"""
+    mean, std = _nan_like(x), _nan_like(x)
+    if len(x) < w:
+        return mean, std
+    m = mean[w - 1:]
+    m[:] = 0
+    for xj in _lags(x, w):
+        m += xj
+    m /= w
+    ss, d = np.zeros_like(m), np.empty_like(m)
+    for xj in _lags(x, w):  # 평균을 뺀 뒤 제곱합 (두 번 훑기 → 상쇄 오차 없음)
+        np.subtract(xj, m, out=d)
+        d *= d
+        ss += d
+    np.sqrt(ss / (w - 1), out=std[w - 1:])
+    return mean, std
+
+def rolling_min_max(lo: np.ndarray, hi: np.ndarray, w: int) -> tuple[np.ndarray, np.ndarray]:
+    """lo의 창 최소, hi의 창 최대 (rolling(w).min()/max())"""
+    mn, mx = _nan_like(lo), _nan_like(hi)
+    if len(lo) < w:
+        return mn, mx
+    a, b = mn[w - 1:], mx[w - 1:]
+    a[:], b[:] = lo[:len(a)], hi[:len(b)]
+    for lj, hj in zip(_lags(lo, w), _lags(hi, w)):
+        np.minimum(a, lj, out=a)  # NaN은 전파 (pandas도 NaN 낀 창은 NaN)
+        np.maximum(b, hj, out=b)
+    return mn, mx
+
+def rolling_mean_mad(x: np.ndarray, w: int) -> tuple[np.ndarray, np.ndarray]:
+    """창 평균과 평균 절대편차 mean(|x - mean|) (ta CCI의 rolling(w).apply(_mad))"""
+    mean, _ = rolling_mean_std(x, w)
+    mad = _nan_like(x)
+    if len(x) < w:
+        return mean, mad
+    m, acc = mean[w - 1:], mad[w - 1:]
+    acc[:] = 0
+    d = np.empty_like(m)
+    for xj in _lags(x, w):
+        np.subtract(xj, m, out=d)
+        np.abs(d, out=d)
+        acc += d
+    acc /= w
+    return mean, mad
+
+def ewm_mean(x: np.ndarray, alpha: float, min_periods: int = 0) -> np.ndarray:
+    """ewm(alpha, adjust=False).mean(): y0 = x0, y_t = (1-alpha)·y_{t-1} + alpha·x_t (x에 NaN 없음 가정)"""
+    if not len(x):
+        return x.copy()
+    a = x.dtype.type(alpha)
+    y, _ = lfilter([a], [1, a - 1], x, zi=np.array([(1 - a) * x[0]], dtype=x.dtype))
+    y[:max(min_periods - 1, 0)] = np.nan
+    return y.astype(x.dtype, copy=False)
+
+def log_return(close: np.ndarray, k: int) -> np.ndarray:
+    """log(close_t / close_{t-k}) (= log(close).diff(k))"""
+    out = _nan_like(close)
+    if len(close) > k:
+        np.log(close[k:] / close[:-k], out=out[k:])
+    return out
+
+def rsi(close: np.ndarray, window: int = 7) -> np.ndarray:
+    """ta.momentum.RSIIndicator(window).rsi() — 첫 diff(NaN)는 0으로 취급, emadn == 0이면 100"""
+    diff = np.zeros_like(close)
+    np.subtract(close[1:], close[:-1], out=diff[1:])
+    up = np.where(diff > 0, diff, 0)
+    dn = np.where(diff < 0, -diff, 0)
+    emaup = ewm_mean(up, 1 / window, window)
+    emadn = ewm_mean(dn, 1 / window, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(emadn == 0, 100, 100 - 100 / (1 + emaup / emadn)).astype(close.dtype, copy=False)
+
+def stoch(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 7) -> np.ndarray:
+    """ta.momentum.StochasticOscillator(window).stoch() (%K)"""
+    smin, smax = rolling_min_max(low, high, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 * (close - smin) / (smax - smin)
+
+def cci(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 10,
+        constant: float = 0.015) -> np.ndarray:
+    """ta.trend.CCIIndicator(window, constant).cci()"""
+    tp = (high + low + close) / 3.0
+    mean, mad = rolling_mean_mad(tp, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (tp - mean) / (constant * mad)
+
+def feature_arrays(high, low, close, volume, taker_buy_base=None, dtype=None) -> dict[str, np.ndarray]:
+    """
+    시간 오름차순 배열 → {피처 이름: 배열} (FEATURES 전부).
+    dtype: 계산 dtype (None이면 close가 float32일 때 float32, 아니면 float64)
+    """
+    if dtype is None:
+        dtype = np.float32 if np.asarray(close).dtype == np.float32 else np.float64
+    h, l, c, v = (np.ascontiguousarray(a, dtype=dtype) for a in (high, low, close, volume))
+    f = {}
+
+    # 가격 기반
+    f["ret_1"] = log_return(c, 1)
+    f["ret_3"] = log_return(c, 3)
+    f["ret_5"] = log_return(c, 5)
+    f["vol_10"] = rolling_mean_std(f["ret_1"], 10)[1]
+    f["vol_30"] = rolling_mean_std(f["ret_1"], 30)[1]
+
+    # 모멘텀/오실레이터
+    f["rsi_7"] = rsi(c, 7)
+    f["stoch"] = stoch(h, l, c, 7)
+    f["cci_10"] = cci(h, l, c, 10)
+
+    # 거래량 기반
+    f["log_vol"] = np.log(v + 1.0)
+    vm, vs = rolling_mean_std(v, 10)
+    f["vol_ratio_1_10"] = v / (vm + EPS)
+    f["vol_zscore_10"] = (v - vm) / (vs + EPS)
+
+    # 매수/매도 비율
+    if taker_buy_base is not None:
+        br = np.clip(np.ascontiguousarray(taker_buy_base, dtype=dtype) / (v + EPS), 0, 1)
+        bm, bs = rolling_mean_std(br, 10)
+        f["buy_ratio"] = br
+        f["sell_ratio"] = 1.0 - br
+        f["buy_ratio_z10"] = (br - bm) / (bs + EPS)
+    else:
+        f["buy_ratio"] = np.full(len(c), 0.5, dtype=dtype)
+        f["sell_ratio"] = np.full(len(c), 0.5, dtype=dtype)
+        f["buy_ratio_z10"] = np.zeros(len(c), dtype=dtype)
+    return f
+
+def compute_features_np(df: pd.DataFrame, dtype=np.float64) -> pd.DataFrame:
+    """compute_features()와 같은 모양의 결과 (time 오름차순, 원래 컬럼 + FEATURES, RangeIndex)"""
+    df = df.sort_values("time")
+    out = df[["time"] + [col for col in df.columns if col != "time"]].reset_index(drop=True)
+    tbb = out["taker_buy_base"].to_numpy() if "taker_buy_base" in out.columns else None
+    feats = feature_arrays(out["high"].to_numpy(), out["low"].to_numpy(), out["close"].to_numpy(),
+                           out["volume"].to_numpy(), tbb, dtype=dtype)
+    return pd.concat([out, pd.DataFrame({k: feats[k] for k in FEATURES})], axis=1)
+
+def check_parity(df: pd.DataFrame, rtol: float = 1e-7, atol: float = 1e-9) -> dict:
+    """compute_features()와 compute_features_np()의 피처별 최대 오차"""
+    ref = compute_features(df)
+    got = compute_features_np(df)
+    out = {}
+    for k in FEATURES:
+        a, b = ref[k].to_numpy(dtype=float), got[k].to_numpy(dtype=float)
+        mask = np.isfinite(a) & np.isfinite(b)
+        nan_mismatch = int((np.isfinite(a) != np.isfinite(b)).sum())
+        err = np.abs(a[mask] - b[mask])
+        ok = bool(np.all(err <= atol + rtol * np.abs(a[mask]))) and nan_mismatch == 0
+        out[k] = {"max_abs_err": float(err.max()) if err.size else 0.0,
+                  "nan_mismatch": nan_mismatch, "ok": ok}
+    return out
+
+def random_bars(n: int, seed: int = 0) -> pd.DataFrame:
+    """벤치용 합성 분봉 (로그 랜덤워크, 저장소와 같은 컬럼)"""
+    rng = np.random.default_rng(seed)
+    close = 30000.0 * np.exp(np.cumsum(rng.normal(0, 8e-4, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    wick = np.abs(rng.normal(0, 4e-4, (2, n))) * close
+    volume = rng.gamma(2.0, 40.0, n)
+    return pd.DataFrame({
+        "time": pd.date_range("2020-01-01", periods=n, freq="1min", tz="UTC"),
+        "open": open_, "high": np.maximum(open_, close) + wick[0], "low": np.minimum(open_, close) - wick[1],
+        "close": close, "volume": volume, "taker_buy_base": volume * rng.uniform(0, 1, n),
+    })
+
+if __name__ == "__main__":
+    from AI.utils import load_config
+    from AI.kline_store import open_kline_store
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--check", action="store_true", help="pandas 구현과 수치 비교")
+    ap.add_argument("--bench", action="store_true", help="pandas vs NumPy(float64/float32) 시간 비교")
+    ap.add_argument("--bars", type=int, default=None, help="기본: check 20000 / bench 1000000")
+    ap.add_argument("--synthetic", action="store_true", help="저장소 대신 합성 분봉")
+    args = ap.parse_args()
+
+    n = args.bars or (1_000_000 if args.bench else 20_000)
+    df = None if args.synthetic else open_kline_store(load_config()).tail(n)
+    if df is None or len(df) < n:
+        df = random_bars(n)
+    if args.check:
+        res = check_parity(df)
+        for k, v in res.items():
+            print(f"{k:16s} max_abs_err={v['max_abs_err']:.3e} nan_mismatch={v['nan_mismatch']} ok={v['ok']}")
+        if not all(v["ok"] for v in res.values()):
+            raise SystemExit(1)
+    if args.bench:
+        cols = {c: df[c].to_numpy() for c in ("high", "low", "close", "volume", "taker_buy_base")}
+        cols32 = {c: a.astype(np.float32) for c, a in cols.items()}
+        runs = {
+            "pandas compute_features": lambda: compute_features(df),
+            "compute_features_np": lambda: compute_features_np(df),
+            "feature_arrays float64": lambda: feature_arrays(**cols),
+            "feature_arrays float32": lambda: feature_arrays(**cols32),
+        }
+        print(f"[FEATURES] {len(df)} bars")
+        for name, fn in runs.items():
+            t0 = time.perf_counter()
+            fn()
+            print(f"  {name:26s} {time.perf_counter() - t0:8.3f}s")
@@ -1,66 +1,138 @@
 import argparse
 import pandas as pd
+import numpy as np
 import time
+from concurrent.futures import ThreadPoolExecutor
 from AI.utils import load_config, get_um_client, ensure_dirs, utc_now_ms, to_utc_ts
+from infra.market_feed import interval_ms
+from infra.rate_limit import WeightBudget, RateGovernor, klines_weight, priority, BACKFILL
+from AI.kline_store import PartitionedStore, open_kline_store
+
+KLINE_COLS = ["time","open","high","low","close","volume","taker_buy_base"]
+
+def rows_to_frame(rows) -> pd.DataFrame:
+    """
+    REST klines 행(list) → float64/datetime 컬럼 DataFrame.
+    object dtype 중간 프레임 없이 필요한 열만 numpy로 파싱하고, open_time 기준 정렬·중복 제거.
+    """
+    if not rows:
+        return pd.DataFrame(columns=KLINE_COLS)
+    n = len(rows)
+    open_time = np.fromiter((r[0] for r in rows), dtype=np.int64, count=n)
+    # open, high, low, close, volume, taker buy base asset volume
+    vals = np.array([(r[1], r[2], r[3], r[4], r[5], r[9]) for r in rows], dtype=np.float64)
+    open_time, idx = np.unique(open_time, return_index=True)
+    vals = vals[idx]
+    return pd.DataFrame({
+        "time": pd.to_datetime(open_time, unit="ms", utc=True),
+        "open": vals[:, 0], "high": vals[:, 1], "low": vals[:, 2], "close": vals[:, 3],
+        "volume": vals[:, 4], "taker_buy_base": vals[:, 5],
+    })
 
 def fetch_range(client, symbol, interval, start_ms, end_ms, limit=1500) -> pd.DataFrame:
+    """순차 조회. 속도 조절은 클라이언트의 RateGovernor가 BACKFILL 우선순위로 담당"""
     rows=[]
     cur = start_ms
-    while cur < end_ms:
-        data = client.klines(symbol=symbol, interval=interval, startTime=cur, endTime=end_ms, limit=limit)
-        if not data:
-            break
-        rows += data
-        cur = data[-1][0] + 1
-        time.sleep(0.15)
-    cols = ["open_time","open","high","low","close","volume",
-            "close_time","qav","trades","tbbav","tbqav","ignore"]
-    df = pd.DataFrame(rows, columns=cols)
-    if df.empty:
-        return df
-    df["time"] = pd.to_datetime(df["open_time"], unit="ms", utc=True)
-    for c in ["open","high","low","close","volume","tbbav"]:
-        if c in df.columns:
-            df[c] = df[c].astype(float)
-    # tbbav = taker buy base asset volume
-    df.rename(columns={"tbbav":"taker_buy_base"}, inplace=True)
-    return df[["time","open","high","low","close","volume","taker_buy_base"]].sort_values("time")
+    with priority(BACKFILL):
+        while cur < end_ms:
+            data = client.klines(symbol=symbol, interval=interval, startTime=cur, endTime=end_ms, limit=limit)
+            if not data:
+                break
+            rows += data
+            cur = data[-1][0] + 1
+    return rows_to_frame(rows)
 
-def main(mode: str):
-    cfg = load_config()
-    ensure_dirs()
-    client = get_um_client(cfg.use_testnet)
+def fetch_range_concurrent(client, symbol, interval, start_ms, end_ms, limit=1500,
+                           workers: int = 4, budget: WeightBudget | None = None,
+                           retries: int = 3) -> pd.DataFrame:
+    """
+    [start_ms, end_ms] 구간을 limit개 봉 단위 청크로 나눠 병렬 조회.
+    - RateGovernor가 붙은 클라이언트면 BACKFILL 우선순위로 호출(주문/취소/폴링에 양보)
+    - 그 외 클라이언트는 budget(분당 weight 예산)에서 klines weight를 확보한 뒤 호출
+    - 결과는 open_time 기준으로 이어붙이고 중복 제거
+    """
+    governed = isinstance(getattr(client, "budget", None), RateGovernor)
+    if budget is None and not governed:
+        budget = WeightBudget(limit=1200)  # 계정 한도(2400)의 절반만 사용
+    weight = klines_weight(limit)
+    span = limit * interval_ms(interval)
+    # fetch_range와 같이 end_ms 시점의 봉까지 포함
+    chunks = [(s, min(s + span - 1, end_ms)) for s in range(start_ms, end_ms + 1, span)]
+
+    def fetch_chunk(chunk):
+        s, e = chunk
+        with priority(BACKFILL):  # 우선순위는 스레드별이라 작업 스레드 안에서 지정
+            for attempt in range(retries):
+                if budget is not None:
+                    budget.acquire(weight)
+                try:
+                    return client.klines(symbol=symbol, interval=interval,
+                                         startTime=s, endTime=e, limit=limit) or []
+                except Exception as err:
+                    if attempt == retries - 1:
+                        raise
+                    print(f"[RETRY] klines {s}~{e}: {err}")
+                    # 429/418이면 governor가 Retry-After만큼 막고 있으므로 따로 쉬지 않음
+                    if not (governed and getattr(err, "status_code", None) in (418, 429)):
+                        time.sleep(0.5 * (attempt + 1))
+
+    rows = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for data in pool.map(fetch_chunk, chunks):
+            rows += data
+    return rows_to_frame(rows)
 
-    path = cfg.data_path
+def update_klines(cfg, mode: str, workers: int = 4, client=None) -> pd.DataFrame:
+    """
+    분봉 저장소 갱신 후 이번에 받아온 행을 반환 (backfill이면 전체).
+    - backfill: start_date부터 전체를 병렬 조회해 저장소 교체
+    - incremental: 저장소 마지막 봉 이후만 조회해 최신 파티션에 추가
+    """
+    client = client or get_um_client(cfg.use_testnet, cfg.exchange)
+    store = open_kline_store(cfg)
     if mode == "backfill":
         start_ms = to_utc_ts(pd.Timestamp(cfg.start_date))
         end_ms   = utc_now_ms()
-        df = fetch_range(client, cfg.symbol, cfg.interval, start_ms, end_ms)
+        if workers > 1:
+            df = fetch_range_concurrent(client, cfg.symbol, cfg.interval, start_ms, end_ms, workers=workers)
+        else:
+            df = fetch_range(client, cfg.symbol, cfg.interval, start_ms, end_ms)
         if df.empty:
             raise SystemExit("No data fetched. Check symbol/start_date/testnet setting.")
-        df.to_parquet(path)
-        print(f"Saved {len(df)} rows → {path}")
+        store.write_all(df)
+        print(f"Saved {len(df)} rows → {cfg.store_path}")
+        return df
 
-    elif mode == "incremental":
-        try:
-            old = pd.read_parquet(path)
-            last_time = old["time"].max()
+    if mode == "incremental":
+        last_time = store.last_time()
+        if last_time is not None:
             start_ms = int(last_time.timestamp() * 1000) + 1
-        except Exception:
-            old = pd.DataFrame()
+        else:
             start_ms = to_utc_ts(pd.Timestamp(cfg.start_date))
         end_ms = utc_now_ms()
         df_new = fetch_range(client, cfg.symbol, cfg.interval, start_ms, end_ms)
         if df_new.empty:
             print("No new rows.")
-            return
-        combined = pd.concat([old, df_new], ignore_index=True) if not old.empty else df_new
-        combined = combined.drop_duplicates(subset=["time"]).sort_values("time").reset_index(drop=True)
-        combined.to_parquet(path)
-        print(f"Added {len(df_new)} rows | total {len(combined)} → {path}")
+            return df_new
+        touched = store.append(df_new)
+        print(f"Added {len(df_new)} rows ({touched} partition(s) rewritten) → {cfg.store_path}")
+        return df_new
+
+    raise ValueError(f"unknown mode: {mode}")
+
+def main(mode: str, workers: int = 4):
+    cfg = load_config()
+    ensure_dirs()
+
+    if mode == "migrate":
+        n = PartitionedStore(cfg.store_path).migrate_from_file(cfg.data_path)
+        print(f"Migrated {n} rows {cfg.data_path} → {cfg.store_path}")
+        return
+    update_klines(cfg, mode, workers)
 
 if __name__ == "__main__":
     ap = argparse.ArgumentParser()
-    ap.add_argument("--mode", choices=["backfill","incremental"], required=True)
+    ap.add_argument("--mode", choices=["backfill","incremental","migrate"], required=True)
+    ap.add_argument("--workers", type=int, default=4, help="backfill 동시 요청 수 (1이면 순차)")
     args = ap.parse_args()
-    main(args.mode)
+    main(args.mode, args.workers)
@@ -0,0 +1,114 @@
+# AI/inference.py
+"""
+저지연 추론 경로.
+XGBClassifier.predict_proba는 호출마다 입력 검사/DMatrix 변환/래퍼 처리를 거친다.
+FastPredictor는 학습된 booster를 꺼내 inplace_predict로 바로 예측한다.
+- predict_one(x): 미리 할당한 (1, n_features) float32 버퍼에 복사해 1행 예측 (decide 경로)
+- predict_batch(X): 여러 행을 한 번에 (백테스트 등)
+- predict_many(predictors, x): 같은 피처 행을 여러 모델로 (float32 변환 1번)
+결과는 predict_proba와 같은 확률/열 순서([SELL, HOLD, BUY]).
+booster가 없는 분류기는 predict_proba로 그대로 위임.
+
+  python -m AI.inference --check [--rows 2000]
+"""
+import argparse
+import threading
+import time
+import numpy as np
+
+class FastPredictor:
+    def __init__(self, model, nthread: int | None = 1):
+        """
+        model: XGBClassifier(또는 predict_proba 가능한 분류기)
+        nthread: 1행 예측(predict_one)용 스레드 수. 스레드 풀 비용이 더 커서 기본 1, None이면 모델 설정 그대로
+                 배치(predict_batch)는 별도 복사본으로 모델의 nthread를 그대로 사용
+                 (원본 모델 설정은 건드리지 않도록 booster 복사본 사용)
+        """
+        self.model = model
+        self.booster = None
+        self.batch_booster = None
+        self._row = None
+        self._lock = threading.Lock()
+        if not hasattr(model, "get_booster"):
+            return
+        self.batch_booster = model.get_booster().copy()
+        if nthread is None:
+            self.booster = self.batch_booster
+        else:
+            self.booster = model.get_booster().copy()
+            self.booster.set_param({"nthread": nthread})
+        self.n_features = self.booster.num_features()
+        self.missing = getattr(model, "missing", np.nan)
+        # predict_proba와 같은 트리 범위 (early stopping이면 best_iteration까지)
+        try:
+            self.iteration_range = (0, int(model.best_iteration) + 1)
+        except AttributeError:
+            self.iteration_range = (0, 0)
+        self._binary = getattr(model, "n_classes_", 2) == 2
+        self._row = np.empty((1, self.n_features), dtype=np.float32)
+
+    def _predict(self, booster, x: np.ndarray) -> np.ndarray:
+        p = booster.inplace_predict(x, iteration_range=self.iteration_range, missing=self.missing,
+                                         validate_features=False)
+        if self._binary:
+            p = np.column_stack([1.0 - p, p])
+        return p
+
+    def predict_one(self, x) -> np.ndarray:
+        """피처 1행((n,) 또는 (1, n)) → 클래스 확률 (n_classes,)"""
+        if self.booster is None:
+            return self.model.predict_proba(np.asarray(x).reshape(1, -1))[0]
+        with self._lock:
+            self._row[0] = np.ravel(x)
+            return self._predict(self.booster, self._row)[0]
+
+    def predict_batch(self, X) -> np.ndarray:
+        """피처 행렬 (m, n) → (m, n_classes)"""
+        if self.booster is None:
+            return self.model.predict_proba(X)
+        return self._predict(self.batch_booster, np.ascontiguousarray(X, dtype=np.float32))
+
+def predict_many(predictors: dict, x) -> dict:
+    """같은 입력을 여러 모델로 (예: 현재 모델 vs 재학습 후보) → {이름: 확률}"""
+    x32 = np.ascontiguousarray(np.atleast_2d(x), dtype=np.float32)
+    one = len(x32) == 1
+    out = {}
+    for name, p in predictors.items():
+        proba = p.predict_batch(x32)
+        out[name] = proba[0] if one else proba
+    return out
+
+def _timeit(fn, n: int) -> float:
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n * 1000
+
+if __name__ == "__main__":
+    from joblib import load
+    from AI.utils import load_config, FEATURES, active_model_path
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", default=None, help="기본: config model_path의 현재 버전")
+    ap.add_argument("--rows", type=int, default=2000)
+    ap.add_argument("--check", action="store_true", help="predict_proba와 확률 일치 검사")
+    args = ap.parse_args()
+
+    model = load(args.model or active_model_path(load_config().model_path))
+    fast = FastPredictor(model)
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(args.rows, len(FEATURES)))
+    X[rng.random(X.shape) < 0.01] = np.nan  # 결측 처리도 같은지
+
+    ref = model.predict_proba(X)
+    diff_batch = float(np.abs(fast.predict_batch(X) - ref).max())
+    diff_one = max(float(np.abs(fast.predict_one(X[i]) - ref[i]).max()) for i in range(min(len(X), 200)))
+    print(f"[INFER] max|Δ| batch={diff_batch:.3g} one={diff_one:.3g}")
+    x1 = X[-1:]
+    print(f"[INFER] 1row predict_proba={_timeit(lambda: model.predict_proba(x1), 2000):.4f} ms  "
+          f"predict_one={_timeit(lambda: fast.predict_one(x1), 2000):.4f} ms")
+    print(f"[INFER] {len(X)}rows predict_proba={_timeit(lambda: model.predict_proba(X), 20):.3f} ms  "
+          f"predict_batch={_timeit(lambda: fast.predict_batch(X), 20):.3f} ms")
+    if args.check and max(diff_batch, diff_one) > 1e-6:
+        raise SystemExit("[INFER] 확률 불일치")
@@ -0,0 +1,133 @@
+# AI/kline_store.py
+"""
+월별 parquet 파티션 저장소 (root/YYYY-MM.parquet).
+증분 추가는 새 행이 속한 파티션(보통 최신 1개)만 다시 쓰고,
+읽기는 기간이 겹치는 파티션만 열어 컬럼 projection + 시간 필터를 적용한다.
+"""
+import os
+import glob
+import pandas as pd
+
+class PartitionedStore:
+    def __init__(self, root: str, time_col: str = "time"):
+        self.root = root
+        self.time_col = time_col
+
+    # ---------- 파티션 ----------
+    @staticmethod
+    def _key(ts: pd.Timestamp) -> str:
+        return f"{ts.year:04d}-{ts.month:02d}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.parquet")
+
+    def partitions(self) -> list[tuple[str, str]]:
+        """[(YYYY-MM, path), ...] 오름차순"""
+        paths = sorted(glob.glob(os.path.join(self.root, "????-??.parquet")))
+        return [(os.path.basename(p)[:7], p) for p in paths]
+
+    def is_empty(self) -> bool:
+        return not self.partitions()
+
+    def _write(self, key: str, df: pd.DataFrame):
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(key)
+        tmp = path + ".tmp"
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, path)  # 읽는 쪽이 쓰다 만 파일을 보지 않도록
+
+    def _split(self, df: pd.DataFrame):
+        t = df[self.time_col]
+        keys = t.dt.year * 100 + t.dt.month
+        for k, part in df.groupby(keys.values, sort=True):
+            yield f"{k // 100:04d}-{k % 100:02d}", part
+
+    # ---------- 쓰기 ----------
+    def append(self, df: pd.DataFrame) -> int:
+        """새 행 추가(같은 time은 새 값으로 덮어씀). 건드린 파티션 수 반환"""
+        if df.empty:
+            return 0
+        touched = 0
+        for key, part in self._split(df):
+            path = self._path(key)
+            if os.path.exists(path):
+                part = pd.concat([pd.read_parquet(path), part], ignore_index=True)
+            part = (part.drop_duplicates(subset=[self.time_col], keep="last")
+                        .sort_values(self.time_col).reset_index(drop=True))
+            self._write(key, part)
+            touched += 1
+        return touched
+
+    def write_all(self, df: pd.DataFrame):
+        """저장소 전체를 df로 교체 (backfill/전체 재빌드용)"""
+        df = df.drop_duplicates(subset=[self.time_col], keep="last").sort_values(self.time_col)
+        keep = set()
+        for key, part in self._split(df):
+            self._write(key, part.reset_index(drop=True))
+            keep.add(key)
+        for key, path in self.partitions():
+            if key not in keep:
+                os.remove(path)
+
+    def migrate_from_file(self, path: str) -> int:
+        """기존 단일 parquet 파일을 파티션으로 옮김. 옮긴 행 수 반환 (원본은 그대로 둠)"""
+        df = pd.read_parquet(path)
+        if df.empty:
+            return 0
+        self.write_all(df)
+        return len(df)
+
+    # ---------- 읽기 ----------
+    def read(self, start=None, end=None, columns: list[str] | None = None) -> pd.DataFrame:
+        """start <= time < end 인 행 (start/end는 None 또는 tz-aware Timestamp)"""
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+        lo = self._key(start) if start is not None else None
+        hi = self._key(end) if end is not None else None
+
+        filters = []
+        if start is not None:
+            filters.append((self.time_col, ">=", start))
+        if end is not None:
+            filters.append((self.time_col, "<", end))
+        if columns is not None and self.time_col not in columns:
+            columns = [self.time_col] + list(columns)
+
+        frames = []
+        for key, path in self.partitions():
+            if (lo is not None and key < lo) or (hi is not None and key > hi):
+                continue
+            frames.append(pd.read_parquet(path, columns=columns, filters=filters or None))
+        if not frames:
+            return pd.DataFrame(columns=columns or [])
+        return pd.concat(frames, ignore_index=True)
+
+    def tail(self, n: int, columns: list[str] | None = None) -> pd.DataFrame:
+        """최근 n행 (필요한 최신 파티션만 역순으로 읽음)"""
+        if columns is not None and self.time_col not in columns:
+            columns = [self.time_col] + list(columns)
+        frames, rows = [], 0
+        for _, path in reversed(self.partitions()):
+            part = pd.read_parquet(path, columns=columns)
+            frames.append(part)
+            rows += len(part)
+            if rows >= n:
+                break
+        if not frames:
+            return pd.DataFrame(columns=columns or [])
+        return pd.concat(frames[::-1], ignore_index=True).tail(n).reset_index(drop=True)
+
+    def last_time(self):
+        """저장된 마지막 time (없으면 None) — 최신 파티션의 time 컬럼만 읽음"""
+        parts = self.partitions()
+        if not parts:
+            return None
+        return pd.read_parquet(parts[-1][1], columns=[self.time_col])[self.time_col].max()
+
+def open_kline_store(cfg) -> PartitionedStore:
+    """설정의 분봉 저장소. 비어 있고 예전 단일 파일(data_path)이 있으면 먼저 마이그레이션"""
+    store = PartitionedStore(cfg.store_path)
+    if store.is_empty() and os.path.exists(cfg.data_path):
+        n = store.migrate_from_file(cfg.data_path)
+        print(f"Migrated {n} rows {cfg.data_path} → {cfg.store_path}")
+    return store
@@ -0,0 +1,116 @@
+# AI/pipeline.py
+"""
+fetch → build → train → decide 를 한 프로세스 안에서 실행하는 파이프라인.
+단계 사이 데이터는 DataFrame으로 메모리에서 넘기고, 단계별 소요 시간을 기록한다.
+
+  python -m AI.pipeline --mode incremental
+  python -m AI.pipeline --mode backfill --no-decide
+"""
+import argparse
+import time
+import pandas as pd
+from AI.utils import load_config, ensure_dirs
+from AI.fetch_klines import update_klines
+from AI.build_dataset import build
+from AI.train import train_once
+from AI.kline_store import PartitionedStore
+
+class Pipeline:
+    """
+    재학습 파이프라인. 객체를 살려 두면(예: main 루프) 학습 창 DataFrame을 메모리에 캐시해
+    다음 실행에서는 새로 만든 피처 행만 이어붙인다.
+    """
+    def __init__(self, cfg=None):
+        self.cfg = cfg or load_config()
+        self.train_frame: pd.DataFrame | None = None
+        self.timings: dict[str, float] = {}
+
+    def _timed(self, name: str, fn, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.timings[name] = round(time.perf_counter() - t0, 3)
+
+    def _update_train_frame(self, built: dict) -> pd.DataFrame:
+        """학습 창(train_window_bars) 갱신: 전체 재빌드면 그 결과, 증분이면 캐시에 병합"""
+        cfg = self.cfg
+        data = built["data"]
+        if built["mode"] == "full":
+            frame = data
+        elif self.train_frame is None:
+            frame = PartitionedStore(cfg.train_path).tail(cfg.train_window_bars)
+        elif data.empty:
+            frame = self.train_frame
+        else:
+            frame = (pd.concat([self.train_frame, data], ignore_index=True)
+                       .drop_duplicates(subset=["time"], keep="last")
+                       .sort_values("time"))
+        self.train_frame = frame.tail(cfg.train_window_bars).reset_index(drop=True)
+        return self.train_frame
+
+    def _frame_until(self, until: pd.Timestamp) -> pd.DataFrame:
+        """
+        until 시각에 라벨까지 확정된 행만으로 만든 학습 창 (sim 재생용).
+        t의 라벨은 t+horizon 봉 종가가 필요 → time < until(분 내림) - horizon 분.
+        저장소에는 재생 시각 이후 행도 있으므로 캐시(train_frame 병합) 대신 매번 저장소에서 잘라 읽음
+        """
+        cfg = self.cfg
+        end = until.floor("min") - pd.Timedelta(minutes=cfg.horizon)
+        start = end - pd.Timedelta(minutes=2 * cfg.train_window_bars)
+        frame = PartitionedStore(cfg.train_path).read(start=start, end=end)
+        return frame.sort_values("time").tail(cfg.train_window_bars).reset_index(drop=True)
+
+    def run(self, mode: str = "incremental", workers: int = 4, decide: bool = True,
+            model_path: str | None = None, until: pd.Timestamp | None = None) -> dict:
+        """
+        단계 실행. model_path를 주면 그 경로로 모델 저장(기본: cfg.model_path).
+        until: 이 시각까지 알 수 있는 데이터로만 학습 (sim 가상 시계 시각, None이면 전부)
+        반환: {"rows_fetched", "dataset", "cv_score", "model_path", "decision", "timings"}
+        """
+        cfg = self.cfg
+        ensure_dirs()
+        self.timings = {}
+        model_path = model_path or cfg.model_path
+
+        fetched = self._timed("fetch", update_klines, cfg, mode, workers)
+        klines_df = fetched if mode == "backfill" else None
+        built = self._timed("build", build, cfg, full=(mode == "backfill"), klines_df=klines_df)
+        if until is None:
+            frame = self._timed("train_frame", self._update_train_frame, built)
+        else:
+            frame = self.train_frame = self._timed("train_frame", self._frame_until, until)
+        if frame.empty:
+            raise SystemExit("Empty training dataset.")
+        score = self._timed("train", train_once, frame, model_path, cfg.train_window_bars)
+
+        decision = None
+        if decide:
+            from AI.decide import get_decider
+            decision = self._timed("decide", lambda: get_decider().decide())
+
+        out = {
+            "rows_fetched": len(fetched),
+            "dataset": {"mode": built["mode"], "rows": built["rows"], "version": built["version"]},
+            "cv_score": score,
+            "model_path": model_path,
+            "decision": decision,
+            "timings": dict(self.timings, total=round(sum(self.timings.values()), 3)),
+        }
+        print(f"[PIPELINE] {mode} | fetched={out['rows_fetched']} dataset={out['dataset']['mode']}"
+              f"({out['dataset']['rows']}) score≈{score:.4f} | timings={out['timings']}")
+        return out
+
+def run_pipeline(mode: str = "incremental", workers: int = 4, decide: bool = True) -> dict:
+    """1회성 실행 (CLI/hourly_update용)"""
+    return Pipeline().run(mode=mode, workers=workers, decide=decide)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mode", choices=["backfill", "incremental"], default="incremental")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--no-decide", action="store_true")
+    args = ap.parse_args()
+    res = run_pipeline(args.mode, args.workers, decide=not args.no_decide)
+    if res["decision"]:
+        print(res["decision"])
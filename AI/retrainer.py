@@ -0,0 +1,125 @@
+# AI/retrainer.py
+"""
+백그라운드 재학습 워커.
+- request()는 바로 반환하고, 워커 스레드가 Pipeline.run을 돌려 버전 붙은 모델 파일을 만든다
+  (models/versions/signal_1m_xgb-YYYYmmddTHHMMSS.joblib, git 무시 — 저장소의 models/*.joblib은 건드리지 않음)
+- sim 거래소에서는 가상 시계 시각까지 라벨이 확정된 행으로만 학습 (재생 중인 미래 봉 누수 방지)
+- 새 모델은 로딩 + 예측 검증을 통과해야 poll()로 넘어가고, 실패하면 파일을 지우고 기존 모델 유지
+- 교체는 main 루프가 결정 사이에 Decider.install()로 수행 → 학습 중 결정은 이전 모델 그대로
+"""
+import glob
+import os
+import threading
+import time
+import traceback
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+from joblib import load
+from AI.utils import load_config, FEATURES, model_versions_dir, active_model_path
+from AI.pipeline import Pipeline
+
+def versioned_model_path(model_path: str, ts: datetime | None = None) -> str:
+    """models/x.joblib → models/versions/x-20250101T120000.joblib"""
+    ts = ts or datetime.now(timezone.utc)
+    d = model_versions_dir(model_path)
+    os.makedirs(d, exist_ok=True)
+    stem, ext = os.path.splitext(os.path.basename(model_path))
+    return os.path.join(d, f"{stem}-{ts.strftime('%Y%m%dT%H%M%S')}{ext}")
+
+def _sim_now() -> pd.Timestamp:
+    """sim 거래소 가상 시계의 현재 시각 (UTC)"""
+    from infra.client import clock
+    return pd.Timestamp(clock.time(), unit="s", tz="UTC")
+
+def validate_model(path: str, sample: np.ndarray) -> None:
+    """로딩 후 sample로 predict_proba가 (n, 3) 유한 확률을 내는지 확인. 실패 시 예외"""
+    model = load(path)
+    proba = model.predict_proba(sample)
+    if proba.shape != (len(sample), 3):
+        raise ValueError(f"unexpected proba shape {proba.shape}")
+    if not np.isfinite(proba).all() or not np.allclose(proba.sum(axis=1), 1.0, atol=1e-3):
+        raise ValueError("invalid probabilities")
+
+class Retrainer:
+    """
+    재학습은 한 번에 하나만 실행. 결과는 poll()이 (경로, 결과 dict)로 한 번만 돌려준다.
+    keep: 보관할 버전 모델 수 (오래된 것부터 삭제)
+    """
+    def __init__(self, cfg=None, pipeline: Pipeline | None = None, keep: int = 3):
+        self.cfg = cfg or load_config()
+        self.pipeline = pipeline or Pipeline(self.cfg)
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._ready: tuple[str, dict] | None = None
+        self.last_error: str | None = None
+        self.last_run: dict | None = None
+
+    @property
+    def busy(self) -> bool:
+        t = self._thread
+        return t is not None and t.is_alive()
+
+    def request(self, mode: str = "incremental", workers: int = 4) -> bool:
+        """재학습 시작. 이미 실행 중이면 False"""
+        with self._lock:
+            if self.busy:
+                print("[RETRAIN] 이전 재학습이 아직 실행 중 → 이번 요청은 건너뜀")
+                return False
+            self._thread = threading.Thread(target=self._run, args=(mode, workers),
+                                            name="retrainer", daemon=True)
+            self._thread.start()
+            return True
+
+    def poll(self):
+        """검증 끝난 새 모델이 있으면 (path, result), 없으면 None"""
+        with self._lock:
+            ready, self._ready = self._ready, None
+        return ready
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """실행 중인 재학습이 끝날 때까지 대기 (CLI/시뮬레이터용). 끝났으면 True"""
+        t = self._thread
+        if t is not None:
+            t.join(timeout)
+        return not self.busy
+
+    def _run(self, mode: str, workers: int):
+        until = _sim_now() if self.cfg.exchange == "sim" else None
+        path = versioned_model_path(self.cfg.model_path, until)
+        t0 = time.perf_counter()
+        try:
+            res = self.pipeline.run(mode=mode, workers=workers, decide=False, model_path=path, until=until)
+            sample = self.pipeline.train_frame[FEATURES].tail(32).to_numpy(np.float32)
+            validate_model(path, sample)
+        except (Exception, SystemExit) as e:
+            # SystemExit: 파이프라인의 빈 데이터셋 종료도 워커 안에서만 실패로 처리
+            self.last_error = f"{type(e).__name__}: {e}"
+            print(f"[RETRAIN] 실패, 기존 모델 유지: {self.last_error}")
+            traceback.print_exc()
+            for p in (path, path + ".report.json"):
+                if os.path.exists(p):
+                    os.remove(p)
+            return
+
+        res["retrain_sec"] = round(time.perf_counter() - t0, 3)
+        self.last_error = None
+        self.last_run = res
+        with self._lock:
+            self._ready = (path, res)
+        print(f"[RETRAIN] 새 모델 준비 → {path} ({res['retrain_sec']}s)")
+        self._prune()
+
+    def _prune(self):
+        """버전 모델을 최근 keep개만 남김 (현재 포인터가 가리키는 모델은 유지)"""
+        stem, ext = os.path.splitext(os.path.basename(self.cfg.model_path))
+        paths = sorted(glob.glob(os.path.join(model_versions_dir(self.cfg.model_path),
+                                              f"{stem}-????????T??????{ext}")))
+        active = active_model_path(self.cfg.model_path)
+        for p in paths[:-self.keep] if self.keep > 0 else []:
+            if os.path.samefile(p, active):
+                continue
+            for f in (p, p + ".report.json"):
+                if os.path.exists(f):
+                    os.remove(f)
@@ -0,0 +1,259 @@
+# AI/stream_features.py
+"""
+compute_features()의 증분(스트리밍) 버전.
+분봉이 하나 닫힐 때마다 update()로 지표 상태만 갱신하고 마지막 행의 FEATURES를 돌려준다.
+"""
+import argparse
+import math
+from collections import deque
+import numpy as np
+import pandas as pd
+from AI.utils import load_config, compute_features, FEATURES
+from AI.kline_store import open_kline_store
+
+NAN = float("nan")
+EPS = 1e-12
+
+class _Rolling:
+    """
+    고정 길이 창의 합/제곱합(표본표준편차 ddof=1).
+    상쇄 오차를 줄이려고 기준값(shift)을 빼서 누적하고, 창 길이만큼 push 될 때마다 재계산.
+    """
+    def __init__(self, n: int):
+        self.n = n
+        self.buf = deque(maxlen=n)
+        self.shift = 0.0
+        self.s = 0.0
+        self.ss = 0.0
+        self._since = 0
+
+    def push(self, x: float):
+        if len(self.buf) == self.n:
+            d = self.buf[0] - self.shift
+            self.s -= d
+            self.ss -= d * d
+        self.buf.append(x)
+        d = x - self.shift
+        self.s += d
+        self.ss += d * d
+        self._since += 1
+        if self._since >= self.n:
+            self._rebase()
+
+    def _rebase(self):
+        self.shift = sum(self.buf) / len(self.buf)
+        self.s = sum(v - self.shift for v in self.buf)
+        self.ss = sum((v - self.shift) ** 2 for v in self.buf)
+        self._since = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self.buf) == self.n
+
+    def mean(self) -> float:
+        return self.shift + self.s / self.n if self.full else NAN
+
+    def std(self) -> float:
+        if not self.full:
+            return NAN
+        var = (self.ss - self.s * self.s / self.n) / (self.n - 1)
+        return math.sqrt(var) if var > 0 else 0.0
+
+class _RollingExtreme:
+    """단조 deque 기반 창 최소/최대 (amortized O(1))"""
+    def __init__(self, n: int, is_max: bool):
+        self.n = n
+        self.is_max = is_max
+        self.q = deque()  # (idx, value)
+        self.i = 0
+
+    def push(self, x: float):
+        q = self.q
+        if self.is_max:
+            while q and q[-1][1] <= x:
+                q.pop()
+        else:
+            while q and q[-1][1] >= x:
+                q.pop()
+        q.append((self.i, x))
+        if q[0][0] <= self.i - self.n:
+            q.popleft()
+        self.i += 1
+
+    def value(self) -> float:
+        return self.q[0][1] if self.i >= self.n else NAN
+
+class StreamingFeatures:
+    """
+    FEATURES를 봉 단위로 갱신하는 엔진.
+    - 지표마다 고정 크기 링버퍼/누적 상태만 유지 (창 길이 ≤ 30, 히스토리 길이와 무관)
+    - RSI는 ta와 같은 Wilder EMA(alpha=1/7, adjust=False) 재귀식
+    - CCI의 평균절대편차는 10개 버퍼에서 직접 계산
+    """
+    RSI_N, STOCH_N, CCI_N, VOL_N = 7, 7, 10, 10
+
+    def __init__(self):
+        self.n_bars = 0
+        self.last_time = None
+        self._log_close = deque(maxlen=6)
+        self._prev_close = None
+        self._vol10 = _Rolling(10)
+        self._vol30 = _Rolling(30)
+        self._ema_up = 0.0
+        self._ema_dn = 0.0
+        self._low_min = _RollingExtreme(self.STOCH_N, is_max=False)
+        self._high_max = _RollingExtreme(self.STOCH_N, is_max=True)
+        self._tp = deque(maxlen=self.CCI_N)
+        self._tp_sum = _Rolling(self.CCI_N)
+        self._volume = _Rolling(self.VOL_N)
+        self._buy_ratio = _Rolling(self.VOL_N)
+        self.features = {k: NAN for k in FEATURES}
+
+    def update(self, bar) -> dict:
+        """
+        닫힌 봉 1개 반영. bar: time/open/high/low/close/volume(/taker_buy_base) 키를 가진 mapping.
+        이미 반영된 시각 이하의 봉은 무시. 반환: 최신 FEATURES dict (준비 안 된 값은 NaN)
+        """
+        t = bar.get("time")
+        if t is not None and self.last_time is not None and t <= self.last_time:
+            return self.features
+        self.last_time = t
+
+        high, low, close = float(bar["high"]), float(bar["low"]), float(bar["close"])
+        volume = float(bar["volume"])
+        f = self.features
+
+        # 가격 기반
+        lc = math.log(close)
+        prev = self._log_close
+        f["ret_1"] = lc - prev[-1] if len(prev) >= 1 else NAN
+        f["ret_3"] = lc - prev[-3] if len(prev) >= 3 else NAN
+        f["ret_5"] = lc - prev[-5] if len(prev) >= 5 else NAN
+        diff = (close - self._prev_close) if self._prev_close is not None else NAN
+        prev.append(lc)
+        self._prev_close = close
+
+        if not math.isnan(f["ret_1"]):
+            self._vol10.push(f["ret_1"])
+            self._vol30.push(f["ret_1"])
+        f["vol_10"] = self._vol10.std()
+        f["vol_30"] = self._vol30.std()
+
+        # RSI(7): 첫 봉의 diff(NaN)는 ta와 동일하게 0으로 취급
+        self._rsi_push(diff)
+        # Stochastic %K(7)
+        self._low_min.push(low)
+        self._high_max.push(high)
+        lo, hi = self._low_min.value(), self._high_max.value()
+        f["stoch"] = 100.0 * (close - lo) / (hi - lo) if hi != lo else NAN
+        # CCI(10)
+        tp = (high + low + close) / 3.0
+        self._tp.append(tp)
+        self._tp_sum.push(tp)
+        if self._tp_sum.full:
+            m = self._tp_sum.mean()
+            mad = sum(abs(v - m) for v in self._tp) / self.CCI_N
+            f["cci_10"] = (tp - m) / (0.015 * mad) if mad > 0 else NAN
+        else:
+            f["cci_10"] = NAN
+
+        # 거래량 기반
+        self._volume.push(volume)
+        f["log_vol"] = math.log(volume + 1.0)
+        f["vol_ratio_1_10"] = volume / (self._volume.mean() + EPS)
+        f["vol_zscore_10"] = (volume - self._volume.mean()) / (self._volume.std() + EPS)
+
+        # 매수/매도 비율
+        tbb = bar.get("taker_buy_base")
+        if tbb is None:
+            f["buy_ratio"], f["sell_ratio"], f["buy_ratio_z10"] = 0.5, 0.5, 0.0
+        else:
+            br = min(max(float(tbb) / (volume + EPS), 0.0), 1.0)
+            self._buy_ratio.push(br)
+            f["buy_ratio"] = br
+            f["sell_ratio"] = 1.0 - br
+            f["buy_ratio_z10"] = (br - self._buy_ratio.mean()) / (self._buy_ratio.std() + EPS)
+
+        self.n_bars += 1
+        return f
+
+    def _rsi_push(self, diff: float):
+        a = 1.0 / self.RSI_N
+        up = diff if diff > 0 else 0.0
+        dn = -diff if diff < 0 else 0.0
+        if self.n_bars == 0:
+            self._ema_up, self._ema_dn = up, dn
+        else:
+            self._ema_up = (1 - a) * self._ema_up + a * up
+            self._ema_dn = (1 - a) * self._ema_dn + a * dn
+        if self.n_bars + 1 < self.RSI_N:
+            self.features["rsi_7"] = NAN
+        elif self._ema_dn == 0:
+            self.features["rsi_7"] = 100.0
+        else:
+            self.features["rsi_7"] = 100.0 - 100.0 / (1.0 + self._ema_up / self._ema_dn)
+
+    # ---------- 편의 함수 ----------
+    @property
+    def ready(self) -> bool:
+        return all(math.isfinite(v) for v in self.features.values())
+
+    def vector(self) -> np.ndarray:
+        """FEATURES 순서의 (1, n_features) 배열 (모델 입력용)"""
+        return np.array([[self.features[k] for k in FEATURES]], dtype=np.float64)
+
+    def warmup(self, df: pd.DataFrame) -> "StreamingFeatures":
+        """과거 분봉 DataFrame(time 오름차순)으로 상태 초기화"""
+        cols = ["time", "high", "low", "close", "volume"]
+        if "taker_buy_base" in df.columns:
+            cols.append("taker_buy_base")
+        for row in df.sort_values("time")[cols].itertuples(index=False):
+            self.update(row._asdict())
+        return self
+
+    @classmethod
+    def from_parquet(cls, path: str | None = None, bars: int = 1000) -> "StreamingFeatures":
+        """저장된 분봉(파티션 저장소, 또는 path의 단일 parquet)의 최근 bars개로 워밍업한 엔진 생성"""
+        if path is None:
+            df = open_kline_store(load_config()).tail(bars)
+        else:
+            df = pd.read_parquet(path).sort_values("time").tail(bars)
+        return cls().warmup(df)
+
+def check_parity(df: pd.DataFrame, rtol: float = 1e-6, atol: float = 1e-8) -> dict:
+    """compute_features()와 봉 단위 스트리밍 결과의 피처별 최대 오차"""
+    ref = compute_features(df)
+    eng = StreamingFeatures()
+    got = []
+    for row in df.sort_values("time").itertuples(index=False):
+        got.append([eng.update(row._asdict())[k] for k in FEATURES])
+    got = np.asarray(got)
+
+    out = {}
+    for j, k in enumerate(FEATURES):
+        a, b = ref[k].to_numpy(dtype=float), got[:, j]
+        mask = np.isfinite(a) & np.isfinite(b)
+        nan_mismatch = int((np.isfinite(a) != np.isfinite(b)).sum())
+        err = np.abs(a[mask] - b[mask])
+        ok = bool(np.all(err <= atol + rtol * np.abs(a[mask]))) and nan_mismatch == 0
+        out[k] = {"max_abs_err": float(err.max()) if err.size else 0.0,
+                  "nan_mismatch": nan_mismatch, "ok": ok}
+    return out
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--check", action="store_true", help="pandas 구현과 수치 비교")
+    ap.add_argument("--bars", type=int, default=5000)
+    args = ap.parse_args()
+
+    cfg = load_config()
+    df = open_kline_store(cfg).tail(args.bars)
+    if args.check:
+        res = check_parity(df)
+        for k, v in res.items():
+            print(f"{k:16s} max_abs_err={v['max_abs_err']:.3e} nan_mismatch={v['nan_mismatch']} ok={v['ok']}")
+        if not all(v["ok"] for v in res.values()):
+            raise SystemExit(1)
+    else:
+        eng = StreamingFeatures().warmup(df)
+        print(eng.last_time, eng.features)
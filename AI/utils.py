@@ -1,4 +1,6 @@
 import os
+import json
+import hashlib
 from datetime import datetime, timezone
 from dataclasses import dataclass
 from typing import Optional
@@ -7,6 +9,7 @@ import numpy as np
 import yaml
 from dotenv import load_dotenv
 from binance.um_futures import UMFutures
+from infra.rate_limit import RateLimitedClient, get_governor
 import pathlib
 load_dotenv()
 
@@ -25,6 +28,8 @@ class Config:
     taker_fee_each: float
     slippage: float
     use_testnet: bool
+    store_path: str
+    exchange: str = "binance"  # "binance" | "sim" (env EXCHANGE가 있으면 그 값)
 
 def load_config(path: str = None) -> Config:
     if path is None:
@@ -50,14 +55,53 @@ def load_config(path: str = None) -> Config:
         min_conf=float(cfg["min_conf"]),
         taker_fee_each=float(cfg["taker_fee_each"]),
         slippage=float(cfg["slippage"]),
-        use_testnet=use_testnet
+        use_testnet=use_testnet,
+        store_path=str(pathlib.Path(path).parent / cfg.get("store_path", "data/klines/btcusdt_1m")),
+        exchange=(os.getenv("EXCHANGE") or cfg.get("exchange", "binance")).lower(),
     )
 
-def get_um_client(use_testnet: bool) -> UMFutures:
+def get_um_client(use_testnet: bool, exchange: str | None = None) -> UMFutures:
+    if (exchange or load_config().exchange) == "sim":
+        # 시뮬레이터 모드: 거래 모듈과 같은 가상 거래소/시계를 공유
+        from infra.client import um
+        return um
     base_url = "https://testnet.binancefuture.com" if use_testnet else "https://fapi.binance.com"
     key = os.getenv("BINANCE_API_KEY", "")
     sec = os.getenv("BINANCE_API_SECRET", "")
-    return UMFutures(key=key, secret=sec, base_url=base_url)
+    # 같은 호스트를 쓰는 거래 루프와 weight 한도(RateGovernor)를 공유
+    return RateLimitedClient(UMFutures(key=key, secret=sec, base_url=base_url, show_limit_usage=True),
+                             get_governor(base_url, limit=int(os.getenv("REST_WEIGHT_LIMIT", "2400"))))
+
+# ---------- 모델 버전 ----------
+# 재학습 결과는 model_path 옆 versions/(git 무시)에 버전 파일로 쌓고,
+# versions/<모델 파일명>.current 포인터(버전 파일 이름 한 줄)로 현재 모델을 가리킨다.
+# 포인터가 없으면 저장소에 있는 model_path 그대로.
+def model_versions_dir(model_path: str) -> str:
+    return os.path.join(os.path.dirname(model_path), "versions")
+
+def _pointer_path(model_path: str) -> str:
+    return os.path.join(model_versions_dir(model_path), os.path.basename(model_path) + ".current")
+
+def active_model_path(model_path: str) -> str:
+    """포인터가 가리키는 버전 모델 경로 (포인터가 없거나 대상이 사라졌으면 model_path)"""
+    try:
+        with open(_pointer_path(model_path)) as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return model_path
+    path = os.path.join(model_versions_dir(model_path), name)
+    return path if name and os.path.exists(path) else model_path
+
+def set_active_model(model_path: str, version_path: str):
+    """포인터를 version_path(versions/ 안의 파일)로 원자 교체"""
+    d = model_versions_dir(model_path)
+    if os.path.dirname(os.path.abspath(version_path)) != os.path.abspath(d):
+        raise ValueError(f"{version_path}: 버전 모델은 {d} 안에 있어야 함")
+    pointer = _pointer_path(model_path)
+    tmp = pointer + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(os.path.basename(version_path) + "\n")
+    os.replace(tmp, pointer)
 
 def utc_now_ms() -> int:
     return int(datetime.now(timezone.utc).timestamp() * 1000)
@@ -135,6 +179,12 @@ def make_labels(df: pd.DataFrame, horizon: int, theta: float) -> pd.DataFrame:
     df.reset_index(inplace=True)
     return df
 
+# compute_features/make_labels 계산식을 바꾸면 올릴 것 (피처 저장소 전체 재빌드 트리거)
+FEATURE_IMPL_VERSION = 1
+
+# compute_features 중 가장 긴 의존 구간(봉). RSI의 EMA 기억까지 감안해 넉넉히 잡음
+FEATURE_LOOKBACK_BARS = 300
+
 FEATURES = [
     # 가격/변동성
     "ret_1","ret_3","ret_5","vol_10","vol_30",
@@ -145,3 +195,9 @@ FEATURES = [
     # 매수/매도 비율
     "buy_ratio","sell_ratio","buy_ratio_z10"
 ]
+
+def feature_version(cfg: Config) -> str:
+    """피처 목록 + 라벨 파라미터 + 구현 버전의 해시 (저장된 데이터셋 호환성 판별용)"""
+    spec = json.dumps({"features": FEATURES, "impl": FEATURE_IMPL_VERSION,
+                       "horizon": cfg.horizon, "theta": cfg.theta}, sort_keys=True)
+    return hashlib.sha256(spec.encode()).hexdigest()[:16]
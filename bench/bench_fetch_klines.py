@@ -0,0 +1,40 @@
+# bench/bench_fetch_klines.py
+"""
+fetch_range(순차) vs fetch_range_concurrent(병렬) 벽시계 시간 비교.
+로컬 MockKlineServer를 대상으로 실행하므로 네트워크/API 키가 필요 없다.
+
+  python -m bench.bench_fetch_klines --days 30 --latency 0.05 --workers 8
+"""
+import argparse
+import time
+from binance.um_futures import UMFutures
+from AI.fetch_klines import fetch_range, fetch_range_concurrent
+from bench.mock_kline_server import MockKlineServer, STEP_MS
+
+def run(days: int, latency: float, workers: int) -> dict:
+    end_ms = (1_735_689_600_000 // STEP_MS) * STEP_MS  # 2025-01-01 UTC (고정)
+    start_ms = end_ms - days * 1440 * STEP_MS
+    out = {"days": days, "bars": days * 1440, "latency_sec": latency, "workers": workers}
+    with MockKlineServer(latency_sec=latency) as srv:
+        client = UMFutures(base_url=srv.base_url)
+
+        t0 = time.perf_counter()
+        seq = fetch_range(client, "BTCUSDT", "1m", start_ms, end_ms)
+        out["sequential_sec"] = round(time.perf_counter() - t0, 3)
+
+        t0 = time.perf_counter()
+        par = fetch_range_concurrent(client, "BTCUSDT", "1m", start_ms, end_ms, workers=workers)
+        out["concurrent_sec"] = round(time.perf_counter() - t0, 3)
+
+    out["rows"] = [len(seq), len(par)]
+    out["identical"] = bool(seq.reset_index(drop=True).equals(par.reset_index(drop=True)))
+    out["speedup"] = round(out["sequential_sec"] / max(out["concurrent_sec"], 1e-9), 2)
+    return out
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--days", type=int, default=30)
+    ap.add_argument("--latency", type=float, default=0.05, help="mock 서버 요청당 지연(초)")
+    ap.add_argument("--workers", type=int, default=8)
+    args = ap.parse_args()
+    print(run(args.days, args.latency, args.workers))
@@ -0,0 +1,67 @@
+# bench/mock_kline_server.py
+"""
+네트워크 없이 REST klines를 흉내 내는 로컬 HTTP 서버 (벤치마크용).
+GET /fapi/v1/klines 에 결정적(seed 고정) 합성 분봉을 돌려주고, 요청마다 latency_sec 만큼 지연.
+"""
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+STEP_MS = 60_000
+
+def synth_kline(open_ms: int) -> list:
+    """open_time만으로 결정되는 합성 1m 봉 (REST klines 행 형식)"""
+    i = open_ms // STEP_MS
+    c = 30000.0 + 500.0 * math.sin(i / 720.0) + 20.0 * math.sin(i / 7.0)
+    o = 30000.0 + 500.0 * math.sin((i - 1) / 720.0) + 20.0 * math.sin((i - 1) / 7.0)
+    h, l = max(o, c) + 3.0, min(o, c) - 3.0
+    v = 50.0 + 30.0 * abs(math.sin(i / 13.0))
+    return [open_ms, f"{o:.2f}", f"{h:.2f}", f"{l:.2f}", f"{c:.2f}", f"{v:.3f}",
+            open_ms + STEP_MS - 1, f"{v * c:.2f}", 100, f"{v * 0.5:.3f}", f"{v * c * 0.5:.2f}", "0"]
+
+class _Handler(BaseHTTPRequestHandler):
+    latency_sec = 0.05
+    now_ms = None
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/fapi/v1/klines":
+            self.send_response(404)
+            self.end_headers()
+            return
+        q = {k: v[0] for k, v in parse_qs(url.query).items()}
+        limit = int(q.get("limit", 500))
+        end_ms = int(q.get("endTime", self.now_ms or int(time.time() * 1000)))
+        start_ms = int(q["startTime"]) if "startTime" in q else end_ms - limit * STEP_MS
+        first = -(-start_ms // STEP_MS) * STEP_MS
+        rows = [synth_kline(t) for t in range(first, end_ms + 1, STEP_MS)][:limit]
+
+        time.sleep(self.latency_sec)
+        body = json.dumps(rows).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+class MockKlineServer:
+    """with MockKlineServer(latency_sec=0.05) as srv: UMFutures(base_url=srv.base_url)"""
+    def __init__(self, latency_sec: float = 0.05, host: str = "127.0.0.1", port: int = 0):
+        handler = type("Handler", (_Handler,), {"latency_sec": latency_sec})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.base_url = f"http://{host}:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,347 @@
+# bench/run.py
+"""
+결정/주문 준비 hot path 오프라인 벤치마크 (네트워크/API 키 불필요).
+
+- compute_features / compute_features_np / make_labels : 입력 봉 수별 (기본 120 ~ 10k)
+- predict_proba / FastPredictor        : 1행(decide_action과 같은 형태) + 봉 수만큼 배치
+- Decider.decide                       : klines → 피처 → 추론 (REST 경로, 창 크기 ≤ 1500 = klines limit)
+- get_rounders / prepare_order_params_from_margin / limit_price_from_book
+- open_position                        : 진입 LIMIT → 체결 확인 → SL/TP batch 까지 1회 (끝나면 청산, 측정 제외)
+
+거래소는 EXCHANGE=sim 의 SimExchange(프로세스 내)로 대신하고, 입력은 fixture:
+  bench/fixtures/exchange_info_BTCUSDT.json  심볼 필터 (SIM_EXCHANGE_INFO)
+  bench/fixtures/depth_BTCUSDT.json          호가 스냅샷 (마지막 종가 기준으로 옮겨서 사용)
+  bench/fixtures/klines_BTCUSDT_1m.parquet   분봉 10,000개 (없거나 --sizes보다 짧으면 실패).
+                                             커밋된 파일은 실거래 녹화가 아니라 bench.mock_kline_server의
+                                             합성 봉을 고정한 것 (parquet 메타데이터 klines_source=synthetic)
+fixture 갱신은 --record (공개 REST만 사용), 합성 봉 fixture는 --record --synthetic (네트워크 없음).
+결과의 klines_source(synthetic 또는 fixture 경로)가 다르면 --compare에서 경고.
+기본 --sizes 상한은 커밋된 fixture 길이(10k). 150k 등 더 큰 입력은 --record --record-bars 150000 후
+--sizes로 지정하거나 --synthetic.
+
+결과는 bench/results/<커밋>.json 으로 저장. --compare 로 이전 결과와 비교해 느려진 항목을 표시.
+
+  python -m bench.run [--sizes 120,1000,10000] [--repeat 5] [--compare bench/results/abc1234.json]
+  python -m bench.run --synthetic        # fixture 없이 합성 봉으로
+  python -m bench.run --record [--record-bars 150000]
+  python -m bench.run --record --synthetic   # 커밋된 합성 봉 fixture 다시 만들기
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, "fixtures")
+RESULTS = os.path.join(HERE, "results")
+SYMBOL = "BTCUSDT"
+EXCHANGE_INFO = os.path.join(FIXTURES, f"exchange_info_{SYMBOL}.json")
+DEPTH = os.path.join(FIXTURES, f"depth_{SYMBOL}.json")
+KLINES = os.path.join(FIXTURES, f"klines_{SYMBOL}_1m.parquet")
+
+DEFAULT_SIZES = [120, 1000, 10_000]  # 상한 = 커밋된 klines fixture 길이
+KLINES_LIMIT = 1500     # GET /fapi/v1/klines 최대 limit → decide 창 상한
+END_MS = 1_735_689_600_000  # 합성 봉 끝 (2025-01-01 UTC, 고정)
+
+# ---------- fixture ----------
+def synth_klines(n: int, end_ms: int = END_MS):
+    """bench.mock_kline_server.synth_kline으로 end_ms 직전까지 n개 봉 (저장소와 같은 컬럼)"""
+    import pandas as pd
+    from bench.mock_kline_server import synth_kline, STEP_MS
+
+    rows = [synth_kline(end_ms - (n - i) * STEP_MS) for i in range(n)]
+    df = pd.DataFrame({"time": pd.to_datetime([r[0] for r in rows], unit="ms", utc=True)})
+    for c, k in (("open", 1), ("high", 2), ("low", 3), ("close", 4), ("volume", 5), ("taker_buy_base", 9)):
+        df[c] = [float(r[k]) for r in rows]
+    return df
+
+def load_klines(n: int, path: str | None, synthetic: bool = False):
+    """
+    분봉 fixture(path 또는 기본 fixture)의 마지막 n개와 출처. synthetic=True면 합성 봉.
+    출처는 parquet 메타데이터 klines_source(합성 fixture면 "synthetic"), 없으면 파일 경로.
+    fixture가 없거나 n개보다 짧으면 조용히 합성 봉으로 바꾸지 않고 종료 (측정 입력이 바뀌면 비교가 무의미)
+    """
+    import pandas as pd
+
+    if synthetic:
+        return synth_klines(n), "synthetic"
+    path = path or KLINES
+    if not os.path.exists(path):
+        raise SystemExit(f"[BENCH] 녹화 분봉 fixture 없음: {path}\n"
+                         f"        python -m bench.run --record 로 녹화하거나 --synthetic 으로 합성 봉 사용")
+    source = path
+    if path.endswith((".csv", ".csv.gz")):
+        df = pd.read_csv(path)
+    else:
+        import pyarrow.parquet as pq
+
+        df = pd.read_parquet(path)
+        meta = pq.read_schema(path).metadata or {}
+        source = meta.get(b"klines_source", b"").decode() or path
+    if len(df) < n:
+        raise SystemExit(f"[BENCH] {path}: {len(df)}봉 < {n}\n"
+                         f"        --record --record-bars {n} 로 다시 녹화하거나 --sizes를 줄이거나 --synthetic 사용")
+    df["time"] = pd.to_datetime(df["time"], utc=True)
+    return df.sort_values("time").tail(n).reset_index(drop=True), source
+
+def recentered_depth(last_price: float, tick: float) -> dict:
+    """녹화 호가를 최우선 bid가 last_price 아래 tick 격자에 오도록 평행 이동"""
+    with open(DEPTH) as f:
+        ob = json.load(f)
+    bid0 = float(ob["bids"][0][0])
+    shift = round((last_price // tick) * tick - bid0, 8)
+    dec = max(0, len(f"{tick:.10f}".rstrip("0").split(".")[1]))
+    move = lambda side: [[f"{float(p) + shift:.{dec}f}", q] for p, q in ob[side]]
+    return {**ob, "bids": move("bids"), "asks": move("asks")}
+
+def save_klines(df, path: str, source: str | None = None):
+    """분봉 fixture 저장. source를 주면 parquet 메타데이터 klines_source로 남김 (load_klines가 결과에 기록)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(df[["time", "open", "high", "low", "close", "volume", "taker_buy_base"]],
+                                 preserve_index=False)
+    if source:
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"klines_source": source.encode()})
+    pq.write_table(table, path)
+
+def record(symbol: str, bars: int, synthetic: bool = False):
+    """
+    실거래소 공개 REST로 fixture 갱신 (exchange_info 심볼 항목, depth 20, 최근 분봉).
+    synthetic=True면 분봉 fixture만 합성 봉으로 다시 만듦 (네트워크 없음)
+    """
+    if synthetic:
+        save_klines(synth_klines(bars), KLINES, source="synthetic")
+        print(f"[BENCH] wrote {KLINES} ({bars} synthetic bars)")
+        return
+    from binance.um_futures import UMFutures
+    from AI.fetch_klines import fetch_range
+
+    client = UMFutures(base_url=os.getenv("BASE_URL", "https://fapi.binance.com"))
+    ex = client.exchange_info()
+    ex["symbols"] = [s for s in ex["symbols"] if s["symbol"] == symbol]
+    with open(EXCHANGE_INFO, "w") as f:
+        json.dump(ex, f, indent=2)
+    with open(DEPTH, "w") as f:
+        json.dump(client.depth(symbol=symbol, limit=20), f)
+    end_ms = (int(time.time() * 1000) // 60_000) * 60_000
+    df = fetch_range(client, symbol, "1m", end_ms - bars * 60_000, end_ms)
+    save_klines(df, KLINES)
+    print(f"[BENCH] recorded {EXCHANGE_INFO}, {DEPTH}, {KLINES} ({len(df)} bars)")
+
+# ---------- 측정 ----------
+def measure(fn, repeat: int, number: int | None = None) -> dict:
+    """fn을 number회씩 repeat번 → 1회당 min/median(ms). number=None이면 0.2초 이상 걸리도록 자동"""
+    t = timeit.Timer(fn)
+    if number is None:
+        number, _ = t.autorange()
+    runs = [x / number * 1000 for x in t.repeat(repeat=repeat, number=number)]
+    return {"min_ms": round(min(runs), 4), "median_ms": round(statistics.median(runs), 4),
+            "number": number, "repeat": repeat}
+
+def _quiet():
+    """대상 함수의 [SL]/[TP] 등 로그를 측정 중에는 버림"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+def bench_frames(sizes: list[int], repeat: int, klines_path: str | None,
+                 synthetic: bool = False) -> tuple[dict, str]:
+    from joblib import load
+    from AI.utils import load_config, compute_features, make_labels, FEATURES
+    from AI.inference import FastPredictor
+    from AI.features_np import compute_features_np
+
+    cfg = load_config()
+    model = load(cfg.model_path)
+    fast = FastPredictor(model)
+    full, source = load_klines(max(sizes), klines_path, synthetic)
+    out = {"compute_features": {}, "compute_features_np": {}, "make_labels": {}, "predict_proba": {},
+           "fast_predict": {}}
+    for n in sizes:
+        df = full.tail(n).reset_index(drop=True)
+        print(f"[BENCH] frames n={n}")
+        out["compute_features"][n] = measure(lambda: compute_features(df), repeat, 1 if n >= 10_000 else None)
+        out["compute_features_np"][n] = measure(lambda: compute_features_np(df), repeat,
+                                                1 if n >= 10_000 else None)
+        out["make_labels"][n] = measure(lambda: make_labels(df, cfg.horizon, cfg.theta), repeat,
+                                        1 if n >= 10_000 else None)
+        x = compute_features(df).dropna(subset=FEATURES)[FEATURES].values
+        if len(x):
+            out["predict_proba"][n] = measure(lambda: model.predict_proba(x), repeat, 1 if n >= 10_000 else None)
+            out["fast_predict"][n] = measure(lambda: fast.predict_batch(x), repeat, 1 if n >= 10_000 else None)
+    x1 = x[-1:]
+    out["predict_proba"]["1row"] = measure(lambda: model.predict_proba(x1), repeat)
+    out["fast_predict"]["1row"] = measure(lambda: fast.predict_one(x1), repeat)
+    return out, source
+
+def bench_decide(sizes: list[int], repeat: int) -> dict:
+    from infra.client import um
+    from AI.decide import Decider
+
+    with _quiet():
+        d = Decider(client=um)
+    out = {}
+    for w in sorted({min(n, KLINES_LIMIT) for n in sizes}):
+        print(f"[BENCH] decide window={w}")
+        r = measure(lambda: d.decide(window=w), repeat)
+        timings = [d.decide(window=w)["timing"] for _ in range(repeat)]
+        r["stages_median_ms"] = {k: round(statistics.median(t[k] for t in timings), 4) for k in timings[0]}
+        out[w] = r
+    return out
+
+def bench_orders(repeat: int, iterations: int) -> dict:
+    from infra.client import um, clock
+    from trading.precision import get_rounders, get_tick_size
+    from trading.orders import (prepare_order_params_from_margin, limit_price_from_book, open_position,
+                                close_position_market, cancel_protective_orders)
+
+    price = um.last_price
+    tick = get_tick_size(SYMBOL)
+    ob = recentered_depth(price, tick)
+    out = {
+        "get_rounders": measure(lambda: get_rounders(SYMBOL), repeat),
+        "prepare_order_params_from_margin": measure(
+            lambda: prepare_order_params_from_margin(SYMBOL, 500.0, 20, price), repeat),
+        "limit_price_from_book": measure(lambda: limit_price_from_book(SYMBOL, ob, "BUY", True, 1), repeat),
+    }
+
+    # 테이커 가격(최저 ask)으로 넣어 즉시 체결 → 체결 대기 루프는 1회로 끝남
+    entry = limit_price_from_book(SYMBOL, ob, "BUY", False, 0)
+    runs = []
+    print(f"[BENCH] open_position x{iterations}")
+    for _ in range(iterations):
+        with _quiet():
+            t0 = time.perf_counter()
+            qty, sl, tp = open_position(SYMBOL, "BUY", 500.0, 20, entry)
+            runs.append((time.perf_counter() - t0) * 1000)
+            if not (qty and sl and tp):
+                raise RuntimeError("open_position 실패 (fixture/시뮬 설정 확인)")
+            cancel_protective_orders(SYMBOL)
+            close_position_market(SYMBOL)
+        clock.sleep(1)
+    out["open_position"] = {"min_ms": round(min(runs), 4), "median_ms": round(statistics.median(runs), 4),
+                            "number": 1, "repeat": iterations}
+    return out
+
+# ---------- 결과 ----------
+def git_rev() -> tuple[str, bool]:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                             text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=HERE,
+                                    capture_output=True, text=True).stdout.strip())
+        return rev, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "nogit", False
+
+def _flatten(res: dict, prefix: str = "") -> dict:
+    """{"compute_features": {"120": {...}}} → {"compute_features/120": median_ms}"""
+    out = {}
+    for k, v in res.items():
+        key = f"{prefix}{k}"
+        if isinstance(v, dict) and "median_ms" in v:
+            out[key] = v["median_ms"]
+        elif isinstance(v, dict):
+            out.update(_flatten(v, key + "/"))
+    return out
+
+def compare(cur: dict, base_path: str, threshold: float) -> list[str]:
+    """이전 결과 대비 median 비율. threshold배 이상 느려진 항목 목록 반환"""
+    with open(base_path) as f:
+        base = json.load(f)
+    a, b = _flatten(base["results"]), _flatten(cur["results"])
+    src_a, src_b = base.get("klines_source"), cur.get("klines_source")
+    if "synthetic" in (src_a, src_b) and src_a != src_b:
+        print(f"[BENCH] 경고: 분봉 입력이 다름 ({src_a} vs {src_b}) — frames 비교는 참고만")
+    slower = []
+    print(f"\n{'benchmark':48s} {base['commit']:>12s} {cur['commit']:>12s}  ratio")
+    for k in sorted(set(a) & set(b)):
+        ratio = b[k] / a[k] if a[k] > 0 else float("inf")
+        flag = "  SLOWER" if ratio >= threshold else ""
+        print(f"{k:48s} {a[k]:12.4f} {b[k]:12.4f}  {ratio:5.2f}x{flag}")
+        if flag:
+            slower.append(k)
+    return slower
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="입력 봉 수 목록 (쉼표)")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--open-iterations", type=int, default=20)
+    ap.add_argument("--klines", default=None, help="녹화 분봉 파일 (.parquet/.csv, 기본 fixture)")
+    ap.add_argument("--synthetic", action="store_true",
+                    help="fixture 대신 합성 봉 (결과에 klines_source=synthetic). --record와 함께면 합성 fixture 생성")
+    ap.add_argument("--only", default=None, help="frames,decide,orders 중 일부만 (쉼표)")
+    ap.add_argument("--out", default=None, help="결과 JSON 경로 (기본 bench/results/<커밋>.json)")
+    ap.add_argument("--compare", default=None, help="비교할 이전 결과 JSON")
+    ap.add_argument("--threshold", type=float, default=1.2, help="이 배율 이상 느려지면 실패(exit 1)")
+    ap.add_argument("--record", action="store_true", help="실거래소에서 fixture 녹화 후 종료")
+    ap.add_argument("--record-bars", type=int, default=max(DEFAULT_SIZES), help="기본 --sizes를 덮는 봉 수")
+    args = ap.parse_args()
+
+    if args.record:
+        record(SYMBOL, args.record_bars, args.synthetic)
+        return
+
+    sizes = sorted(int(s) for s in args.sizes.split(","))
+    only = set(args.only.split(",")) if args.only else {"frames", "decide", "orders"}
+    if "infra.client" in sys.modules:
+        raise SystemExit("bench.run은 infra.client보다 먼저 로딩돼야 함 (EXCHANGE=sim 설정)")
+
+    import pandas as pd
+
+    # 시뮬 거래소: decide 창 + 워밍업만큼의 분봉을 fixture로 쓰고, 마지막 봉이 닫힌 시점부터 재생
+    n_sim = KLINES_LIMIT + 400
+    sim_df, source = load_klines(n_sim, args.klines, args.synthetic)
+    tmp = tempfile.TemporaryDirectory(prefix="bench_")
+    sim_path = os.path.join(tmp.name, "klines.parquet")
+    sim_df.to_parquet(sim_path, index=False)
+    os.environ.update({
+        "EXCHANGE": "sim", "SIM_KLINES": sim_path, "SIM_EXCHANGE_INFO": EXCHANGE_INFO,
+        "SIM_START": (sim_df["time"].iloc[-1] + pd.Timedelta(minutes=1)).strftime("%Y-%m-%dT%H:%M:%S"),
+        "SIM_END": "", "SIM_BALANCE": "100000",
+        "USE_USER_STREAM": "false", "USE_MARKET_STREAM": "false", "USE_ORDER_BOOK": "false",
+        "ACCOUNT_TRADES": ":memory:", "TRADE_JOURNAL": os.path.join(tmp.name, "trades.sqlite3"),
+    })
+
+    rev, dirty = git_rev()
+    out = {
+        "commit": rev + ("-dirty" if dirty else ""),
+        "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "sizes": sizes,
+        "klines_source": source,
+        "results": {},
+    }
+    if "frames" in only:
+        out["results"]["frames"], out["klines_source"] = bench_frames(sizes, args.repeat, args.klines,
+                                                                     args.synthetic)
+    if "decide" in only:
+        out["results"]["decide"] = bench_decide(sizes, args.repeat)
+    if "orders" in only:
+        out["results"]["orders"] = bench_orders(args.repeat, args.open_iterations)
+    tmp.cleanup()
+
+    path = args.out or os.path.join(RESULTS, f"{out['commit']}.json")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(out, f, indent=2)
+    for k, v in _flatten(out["results"]).items():
+        print(f"{k:48s} {v:12.4f} ms")
+    print(f"[BENCH] saved {path}")
+
+    if args.compare and compare(out, args.compare, args.threshold):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+# infra/aio_client.py
+"""
+asyncio용 Futures REST 클라이언트.
+- aiohttp 세션 1개(keep-alive 커넥션 풀)를 재사용, HMAC-SHA256 서명은 UMFutures와 동일
+- 메서드 이름/인자/응답/예외(ClientError, ServerError)는 UMFutures와 같게 맞춤
+  (단, get_open_orders는 orderId 없으면 /openOrders 전체, get_orders는 /allOrders — REST 의미 그대로)
+- 호출마다 infra.metrics에 지연/에러/weight 기록 (동기 um과 같은 엔드포인트 이름)
+- 동기 코드에서는 run_sync(coro)로 백그라운드 이벤트 루프 스레드에서 실행
+- EXCHANGE=sim이면 SimExchange를 감싼 AsyncSimClient를 돌려줌 (네트워크 없음)
+
+  from infra.aio_client import aum, run_sync
+  pos, bal = run_sync(asyncio.gather(aum().get_position_risk(symbol="BTCUSDT"), aum().balance()))
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import threading
+import time
+from urllib.parse import urlencode
+from binance.error import ClientError, ServerError
+from infra.client import um, clock, API_KEY, API_SECRET, BASE_URL, EXCHANGE
+from infra.rate_limit import request_weight, order_count, current_priority, get_governor
+from infra.metrics import metrics, error_label
+
+# 메서드 → (HTTP method, path, signed)
+ENDPOINTS = {
+    "new_order":          ("POST",   "/fapi/v1/order", True),
+    "new_batch_order":    ("POST",   "/fapi/v1/batchOrders", True),
+    "get_order":          ("GET",    "/fapi/v1/order", True),
+    "cancel_order":       ("DELETE", "/fapi/v1/order", True),
+    "cancel_batch_order": ("DELETE", "/fapi/v1/batchOrders", True),
+    "cancel_open_orders": ("DELETE", "/fapi/v1/allOpenOrders", True),
+    "get_open_orders":    ("GET",    "/fapi/v1/openOrders", True),
+    "get_orders":         ("GET",    "/fapi/v1/allOrders", True),
+    "get_position_risk":  ("GET",    "/fapi/v2/positionRisk", True),
+    "balance":            ("GET",    "/fapi/v2/balance", True),
+    "account":            ("GET",    "/fapi/v2/account", True),
+    "get_account_trades": ("GET",    "/fapi/v1/userTrades", True),
+    "change_leverage":    ("POST",   "/fapi/v1/leverage", True),
+    "change_margin_type": ("POST",   "/fapi/v1/marginType", True),
+    "exchange_info":      ("GET",    "/fapi/v1/exchangeInfo", False),
+    "ticker_price":       ("GET",    "/fapi/v1/ticker/price", False),
+    "depth":              ("GET",    "/fapi/v1/depth", False),
+    "klines":             ("GET",    "/fapi/v1/klines", False),
+}
+
+def _encode(params: dict) -> str:
+    """UMFutures와 같은 쿼리 인코딩 (None 제거, 리스트 값은 JSON 배열 문자열)"""
+    out = {}
+    for k, v in params.items():
+        if v is None:
+            continue
+        out[k] = json.dumps(v, separators=(",", ":")) if isinstance(v, (list, dict)) else v
+    return urlencode(out, True).replace("%40", "@")
+
+class AsyncUMFutures:
+    """
+    aiohttp 기반 비동기 클라이언트. 세션은 처음 요청하는 이벤트 루프에서 만든다.
+    budget: 공유 RateGovernor (기본: 동기 um과 같은 governor — 우선순위/응답 헤더/429 정지 공유)
+    """
+    def __init__(self, key: str | None = API_KEY, secret: str | None = API_SECRET,
+                 base_url: str = BASE_URL, timeout: float = 10.0, pool_size: int = 20,
+                 budget=None):
+        self.key = key or ""
+        self.secret = secret or ""
+        self.base_url = base_url
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.budget = budget if budget is not None else (getattr(um, "budget", None) or get_governor(base_url))
+        self._session = None
+
+    async def _get_session(self):
+        import aiohttp
+
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"Content-Type": "application/json;charset=utf-8",
+                         "X-MBX-APIKEY": self.key},
+            )
+        return self._session
+
+    async def _acquire(self, weight: int, prio: int, orders: int):
+        if not (weight or orders):
+            return
+        # 동기 acquire처럼 대기 중에는 _waiting에 잡혀 있어야 하위 우선순위(폴링/백필)가 양보함
+        self.budget.enter(prio)
+        try:
+            while True:
+                wait = self.budget.try_acquire(weight, prio, orders)
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+        finally:
+            self.budget.leave(prio)
+
+    async def request(self, name: str, **params):
+        method, path, signed = ENDPOINTS[name]
+        if name == "get_open_orders" and params.get("orderId") is not None:
+            path = "/fapi/v1/openOrder"
+        weight = request_weight(name, params)
+        await self._acquire(weight, current_priority(name), order_count(name, params))
+
+        t0 = time.perf_counter()
+        try:
+            out = await self._send(method, path, signed, params)
+        except Exception as e:
+            metrics.observe_call(name, time.perf_counter() - t0, weight, error_label(e))
+            raise
+        metrics.observe_call(name, time.perf_counter() - t0, weight)
+        return out
+
+    async def _send(self, method: str, path: str, signed: bool, params: dict):
+        query = _encode(params)
+        if signed:
+            query = f"{query}&timestamp={int(time.time() * 1000)}" if query else f"timestamp={int(time.time() * 1000)}"
+            sig = hmac.new(self.secret.encode(), query.encode(), hashlib.sha256).hexdigest()
+            query = f"{query}&signature={sig}"
+        url = f"{self.base_url}{path}?{query}" if query else f"{self.base_url}{path}"
+
+        session = await self._get_session()
+        async with session.request(method, url) as resp:
+            text = await resp.text()
+            if resp.status in (418, 429):
+                self.budget.penalize(resp.status, resp.headers)
+            else:
+                self.budget.observe(resp.headers)
+            if resp.status >= 500:
+                raise ServerError(resp.status, text)
+            if resp.status >= 400:
+                try:
+                    err = json.loads(text)
+                except ValueError:
+                    raise ClientError(resp.status, None, text, dict(resp.headers))
+                raise ClientError(resp.status, err.get("code"), err.get("msg"), dict(resp.headers))
+            try:
+                return json.loads(text)
+            except ValueError:
+                return text
+
+    def __getattr__(self, name):
+        if name not in ENDPOINTS:
+            raise AttributeError(name)
+
+        async def call(**params):
+            return await self.request(name, **params)
+
+        call.__name__ = name
+        return call
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+class AsyncSimClient:
+    """SimExchange(메모리 거래소)를 같은 async 인터페이스로 노출"""
+    def __init__(self, sim):
+        self._sim = sim
+
+    def __getattr__(self, name):
+        attr = getattr(self._sim, name)
+        if not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            return attr(*args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+    async def close(self):
+        pass
+
+# ---------- 백그라운드 이벤트 루프 ----------
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+_client = None
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """동기 코드용 공용 이벤트 루프 (데몬 스레드에서 run_forever)"""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="aio-loop", daemon=True).start()
+                _loop = loop
+    return _loop
+
+def run_sync(coro, timeout: float | None = None):
+    """코루틴을 공용 루프에서 실행하고 결과를 기다림 (동기 shim용)"""
+    loop = get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync는 이벤트 루프 스레드 안에서 호출할 수 없습니다 (await 사용)")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+def aum():
+    """공용 비동기 클라이언트 (sim 모드면 AsyncSimClient)"""
+    global _client
+    if _client is None:
+        with _loop_lock:
+            if _client is None:
+                _client = AsyncSimClient(um) if EXCHANGE == "sim" else AsyncUMFutures()
+    return _client
+
+async def aio_sleep(sec: float):
+    """sim 모드에서는 가상 시계를 진행, 실거래에서는 asyncio.sleep"""
+    if EXCHANGE == "sim":
+        clock.sleep(sec)
+    else:
+        await asyncio.sleep(sec)
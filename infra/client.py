@@ -1,15 +1,65 @@
 import os
+import time
+import yaml
 from dotenv import load_dotenv
 from binance.um_futures import UMFutures
+from infra.rate_limit import RateLimitedClient, get_governor
+from infra.metrics import InstrumentedClient
 
 load_dotenv()
 
 API_KEY    = os.getenv("BINANCE_API_KEY")
 API_SECRET = os.getenv("BINANCE_API_SECRET")
 BASE_URL   = os.getenv("BASE_URL", "https://testnet.binancefuture.com")
+# WebSocket 스트림 (로컬 대역 서버로 바꿔 끼울 수 있도록 env로 노출)
+STREAM_URL = os.getenv("STREAM_URL",
+                       "wss://stream.binancefuture.com" if "testnet" in BASE_URL else "wss://fstream.binance.com")
+USE_USER_STREAM = os.getenv("USE_USER_STREAM", "false").lower() == "true"
+USE_MARKET_STREAM = os.getenv("USE_MARKET_STREAM", "false").lower() == "true"
+USE_ORDER_BOOK = os.getenv("USE_ORDER_BOOK", "false").lower() == "true"
 
-# 모든 모듈이 공유하는 Futures 클라이언트 (싱글톤)
-um = UMFutures(key=API_KEY, secret=API_SECRET, base_url=BASE_URL)
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "AI", "config.yaml")
+
+def _resolve_exchange() -> str:
+    """env EXCHANGE → AI/config.yaml의 exchange 키 → "binance" 순.
+    AI.utils.load_config와 같은 규칙이지만 infra가 AI 패키지를 import하지 않도록 yaml 키 하나만 직접 읽음"""
+    env = os.getenv("EXCHANGE")
+    if env:
+        return env.lower()
+    try:
+        with open(CONFIG_PATH) as f:
+            return str((yaml.safe_load(f) or {}).get("exchange", "binance")).lower()
+    except FileNotFoundError:
+        return "binance"
+
+# "binance"(기본) 또는 "sim"(저장된 분봉을 재생하는 프로세스 내 거래소, 네트워크 없음)
+EXCHANGE = _resolve_exchange()
+
+class _RealClock:
+    """실시간 시계. sim 모드에서는 SimClock(가상 시계)으로 교체됨"""
+    def time(self) -> float:
+        return time.time()
+
+    def sleep(self, sec: float):
+        time.sleep(sec)
+
+# 모든 모듈이 공유하는 Futures 클라이언트 (싱글톤) + 시계
+if EXCHANGE == "sim":
+    from infra.sim_exchange import create_sim_exchange
+    um, clock = create_sim_exchange(start=os.getenv("SIM_START"), end=os.getenv("SIM_END"),
+                                    balance=float(os.getenv("SIM_BALANCE", "10000")),
+                                    klines_path=os.getenv("SIM_KLINES"),
+                                    exchange_info_path=os.getenv("SIM_EXCHANGE_INFO"))
+    um = InstrumentedClient(um)
+else:
+    # 모든 스레드(심볼 루프/스트림/결정기/백필)가 하나의 RateGovernor(weight·주문 수 한도)를 공유
+    # 응답 헤더로 서버 사용량을 반영하도록 show_limit_usage=True (RateLimitedClient가 data만 풀어서 반환)
+    # 계측은 예산 대기 안쪽에 둬서 지연 히스토그램에 순수 HTTP 왕복만 잡히게 함
+    um = RateLimitedClient(
+        InstrumentedClient(UMFutures(key=API_KEY, secret=API_SECRET, base_url=BASE_URL, show_limit_usage=True)),
+        get_governor(BASE_URL, limit=int(os.getenv("REST_WEIGHT_LIMIT", "2400"))),
+    )
+    clock = _RealClock()
 
 # 공용 상수
 LONG  = "BUY"
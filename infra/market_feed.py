@@ -0,0 +1,224 @@
+import json
+import threading
+import time
+from collections import deque
+import pandas as pd
+from infra.client import um, SYMBOL, STREAM_URL
+
+_INTERVAL_MS = {"m": 60_000, "h": 3_600_000, "d": 86_400_000}
+
+def interval_ms(interval: str) -> int:
+    """"1m"/"15m"/"1h" → ms"""
+    return int(interval[:-1]) * _INTERVAL_MS[interval[-1]]
+
+class MarketFeed:
+    """
+    kline + markPrice 스트림으로 '닫힌 봉' 창(최대 window개)과 최신 가격을 메모리에 유지.
+    - 시작/재접속 시 REST klines로 빈 구간을 채움(backfill)
+    - 닫힌 봉의 openTime이 건너뛰면(gap) 그 구간을 REST로 채운 뒤 이어붙임
+    - on_bar(cb)로 봉 마감 콜백 등록 (cb(bar_dict))
+    """
+    def __init__(self, symbol: str = SYMBOL, interval: str = "1m", window: int = 500,
+                 client=None, stream_url: str = STREAM_URL, reconnect_sec: float = 5.0):
+        self.symbol = symbol
+        self.interval = interval
+        self.step_ms = interval_ms(interval)
+        self.window = window
+        self._client = client or um
+        self.stream_url = stream_url
+        self.reconnect_sec = reconnect_sec
+        # (open_time_ms, open, high, low, close, volume, taker_buy_base)
+        self._bars = deque(maxlen=window)
+        self.price = None          # 최신 체결가(진행 중인 봉의 close)
+        self.mark_price = None
+        self.updated_at = 0.0      # 마지막 메시지 수신 시각(monotonic)
+        self.connected = False
+        self._listeners = []
+        self._lock = threading.RLock()
+        self._ws = None
+        self._stop = threading.Event()
+        self._watchdog = None
+
+    # ---------- 연결 관리 ----------
+    def start(self):
+        self._stop.clear()
+        self.backfill()
+        self._connect()
+        if self._watchdog is None or not self._watchdog.is_alive():
+            self._watchdog = threading.Thread(target=self._watch_loop, daemon=True)
+            self._watchdog.start()
+        return self
+
+    def _connect(self):
+        from binance.websocket.um_futures.websocket_client import UMFuturesWebsocketClient
+
+        self._ws = UMFuturesWebsocketClient(
+            stream_url=self.stream_url,
+            on_message=self._on_message,
+            on_close=lambda *_: self._mark_closed("closed"),
+            on_error=lambda _, e: self._mark_closed(f"error: {e}"),
+        )
+        self._ws.kline(symbol=self.symbol, interval=self.interval, id=1)
+        self._ws.mark_price(symbol=self.symbol, speed=1, id=2)
+        self.connected = True
+        print(f"[FEED] {self.symbol} kline/markPrice 스트림 연결")
+
+    def stop(self):
+        self._stop.set()
+        self.connected = False
+        if self._ws is not None:
+            try:
+                self._ws.stop()
+            except Exception:
+                pass
+
+    def _mark_closed(self, why: str):
+        if self.connected:
+            self.connected = False
+            print(f"[FEED] 스트림 끊김 ({why})")
+
+    def _watch_loop(self):
+        while not self._stop.wait(self.reconnect_sec):
+            sm = getattr(self._ws, "socket_manager", None)
+            if self.connected and sm is not None and not sm.is_alive():
+                self._mark_closed("socket thread exited")
+            if self.connected:
+                continue
+            try:
+                self._connect()
+                self.backfill()  # 끊겨 있던 동안의 봉 보충
+            except Exception as e:
+                print("[FEED] 재접속 실패:", e)
+
+    # ---------- 데이터 반영 ----------
+    def _on_message(self, _, raw):
+        try:
+            evt = json.loads(raw) if isinstance(raw, (str, bytes)) else raw
+        except ValueError:
+            return
+        self.handle(evt)
+
+    def handle(self, evt: dict):
+        """스트림 메시지 1건 반영 (WebSocket 콜백 또는 녹화 이벤트 재생에서 호출)"""
+        etype = evt.get("e")
+        if etype == "kline":
+            k = evt["k"]
+            self.price = float(k["c"])
+            self.updated_at = time.monotonic()
+            if k.get("x"):
+                bar = (int(k["t"]), float(k["o"]), float(k["h"]), float(k["l"]),
+                       float(k["c"]), float(k["v"]), float(k["V"]))
+                self._on_closed_bar(bar)
+        elif etype == "markPriceUpdate":
+            self.mark_price = float(evt["p"])
+            self.updated_at = time.monotonic()
+
+    def _on_closed_bar(self, bar: tuple):
+        with self._lock:
+            last = self._bars[-1][0] if self._bars else None
+            if last is not None and bar[0] <= last:
+                return
+            gap = last is not None and bar[0] > last + self.step_ms
+        if gap:
+            print(f"[FEED] gap 감지 {last} → {bar[0]}, REST 보충")
+            self.backfill(end_ms=bar[0] - 1)
+        self._emit(self._extend([bar]))
+
+    def _extend(self, bars: list) -> list:
+        """마지막 봉 이후의 봉만 창에 추가. 반환: 실제로 추가된 봉"""
+        added = []
+        with self._lock:
+            for bar in bars:
+                if self._bars and bar[0] <= self._bars[-1][0]:
+                    continue
+                self._bars.append(bar)
+                added.append(bar)
+        return added
+
+    def _emit(self, bars: list):
+        """on_bar 콜백 호출 — 피드 락을 놓은 상태에서만 (콜백이 자기 락을 잡아도 교착 없음)"""
+        for bar in bars:
+            for cb in list(self._listeners):
+                try:
+                    cb(self._bar_dict(bar))
+                except Exception as e:
+                    print("[FEED] on_bar 콜백 에러:", e)
+
+    def backfill(self, end_ms: int | None = None):
+        """
+        마지막 봉 다음부터 end_ms(기본: 마지막 마감 봉)까지 REST로 채움.
+        REST 페이징은 락 밖에서 (중간에 스트림 봉이 먼저 들어와도 _extend가 중복을 거름)
+        """
+        if end_ms is None:
+            end_ms = (int(time.time() * 1000) // self.step_ms) * self.step_ms - 1
+        with self._lock:
+            start_ms = (self._bars[-1][0] + self.step_ms) if self._bars \
+                else end_ms + 1 - self.window * self.step_ms
+        while start_ms <= end_ms:
+            rows = self._client.klines(symbol=self.symbol, interval=self.interval,
+                                       startTime=start_ms, endTime=end_ms, limit=1500)
+            if not rows:
+                break
+            # endTime 이후 진행 중인 봉은 제외
+            bars = [(int(r[0]), float(r[1]), float(r[2]), float(r[3]), float(r[4]), float(r[5]), float(r[9]))
+                    for r in rows if int(r[6]) <= end_ms]
+            self._emit(self._extend(bars))
+            start_ms = int(rows[-1][0]) + self.step_ms
+
+    def on_bar(self, cb):
+        self._listeners.append(cb)
+
+    # ---------- 조회 ----------
+    def _bar_dict(self, bar: tuple) -> dict:
+        return {
+            "time": pd.Timestamp(bar[0], unit="ms", tz="UTC"),
+            "open": bar[1], "high": bar[2], "low": bar[3], "close": bar[4],
+            "volume": bar[5], "taker_buy_base": bar[6],
+        }
+
+    @property
+    def last_open_ms(self) -> int | None:
+        with self._lock:
+            return self._bars[-1][0] if self._bars else None
+
+    @property
+    def last_close(self) -> float | None:
+        with self._lock:
+            return self._bars[-1][4] if self._bars else None
+
+    def is_current(self) -> bool:
+        """마지막 마감 봉까지 창이 채워져 있는지"""
+        last = self.last_open_ms
+        expect = (int(time.time() * 1000) // self.step_ms - 1) * self.step_ms
+        return last is not None and last >= expect
+
+    def is_fresh(self, max_age_sec: float = 5.0) -> bool:
+        return self.connected and self.price is not None \
+            and time.monotonic() - self.updated_at <= max_age_sec
+
+    def window_df(self, n: int | None = None) -> pd.DataFrame:
+        """최근 n개 닫힌 봉 (fetch_last_window_klines와 같은 컬럼)"""
+        with self._lock:
+            bars = list(self._bars)[-n:] if n else list(self._bars)
+        df = pd.DataFrame(bars, columns=["open_time", "open", "high", "low", "close",
+                                         "volume", "taker_buy_base"])
+        df["time"] = pd.to_datetime(df["open_time"], unit="ms", utc=True)
+        return df[["time", "open", "high", "low", "close", "volume", "taker_buy_base"]]
+
+# 프로세스 공용 피드 (심볼별, USE_MARKET_STREAM일 때 main/engine에서 등록)
+_feeds: dict[str, MarketFeed] = {}
+
+def set_market_feed(feed: MarketFeed | None, symbol: str | None = None):
+    """심볼별 피드 등록 (feed=None이면 해제)"""
+    if feed is not None:
+        _feeds[feed.symbol] = feed
+    elif symbol is not None:
+        _feeds.pop(symbol, None)
+    else:
+        _feeds.clear()
+
+def get_market_feed(symbol: str | None = None) -> MarketFeed | None:
+    """symbol의 피드. symbol=None이면 등록된 아무 피드(단일 심볼 모드)"""
+    if symbol is None:
+        return next(iter(_feeds.values()), None)
+    return _feeds.get(symbol)
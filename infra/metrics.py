@@ -0,0 +1,243 @@
+# infra/metrics.py
+"""
+거래소 호출/거래 단계 계측.
+- InstrumentedClient: um 프록시. 메서드(엔드포인트)별 지연 히스토그램, 에러 수(코드별), request weight 합계
+- span("decide") 등: 거래 단계별 소요 시간 히스토그램 (decide → price → entry → fill → protect → hold → exit)
+- 내보내기: Prometheus 텍스트(to_prometheus / serve_prometheus) 또는 주기적 JSON 스냅샷(JsonSnapshotter)
+기록 1건은 perf_counter 2회 + 락 1회 + bisect 수준이라 호출 지연(ms) 대비 무시할 만함.
+
+  METRICS_PORT=9108            → http://localhost:9108/metrics
+  METRICS_JSON=exp/metrics.json METRICS_JSON_SEC=60
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from infra.rate_limit import request_weight
+
+# 초 단위 버킷 (Prometheus 관례)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PHASE_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+
+class Histogram:
+    """누적 아닌 버킷별 카운트 + 합/개수/최댓값 (내보낼 때 누적으로 변환)"""
+    __slots__ = ("buckets", "counts", "sum", "count", "max")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, v: float):
+        self.counts[bisect.bisect_left(self.buckets, v)] += 1
+        self.sum += v
+        self.count += 1
+        if v > self.max:
+            self.max = v
+
+    def quantile(self, q: float) -> float | None:
+        """버킷 상한 기준 근사 분위수"""
+        if not self.count:
+            return None
+        target, acc = q * self.count, 0
+        for i, c in enumerate(self.counts):
+            acc += c
+            if acc >= target:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "sum": round(self.sum, 6), "max": round(self.max, 6),
+                "avg": round(self.sum / self.count, 6) if self.count else None,
+                "p50": self.quantile(0.5), "p90": self.quantile(0.9), "p99": self.quantile(0.99)}
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency: dict[str, Histogram] = {}
+        self.errors: dict[tuple[str, str], int] = {}
+        self.weight: dict[str, int] = {}
+        self.phases: dict[str, Histogram] = {}
+        self.started = time.time()
+
+    def observe_call(self, endpoint: str, sec: float, weight: int = 0, error: str | None = None):
+        with self._lock:
+            h = self.latency.get(endpoint)
+            if h is None:
+                h = self.latency[endpoint] = Histogram(LATENCY_BUCKETS)
+            h.observe(sec)
+            if weight:
+                self.weight[endpoint] = self.weight.get(endpoint, 0) + weight
+            if error is not None:
+                key = (endpoint, error)
+                self.errors[key] = self.errors.get(key, 0) + 1
+
+    def observe_phase(self, phase: str, sec: float):
+        with self._lock:
+            h = self.phases.get(phase)
+            if h is None:
+                h = self.phases[phase] = Histogram(PHASE_BUCKETS)
+            h.observe(sec)
+
+    @contextmanager
+    def span(self, phase: str):
+        """with metrics.span("entry"): ...  (예외가 나도 기록)"""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_phase(phase, time.perf_counter() - t0)
+
+    def reset(self):
+        with self._lock:
+            self.latency.clear()
+            self.errors.clear()
+            self.weight.clear()
+            self.phases.clear()
+            self.started = time.time()
+
+    # ---------- 내보내기 ----------
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "time": time.time(),
+                "since": self.started,
+                "endpoints": {k: dict(h.to_dict(), weight=self.weight.get(k, 0),
+                                      errors={e: n for (ep, e), n in self.errors.items() if ep == k})
+                              for k, h in sorted(self.latency.items())},
+                "phases": {k: h.to_dict() for k, h in sorted(self.phases.items())},
+            }
+
+    def to_prometheus(self) -> str:
+        out = []
+
+        def hist(name: str, label: str, items: dict):
+            out.append(f"# TYPE {name} histogram")
+            for key, h in sorted(items.items()):
+                acc = 0
+                for le, c in zip(h.buckets, h.counts):
+                    acc += c
+                    out.append(f'{name}_bucket{{{label}="{key}",le="{le}"}} {acc}')
+                out.append(f'{name}_bucket{{{label}="{key}",le="+Inf"}} {h.count}')
+                out.append(f'{name}_sum{{{label}="{key}"}} {h.sum:.6f}')
+                out.append(f'{name}_count{{{label}="{key}"}} {h.count}')
+
+        with self._lock:
+            hist("exchange_request_duration_seconds", "endpoint", self.latency)
+            out.append("# TYPE exchange_request_errors_total counter")
+            for (ep, err), n in sorted(self.errors.items()):
+                out.append(f'exchange_request_errors_total{{endpoint="{ep}",error="{err}"}} {n}')
+            out.append("# TYPE exchange_request_weight_total counter")
+            for ep, w in sorted(self.weight.items()):
+                out.append(f'exchange_request_weight_total{{endpoint="{ep}"}} {w}')
+            hist("trade_phase_duration_seconds", "phase", self.phases)
+        return "\n".join(out) + "\n"
+
+def error_label(e: Exception) -> str:
+    """ClientError는 거래소 에러 코드, 그 외는 예외 클래스 이름"""
+    code = getattr(e, "error_code", None)
+    return str(code) if code is not None else type(e).__name__
+
+class InstrumentedClient:
+    """클라이언트 프록시: 메서드 호출마다 지연/에러/weight 기록. 메서드가 아닌 속성은 원본 그대로"""
+    def __init__(self, client, registry: Metrics | None = None):
+        self._client = client
+        self.metrics = registry or metrics
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+        reg = self.metrics
+
+        def call(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                out = attr(*args, **kwargs)
+            except Exception as e:
+                reg.observe_call(name, time.perf_counter() - t0, request_weight(name, kwargs), error_label(e))
+                raise
+            reg.observe_call(name, time.perf_counter() - t0, request_weight(name, kwargs))
+            return out
+
+        call.__name__ = name
+        return call
+
+class JsonSnapshotter:
+    """interval_sec마다 snapshot()을 path에 원자적으로 기록하는 데몬 스레드"""
+    def __init__(self, path: str, interval_sec: float = 60.0, registry: Metrics | None = None):
+        self.path = path
+        self.interval_sec = interval_sec
+        self.metrics = registry or metrics
+        self._stop = threading.Event()
+        self._thread = None
+
+    def write(self):
+        d = os.path.dirname(self.path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.metrics.snapshot(), f, indent=1)
+        os.replace(tmp, self.path)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_sec):
+            try:
+                self.write()
+            except Exception as e:
+                print("[METRICS] 스냅샷 기록 실패:", e)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="metrics-json", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.write()
+
+def serve_prometheus(port: int, registry: Metrics | None = None, host: str = "0.0.0.0"):
+    """/metrics 엔드포인트를 데몬 스레드로 서비스"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    reg = registry or metrics
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.rstrip("/") not in ("/metrics", ""):
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = reg.to_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=httpd.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"[METRICS] Prometheus → http://{host}:{port}/metrics")
+    return httpd
+
+def start_exporters_from_env():
+    """METRICS_PORT / METRICS_JSON(+METRICS_JSON_SEC) 설정된 내보내기만 시작"""
+    started = []
+    port = os.getenv("METRICS_PORT")
+    if port:
+        started.append(serve_prometheus(int(port)))
+    path = os.getenv("METRICS_JSON")
+    if path:
+        started.append(JsonSnapshotter(path, float(os.getenv("METRICS_JSON_SEC", "60"))).start())
+    return started
+
+# 프로세스 공용 레지스트리
+metrics = Metrics()
@@ -0,0 +1,473 @@
+# infra/order_book.py
+"""
+로컬 호가창: REST depth 스냅샷 위에 diff depth 스트림(<symbol>@depth@100ms)을 적용해 유지.
+
+동기화 규칙 (USDⓈ-M Futures):
+  1) 스트림을 먼저 열고 이벤트를 버퍼링
+  2) depth 스냅샷(lastUpdateId) 조회
+  3) u < lastUpdateId 인 이벤트는 버림
+  4) 첫 적용 이벤트는 U <= lastUpdateId <= u
+  5) 이후 이벤트마다 pu == 직전 이벤트의 u, 아니면 gap → 스냅샷부터 다시(resync)
+  6) 수량 0인 가격 레벨은 삭제
+
+조회(best_bid/best_ask/price_ticks_away)는 힙 + 레벨 dict로 네트워크 없이 마이크로초 단위.
+
+  python -m infra.order_book --check                    # 합성 녹화로 재생 검증(gap/resync 포함)
+  python -m infra.order_book --record depth.jsonl --seconds 60
+  python -m infra.order_book --replay depth.jsonl
+"""
+import argparse
+import heapq
+import json
+import math
+import random
+import threading
+import time
+from collections import deque
+from infra.client import um, SYMBOL, STREAM_URL
+
+class _Side:
+    """한쪽 호가: price→qty dict + 최우선 호가용 힙(지연 삭제)"""
+    def __init__(self, is_bid: bool):
+        self.sign = -1.0 if is_bid else 1.0
+        self.levels: dict[float, float] = {}
+        self._heap: list[float] = []
+
+    def clear(self):
+        self.levels.clear()
+        self._heap.clear()
+
+    def set(self, price: float, qty: float):
+        if qty == 0.0:
+            self.levels.pop(price, None)
+            return
+        if price not in self.levels:
+            heapq.heappush(self._heap, self.sign * price)
+        self.levels[price] = qty
+
+    def best(self) -> float | None:
+        h = self._heap
+        while h and (self.sign * h[0]) not in self.levels:
+            heapq.heappop(h)
+        if len(h) > 4 * len(self.levels) + 64:  # 삭제된 레벨이 쌓이면 재구성
+            self._heap = [self.sign * p for p in self.levels]
+            heapq.heapify(self._heap)
+            h = self._heap
+        return self.sign * h[0] if h else None
+
+    def top(self, n: int) -> list[tuple[float, float]]:
+        prices = sorted(self.levels, reverse=self.sign < 0)[:n]
+        return [(p, self.levels[p]) for p in prices]
+
+class LocalOrderBook:
+    """
+    symbol의 로컬 호가창.
+    - start(): diff 스트림 연결 + 스냅샷 동기화, 끊기면 watchdog이 재접속/재동기화
+    - handle(evt): depthUpdate 1건 반영 (WebSocket 콜백 또는 녹화 재생)
+    - synced가 False인 동안(초기/ resync 중)에는 조회 결과를 쓰지 말 것
+    - 스냅샷 조회가 실패하면 backoff_sec부터 두 배씩(최대 backoff_max_sec) 기다린 뒤 다시 시도,
+      그동안 이벤트는 최대 buffer_max개만 버퍼링(오래된 것부터 버림 → 재동기화 때 gap으로 처리)
+    """
+    def __init__(self, symbol: str = SYMBOL, client=None, stream_url: str = STREAM_URL,
+                 depth_limit: int = 1000, speed_ms: int = 100, tick_size: float | None = None,
+                 reconnect_sec: float = 5.0, resync_in_thread: bool = True,
+                 backoff_sec: float = 1.0, backoff_max_sec: float = 30.0, buffer_max: int = 5000):
+        self.symbol = symbol
+        self._client = client or um
+        self.stream_url = stream_url
+        self.depth_limit = depth_limit
+        self.speed_ms = speed_ms
+        self._tick_size = tick_size
+        self.reconnect_sec = reconnect_sec
+        self.resync_in_thread = resync_in_thread
+        self.backoff_sec = backoff_sec
+        self.backoff_max_sec = backoff_max_sec
+        self.buffer_max = buffer_max
+
+        self.bids = _Side(is_bid=True)
+        self.asks = _Side(is_bid=False)
+        self.last_update_id = None   # 마지막으로 반영한 u (또는 스냅샷 lastUpdateId)
+        self.synced = False
+        self.connected = False
+        self.updated_at = 0.0
+        self.resyncs = 0
+        self.gaps = 0
+        self._buffer = deque(maxlen=buffer_max)
+        self._backoff = 0.0          # 연속 스냅샷 실패 시 대기(초), 성공하면 0
+        self._retry_at = 0.0         # 이 시각(monotonic) 전에는 스냅샷 재시도 안 함
+        self._syncing = False
+        self._need_first = True
+        self._lock = threading.RLock()
+        self._ws = None
+        self._stop = threading.Event()
+        self._watchdog = None
+
+    # ---------- 연결 관리 ----------
+    def start(self):
+        self._stop.clear()
+        self._connect()
+        self.resync()
+        if self._watchdog is None or not self._watchdog.is_alive():
+            self._watchdog = threading.Thread(target=self._watch_loop, daemon=True)
+            self._watchdog.start()
+        return self
+
+    def _connect(self):
+        from binance.websocket.um_futures.websocket_client import UMFuturesWebsocketClient
+
+        self._ws = UMFuturesWebsocketClient(
+            stream_url=self.stream_url,
+            on_message=self._on_message,
+            on_close=lambda *_: self._mark_closed("closed"),
+            on_error=lambda _, e: self._mark_closed(f"error: {e}"),
+        )
+        self._ws.diff_book_depth(symbol=self.symbol, speed=self.speed_ms, id=1)
+        self.connected = True
+        print(f"[BOOK] {self.symbol} diff depth 스트림 연결")
+
+    def stop(self):
+        self._stop.set()
+        self.connected = False
+        if self._ws is not None:
+            try:
+                self._ws.stop()
+            except Exception:
+                pass
+
+    def _mark_closed(self, why: str):
+        if self.connected:
+            self.connected = False
+            self.synced = False
+            print(f"[BOOK] 스트림 끊김 ({why})")
+
+    def _watch_loop(self):
+        while not self._stop.wait(self.reconnect_sec):
+            sm = getattr(self._ws, "socket_manager", None)
+            if self.connected and sm is not None and not sm.is_alive():
+                self._mark_closed("socket thread exited")
+            if self.connected:
+                continue
+            try:
+                self._connect()
+                self.resync()
+            except Exception as e:
+                print("[BOOK] 재접속 실패:", e)
+
+    def _on_message(self, _, raw):
+        try:
+            evt = json.loads(raw) if isinstance(raw, (str, bytes)) else raw
+        except ValueError:
+            return
+        self.handle(evt)
+
+    # ---------- 동기화 ----------
+    def resync(self):
+        """스냅샷부터 다시 동기화 (버퍼는 유지, 스냅샷은 스레드에서 조회). 실패 후 backoff 중이면 건너뜀"""
+        with self._lock:
+            self.synced = False
+            if self._syncing or time.monotonic() < self._retry_at:
+                return
+            self._syncing = True
+            self.resyncs += 1
+        if self.resync_in_thread:
+            threading.Thread(target=self._load_snapshot, daemon=True).start()
+        else:
+            self._load_snapshot()
+
+    def _load_snapshot(self):
+        try:
+            snap = self._client.depth(symbol=self.symbol, limit=self.depth_limit)
+        except Exception as e:
+            with self._lock:
+                self._backoff = min(max(self._backoff * 2, self.backoff_sec), self.backoff_max_sec)
+                self._retry_at = time.monotonic() + self._backoff
+                self._syncing = False
+            print(f"[BOOK] 스냅샷 조회 실패 → {self._backoff:.1f}s 후 재시도: {e}")
+            return
+        self.apply_snapshot(snap)
+
+    def apply_snapshot(self, snap: dict):
+        """스냅샷 반영 후 버퍼의 이벤트를 규칙대로 이어 붙임"""
+        with self._lock:
+            self.bids.clear()
+            self.asks.clear()
+            for p, q in snap.get("bids", []):
+                self.bids.set(float(p), float(q))
+            for p, q in snap.get("asks", []):
+                self.asks.set(float(p), float(q))
+            self.last_update_id = int(snap["lastUpdateId"])
+            self.updated_at = time.monotonic()
+            self._syncing = False
+            self._backoff, self._retry_at = 0.0, 0.0
+            self._need_first = True
+            self.synced = True
+            pending, self._buffer = self._buffer, deque(maxlen=self.buffer_max)
+            ok = True
+            while pending and ok:
+                ok = self._process(pending.popleft())
+            self._buffer.extend(pending)
+        if not ok:
+            self.resync()
+
+    def _apply(self, evt: dict):
+        for p, q in evt.get("b", []):
+            self.bids.set(float(p), float(q))
+        for p, q in evt.get("a", []):
+            self.asks.set(float(p), float(q))
+        self.last_update_id = int(evt["u"])
+        self.updated_at = time.monotonic()
+
+    def _process(self, evt: dict) -> bool:
+        """동기 상태에서 이벤트 1건 처리. gap이면 이벤트를 버퍼에 넣고 False (호출측이 resync)"""
+        last = self.last_update_id
+        if self._need_first:
+            if evt["u"] < last:
+                return True                   # 스냅샷에 이미 포함
+            if evt["U"] > last:
+                gap = True                    # 스냅샷이 이벤트보다 오래됨
+            else:
+                self._apply(evt)
+                self._need_first = False
+                return True
+        else:
+            gap = evt["pu"] != last
+            if not gap:
+                self._apply(evt)
+                return True
+        self.gaps += 1
+        print(f"[BOOK] gap 감지 U={evt['U']} pu={evt.get('pu')} last_u={last} → resync")
+        self.synced = False
+        self._buffer.append(evt)
+        return False
+
+    def handle(self, evt: dict):
+        """depthUpdate 1건 반영"""
+        if evt.get("e") != "depthUpdate":
+            return
+        with self._lock:
+            if self.synced:
+                if self._process(evt):
+                    return
+            else:
+                self._buffer.append(evt)
+                if self._syncing:
+                    return
+        self.resync()
+
+    # ---------- 조회 ----------
+    @property
+    def tick_size(self) -> float:
+        if self._tick_size is None:
+            from trading.precision import get_tick_size
+            self._tick_size = get_tick_size(self.symbol)
+        return self._tick_size
+
+    def best_bid(self) -> float | None:
+        with self._lock:
+            return self.bids.best()
+
+    def best_ask(self) -> float | None:
+        with self._lock:
+            return self.asks.best()
+
+    def price_ticks_away(self, side: str, n: int = 1) -> float:
+        """
+        BUY: 최고 bid - n tick, SELL: 최저 ask + n tick (n=0이면 최우선 호가 그대로).
+        tick 그리드로 라운딩. 호가가 비어 있으면 RuntimeError
+        """
+        tick = self.tick_size
+        with self._lock:
+            if side.upper() == "BUY":
+                base = self.bids.best()
+                if base is None:
+                    raise RuntimeError("orderbook bids empty")
+                raw = base - n * tick
+            else:
+                base = self.asks.best()
+                if base is None:
+                    raise RuntimeError("orderbook asks empty")
+                raw = base + n * tick
+        raw = max(raw, tick)
+        dec = max(0, -int(math.floor(math.log10(tick))))
+        return round(round(raw / tick) * tick, dec)
+
+    def top(self, n: int = 5) -> dict:
+        """depth 응답과 같은 모양의 상위 n 레벨"""
+        with self._lock:
+            return {"lastUpdateId": self.last_update_id,
+                    "bids": [[p, q] for p, q in self.bids.top(n)],
+                    "asks": [[p, q] for p, q in self.asks.top(n)]}
+
+    def is_fresh(self, max_age_sec: float = 5.0) -> bool:
+        return self.synced and time.monotonic() - self.updated_at <= max_age_sec
+
+# 프로세스 공용 호가창 (심볼별, USE_ORDER_BOOK일 때 main/engine에서 등록)
+_books: dict[str, LocalOrderBook] = {}
+
+def set_order_book(book: LocalOrderBook):
+    _books[book.symbol] = book
+
+def get_order_book(symbol: str) -> LocalOrderBook | None:
+    return _books.get(symbol)
+
+# ---------- 녹화 / 재생 ----------
+class _RecordedDepth:
+    """녹화 파일의 스냅샷을 순서대로 돌려주는 depth() 대역"""
+    def __init__(self, snapshots: list[dict]):
+        self._snaps = deque(snapshots)
+
+    def depth(self, symbol: str, limit: int = 1000, **kwargs):
+        if not self._snaps:
+            raise RuntimeError("녹화된 스냅샷이 더 없습니다")
+        return self._snaps.popleft()
+
+def replay(lines: list[dict], symbol: str = SYMBOL, tick_size: float = 0.1) -> dict:
+    """
+    녹화(jsonl 행 dict 목록) 재생. 행 종류:
+      {"kind":"snapshot","data":...}  resync 시 순서대로 사용
+      {"kind":"event","data":...}     depthUpdate
+      {"kind":"check","data":...}     그 시점 정답 호가(lastUpdateId 포함) — 동기 상태면 상위 레벨 비교
+    반환: 요약 통계
+    """
+    snaps = [l["data"] for l in lines if l["kind"] == "snapshot"]
+    book = LocalOrderBook(symbol, client=_RecordedDepth(snaps), tick_size=tick_size,
+                          resync_in_thread=False)
+    events = checks = mismatches = crossed = 0
+    book.resync()
+    t0 = time.perf_counter()
+    for l in lines:
+        if l["kind"] == "event":
+            book.handle(l["data"])
+            events += 1
+            if book.synced:
+                bb, ba = book.best_bid(), book.best_ask()
+                if bb is not None and ba is not None and bb >= ba:
+                    crossed += 1
+        elif l["kind"] == "check" and book.synced and book.last_update_id == l["data"]["lastUpdateId"]:
+            checks += 1
+            n = len(l["data"]["bids"])
+            got = book.top(n)
+            want = {k: [[float(p), float(q)] for p, q in l["data"][k]] for k in ("bids", "asks")}
+            if got["bids"] != want["bids"] or got["asks"] != want["asks"]:
+                mismatches += 1
+    replay_sec = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    reps = 100_000
+    for _ in range(reps):
+        book.price_ticks_away("BUY", 1)
+    query_us = (time.perf_counter() - t0) / reps * 1e6
+    return {"events": events, "synced": book.synced, "resyncs": book.resyncs, "gaps": book.gaps,
+            "checks": checks, "mismatches": mismatches, "crossed": crossed,
+            "replay_us_per_event": round(replay_sec / max(events, 1) * 1e6, 2),
+            "price_ticks_away_us": round(query_us, 3)}
+
+def synth_recording(n_events: int = 20_000, seed: int = 7, gap_at: tuple = (5_000, 12_000),
+                    tick: float = 0.1, levels: int = 200, check_every: int = 500) -> list[dict]:
+    """
+    결정적 합성 녹화: 정답 호가를 직접 굴리면서 diff 이벤트/스냅샷/체크포인트를 만든다.
+    gap_at 위치의 이벤트는 녹화에서 빠뜨려 resync를 유도(그 직후 새 스냅샷 제공).
+    """
+    rng = random.Random(seed)
+    mid = 30000.0
+    bids = {round(mid - (i + 1) * tick, 1): 1.0 for i in range(levels)}
+    asks = {round(mid + i * tick, 1): 1.0 for i in range(levels)}
+    uid = 1_000
+
+    def snapshot():
+        return {"lastUpdateId": uid,
+                "bids": [[f"{p:.1f}", f"{q:.3f}"] for p, q in sorted(bids.items(), reverse=True)],
+                "asks": [[f"{p:.1f}", f"{q:.3f}"] for p, q in sorted(asks.items())]}
+
+    def top(n=10):
+        return {"lastUpdateId": uid,
+                "bids": [[f"{p:.1f}", f"{q:.3f}"] for p, q in sorted(bids.items(), reverse=True)[:n]],
+                "asks": [[f"{p:.1f}", f"{q:.3f}"] for p, q in sorted(asks.items())[:n]]}
+
+    out = []
+    pending_snapshot_at = {0} | {g + 3 for g in gap_at}
+    prev_u = uid
+    for i in range(n_events):
+        # 중간값이 천천히 움직이며 최우선 호가 근처를 갱신/삭제/추가
+        mid += rng.choice((-1, 0, 0, 1)) * tick
+        b_upd, a_upd = [], []
+        for _ in range(rng.randint(1, 6)):
+            k = rng.randint(0, 20)
+            p = round(mid - (k + 1) * tick, 1)
+            q = 0.0 if rng.random() < 0.25 else round(rng.uniform(0.001, 5.0), 3)
+            if q == 0.0:
+                bids.pop(p, None)
+            else:
+                bids[p] = q
+            b_upd.append([f"{p:.1f}", f"{q:.3f}"])
+            p = round(mid + k * tick, 1)
+            q = 0.0 if rng.random() < 0.25 else round(rng.uniform(0.001, 5.0), 3)
+            if q == 0.0:
+                asks.pop(p, None)
+            else:
+                asks[p] = q
+            a_upd.append([f"{p:.1f}", f"{q:.3f}"])
+        # 교차된 레벨 정리 (정답 호가도 교차하지 않게)
+        bb = max(bids) if bids else None
+        for p in [p for p in asks if bb is not None and p <= bb]:
+            asks.pop(p)
+            a_upd.append([f"{p:.1f}", "0.000"])
+
+        first = uid + 1
+        uid += rng.randint(1, 3)
+        evt = {"e": "depthUpdate", "E": i, "T": i, "s": SYMBOL,
+               "U": first, "u": uid, "pu": prev_u, "b": b_upd, "a": a_upd}
+        prev_u = uid
+        if i not in gap_at:
+            out.append({"kind": "event", "data": evt})
+        if i in pending_snapshot_at:
+            out.append({"kind": "snapshot", "data": snapshot()})
+        if i % check_every == 0:
+            out.append({"kind": "check", "data": top()})
+    return out
+
+def record(path: str, seconds: float, symbol: str = SYMBOL, snapshot_every: float = 10.0):
+    """실제 스트림 녹화: 시작 스냅샷 + diff 이벤트 + snapshot_every초마다 check 스냅샷"""
+    from binance.websocket.um_futures.websocket_client import UMFuturesWebsocketClient
+
+    lock = threading.Lock()
+    with open(path, "w") as f:
+        def on_msg(_, raw):
+            evt = json.loads(raw)
+            if evt.get("e") == "depthUpdate":
+                with lock:
+                    f.write(json.dumps({"kind": "event", "data": evt}) + "\n")
+
+        ws = UMFuturesWebsocketClient(stream_url=STREAM_URL, on_message=on_msg)
+        ws.diff_book_depth(symbol=symbol, speed=100, id=1)
+        time.sleep(1.0)
+        with lock:
+            f.write(json.dumps({"kind": "snapshot", "data": um.depth(symbol=symbol, limit=1000)}) + "\n")
+        end = time.time() + seconds
+        while time.time() < end:
+            time.sleep(snapshot_every)
+            snap = um.depth(symbol=symbol, limit=10)
+            with lock:
+                f.write(json.dumps({"kind": "check", "data": snap}) + "\n")
+        ws.stop()
+    print(f"[BOOK] recorded → {path}")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--check", action="store_true", help="합성 녹화로 재생 검증")
+    ap.add_argument("--events", type=int, default=20_000)
+    ap.add_argument("--record", default=None)
+    ap.add_argument("--seconds", type=float, default=60.0)
+    ap.add_argument("--replay", default=None)
+    args = ap.parse_args()
+
+    if args.record:
+        record(args.record, args.seconds)
+    elif args.replay:
+        with open(args.replay) as f:
+            print(replay([json.loads(l) for l in f if l.strip()]))
+    else:
+        res = replay(synth_recording(args.events))
+        print(res)
+        if args.check and (res["mismatches"] or res["crossed"] or not res["synced"] or res["checks"] == 0):
+            raise SystemExit("[BOOK] replay check FAILED")
@@ -0,0 +1,329 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+def klines_weight(limit: int) -> int:
+    """GET /fapi/v1/klines request weight (limit 구간별)"""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+class WeightBudget:
+    """
+    슬라이딩 창(기본 60초) request weight 예산.
+    acquire(weight)는 창 안의 사용량 + weight가 limit 이하가 될 때까지 블로킹.
+    """
+    def __init__(self, limit: int = 2400, window_sec: float = 60.0):
+        self.limit = limit
+        self.window_sec = window_sec
+        self._used = deque()  # (monotonic_t, weight)
+        self._total = 0
+        self._cond = threading.Condition()
+
+    def _expire(self, now: float):
+        while self._used and now - self._used[0][0] >= self.window_sec:
+            self._total -= self._used.popleft()[1]
+
+    def acquire(self, weight: int = 1):
+        weight = min(weight, self.limit)
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._expire(now)
+                if self._total + weight <= self.limit:
+                    self._used.append((now, weight))
+                    self._total += weight
+                    return
+                wait = self.window_sec - (now - self._used[0][0])
+                self._cond.wait(timeout=max(wait, 0.01))
+
+    def try_acquire(self, weight: int = 1) -> float:
+        """블로킹 없이 시도. 받았으면 0, 아니면 다시 시도할 때까지 기다릴 초 (asyncio용)"""
+        weight = min(weight, self.limit)
+        with self._cond:
+            now = time.monotonic()
+            self._expire(now)
+            if self._total + weight <= self.limit:
+                self._used.append((now, weight))
+                self._total += weight
+                return 0.0
+            return max(self.window_sec - (now - self._used[0][0]), 0.01)
+
+    @property
+    def used(self) -> int:
+        with self._cond:
+            self._expire(time.monotonic())
+            return self._total
+
+def depth_weight(limit: int) -> int:
+    """GET /fapi/v1/depth request weight"""
+    if limit <= 50:
+        return 2
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 10
+    return 20
+
+# UMFutures 메서드별 IP request weight (주문 전송은 IP weight 0, 주문 수 한도는 별도)
+ENDPOINT_WEIGHTS = {
+    "new_order": 0, "new_batch_order": 5,
+    "cancel_order": 1, "cancel_batch_order": 1, "cancel_open_orders": 1,
+    "get_order": 1, "get_orders": 5, "get_account_trades": 5,
+    "get_position_risk": 5, "balance": 5, "account": 5,
+    "change_leverage": 1, "change_margin_type": 1,
+    "exchange_info": 1, "time": 1, "ping": 1,
+    "new_listen_key": 1, "renew_listen_key": 1, "close_listen_key": 1,
+}
+
+def request_weight(method: str, kwargs: dict) -> int:
+    """메서드 이름 + 인자로 request weight 추정 (모르는 엔드포인트는 1)"""
+    if method == "klines":
+        return klines_weight(int(kwargs.get("limit", 500)))
+    if method == "depth":
+        return depth_weight(int(kwargs.get("limit", 500)))
+    if method == "get_open_orders":
+        return 1 if kwargs.get("symbol") else 40
+    if method == "ticker_price":
+        return 1 if kwargs.get("symbol") else 2
+    return ENDPOINT_WEIGHTS.get(method, 1)
+
+# ---------- 우선순위 governor ----------
+# 숫자가 작을수록 우선. 주문/취소는 폴링·백필보다 먼저 weight를 받는다.
+ORDER, CANCEL, POLL, BACKFILL = 0, 1, 2, 3
+PRIORITY_NAMES = {ORDER: "order", CANCEL: "cancel", POLL: "poll", BACKFILL: "backfill"}
+# 우선순위별로 쓸 수 있는 한도 비율 (낮은 순위는 위쪽 여유분을 주문/취소용으로 남겨 둠)
+PRIORITY_SHARE = {ORDER: 1.0, CANCEL: 1.0, POLL: 0.85, BACKFILL: 0.5}
+
+_priority: ContextVar[int | None] = ContextVar("rate_priority", default=None)
+
+def method_priority(method: str) -> int:
+    if method in ("new_order", "new_batch_order"):
+        return ORDER
+    if method.startswith("cancel_"):
+        return CANCEL
+    return POLL
+
+@contextmanager
+def priority(p: int):
+    """with priority(BACKFILL): ... 안의 호출은 메서드 기본값 대신 이 우선순위 사용 (스레드/태스크 단위)"""
+    token = _priority.set(p)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def current_priority(method: str) -> int:
+    p = _priority.get()
+    return method_priority(method) if p is None else p
+
+def order_count(method: str, kwargs: dict) -> int:
+    """주문 수 한도(10초/1분)에 잡히는 주문 개수"""
+    if method == "new_order":
+        return 1
+    if method == "new_batch_order":
+        return len(kwargs.get("batchOrders") or ())
+    return 0
+
+def _header_int(headers, key: str) -> int | None:
+    for k, v in headers.items():
+        if k.lower() == key:
+            try:
+                return int(v)
+            except (TypeError, ValueError):
+                return None
+    return None
+
+class RateGovernor(WeightBudget):
+    """
+    IP weight / 주문 수 한도를 공유하는 우선순위 스케줄러.
+    - 로컬 슬라이딩 창 사용량과 응답 헤더(x-mbx-used-weight-1m)의 서버 사용량 중 큰 값을 기준으로 판단
+      (같은 IP를 쓰는 다른 프로세스 사용분까지 반영)
+    - 우선순위별 한도 비율(PRIORITY_SHARE) + 상위 우선순위 대기자가 있으면 하위는 양보
+    - 주문은 10초/1분 주문 수 한도도 확인
+    - 429/418 응답이면 Retry-After 동안 모든 요청을 멈춤
+    """
+    def __init__(self, limit: int = 2400, window_sec: float = 60.0,
+                 order_limit_10s: int = 300, order_limit_1m: int = 1200,
+                 shares: dict | None = None):
+        super().__init__(limit, window_sec)
+        self.order_limit_10s = order_limit_10s
+        self.order_limit_1m = order_limit_1m
+        self.shares = dict(PRIORITY_SHARE, **(shares or {}))
+        self._orders = deque()         # (monotonic_t, n)
+        self._server_used = (None, 0)  # (분 번호, 서버가 알려준 사용 weight)
+        self._server_orders = (None, 0)  # (10초 번호, 서버가 알려준 주문 수)
+        self._waiting = [0, 0, 0, 0]
+        self.blocked_until = 0.0
+        self.stats = {"throttled": {n: 0 for n in PRIORITY_NAMES.values()},
+                      "waited_sec": {n: 0.0 for n in PRIORITY_NAMES.values()},
+                      "penalties": 0}
+
+    def _used_now(self) -> int:
+        minute, used = self._server_used
+        return max(self._total, used) if minute == int(time.time() // 60) else self._total
+
+    def _admit(self, weight: int, prio: int, orders: int) -> float:
+        """가능하면 기록 후 0, 아니면 다시 볼 때까지 기다릴 초"""
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if any(self._waiting[:prio]):
+            return 0.05
+        self._expire(now)
+
+        if weight:
+            cap = self.limit * self.shares[prio]
+            if self._used_now() + weight > cap:
+                if self._used and self._total + weight > cap:
+                    return max(self.window_sec - (now - self._used[0][0]), 0.01)
+                return max(60.0 - time.time() % 60.0, 0.01)  # 서버 기준 초과 → 다음 분
+
+        if orders:
+            while self._orders and now - self._orders[0][0] >= 60.0:
+                self._orders.popleft()
+            n10 = sum(n for t, n in self._orders if now - t < 10.0)
+            bucket, srv = self._server_orders
+            if bucket == int(time.time() // 10):
+                n10 = max(n10, srv)
+            n60 = sum(n for _, n in self._orders)
+            if n10 + orders > self.order_limit_10s:
+                return max(10.0 - time.time() % 10.0, 0.01)
+            if n60 + orders > self.order_limit_1m:
+                return max(60.0 - (now - self._orders[0][0]), 0.01)
+            self._orders.append((now, orders))
+
+        if weight:
+            self._used.append((now, weight))
+            self._total += weight
+        return 0.0
+
+    def acquire(self, weight: int = 1, prio: int = POLL, orders: int = 0):
+        weight = min(weight, self.limit)
+        name = PRIORITY_NAMES[prio]
+        t0 = None
+        with self._cond:
+            self._waiting[prio] += 1
+            try:
+                while True:
+                    wait = self._admit(weight, prio, orders)
+                    if wait <= 0:
+                        break
+                    if t0 is None:
+                        t0 = time.monotonic()
+                        self.stats["throttled"][name] += 1
+                    self._cond.wait(timeout=wait)
+            finally:
+                self._waiting[prio] -= 1
+                self._cond.notify_all()
+            if t0 is not None:
+                self.stats["waited_sec"][name] += time.monotonic() - t0
+
+    def try_acquire(self, weight: int = 1, prio: int = POLL, orders: int = 0) -> float:
+        """블로킹 없이 시도 (asyncio용). 재시도 루프 동안은 enter/leave로 대기자 등록"""
+        with self._cond:
+            return self._admit(min(weight, self.limit), prio, orders)
+
+    def enter(self, prio: int):
+        """try_acquire 재시도 루프 시작: 하위 우선순위가 이 대기자를 보고 양보하도록 등록"""
+        with self._cond:
+            self._waiting[prio] += 1
+
+    def leave(self, prio: int):
+        with self._cond:
+            self._waiting[prio] -= 1
+            self._cond.notify_all()
+
+    def observe(self, headers):
+        """응답 헤더(x-mbx-used-weight-1m, x-mbx-order-count-10s)로 서버 기준 사용량 갱신"""
+        if not headers:
+            return
+        used = _header_int(headers, "x-mbx-used-weight-1m")
+        orders = _header_int(headers, "x-mbx-order-count-10s")
+        with self._cond:
+            now = time.time()
+            if used is not None:
+                self._server_used = (int(now // 60), used)
+            if orders is not None:
+                self._server_orders = (int(now // 10), orders)
+
+    def penalize(self, status: int, headers=None):
+        """429(한도 초과)/418(IP 차단): Retry-After(없으면 60초) 동안 모든 요청 정지"""
+        retry = _header_int(headers or {}, "retry-after")
+        retry = 60 if retry is None else retry
+        with self._cond:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + retry)
+            self.stats["penalties"] += 1
+            self._cond.notify_all()
+        print(f"[RATE] HTTP {status} → {retry}s 동안 요청 중단")
+
+    def handle_error(self, e):
+        """ClientError에서 429/418이면 정지, 아니면 헤더만 반영"""
+        status = getattr(e, "status_code", None)
+        headers = getattr(e, "header", None)
+        if status in (418, 429):
+            self.penalize(status, headers)
+        elif headers:
+            self.observe(headers)
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            self._expire(time.monotonic())
+            return {"used_local": self._total, "used": self._used_now(), "limit": self.limit,
+                    "blocked_sec": max(self.blocked_until - time.monotonic(), 0.0),
+                    "throttled": dict(self.stats["throttled"]),
+                    "waited_sec": {k: round(v, 3) for k, v in self.stats["waited_sec"].items()},
+                    "penalties": self.stats["penalties"]}
+
+_governors: dict[str, RateGovernor] = {}
+_governors_lock = threading.Lock()
+
+def get_governor(key: str = "default", **kwargs) -> RateGovernor:
+    """호스트(base_url)별 공용 governor. 같은 IP 한도를 쓰는 클라이언트는 같은 객체를 공유"""
+    with _governors_lock:
+        g = _governors.get(key)
+        if g is None:
+            g = _governors[key] = RateGovernor(**kwargs)
+        return g
+
+class RateLimitedClient:
+    """
+    클라이언트 프록시: 모든 메서드 호출 전에 공용 RateGovernor에서 weight(주문이면 주문 수도)를 받아 간다.
+    여러 스레드(심볼 루프, 스트림 백필, 결정기)가 한 클라이언트와 한 예산을 공유하기 위한 것.
+    - 원본이 show_limit_usage=True면 {"limit_usage", "data"} 응답에서 헤더를 governor에 반영하고 data만 반환
+    - 429/418 ClientError는 governor를 Retry-After 동안 정지시킨 뒤 그대로 올림
+    메서드가 아닌 속성은 원본 그대로 노출.
+    """
+    def __init__(self, client, budget: RateGovernor | None = None):
+        self._client = client
+        self.budget = budget or RateGovernor()
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+        gov = self.budget
+
+        def call(*args, **kwargs):
+            w = request_weight(name, kwargs)
+            n = order_count(name, kwargs)
+            if w or n:
+                gov.acquire(w, current_priority(name), n)
+            try:
+                out = attr(*args, **kwargs)
+            except Exception as e:
+                gov.handle_error(e)
+                raise
+            if isinstance(out, dict) and "limit_usage" in out and "data" in out:
+                gov.observe(out["limit_usage"])
+                return out["data"]
+            return out
+
+        call.__name__ = name
+        return call
@@ -0,0 +1,448 @@
+"""
+프로세스 내 선물 거래소 시뮬레이터 (UMFutures 중 우리가 쓰는 메서드만 구현).
+
+- 저장된 분봉을 가상 시계(SimClock)에 맞춰 재생하고, 봉이 닫힐 때마다 주문을 매칭
+  · LIMIT: BUY는 low ≤ price, SELL은 high ≥ price 이면 지정가 체결(maker 수수료)
+  · STOP_MARKET / TAKE_PROFIT_MARKET: high/low가 stopPrice를 건드리면 stopPrice 체결(taker),
+    같은 봉에서 SL/TP가 모두 닿으면 SL 우선(보수적)
+  · MARKET: 마지막 종가로 즉시 체결
+- 가상 시계는 sleep() 호출만큼만 흐르므로 main 루프를 실시간보다 훨씬 빠르게 돌릴 수 있음
+- 단일 심볼, one-way, ISOLATED 포지션만 지원 (청산가/펀딩비는 모델링하지 않음)
+
+config.yaml의 exchange: "sim"(또는 env EXCHANGE=sim)이면 infra.client가 UMFutures 대신 이 객체를 um으로 노출한다.
+"""
+import itertools
+import math
+import threading
+import numpy as np
+from binance.error import ClientError
+
+MAKER_FEE = 0.0002
+TAKER_FEE = 0.0004
+STEP_MS = 60_000
+
+class SimClock:
+    """sleep()만큼만 흐르는 가상 시계 (초 단위 epoch)"""
+    def __init__(self, start_sec: float):
+        self._t = float(start_sec)
+        self._listeners = []
+
+    def time(self) -> float:
+        return self._t
+
+    def sleep(self, sec: float):
+        self._t += max(float(sec), 0.0)
+        for cb in self._listeners:
+            cb(self._t)
+
+    def on_advance(self, cb):
+        self._listeners.append(cb)
+
+def _err(code: int, msg: str, status: int = 400):
+    return ClientError(status, code, msg, {})
+
+def _s(x: float, dec: int = 8) -> str:
+    return f"{x:.{dec}f}".rstrip("0").rstrip(".") if x else "0"
+
+def _filters_from_symbol_info(s: dict) -> tuple[float, float, float, float]:
+    """exchange_info 심볼 항목 → (tick_size, step_size, min_qty, min_notional)"""
+    f = {x["filterType"]: x for x in s.get("filters", [])}
+    lot = f.get("LOT_SIZE") or f["MARKET_LOT_SIZE"]
+    nf = f.get("MIN_NOTIONAL") or f.get("NOTIONAL") or {}
+    return (float(f["PRICE_FILTER"]["tickSize"]), float(lot["stepSize"]), float(lot["minQty"]),
+            float(nf.get("notional") or nf.get("minNotional") or 0.0))
+
+class SimExchange:
+    def __init__(self, bars: dict, symbol: str = "BTCUSDT", clock: SimClock | None = None,
+                 balance: float = 10_000.0, leverage: int = 20,
+                 tick_size: float = 0.1, step_size: float = 0.001,
+                 min_qty: float = 0.001, min_notional: float = 100.0, symbol_info: dict | None = None):
+        """
+        bars: open_time(int64 ms), open, high, low, close, volume, taker_buy_base 배열 dict
+        symbol_info: 녹화한 exchange_info의 심볼 항목. 주면 필터를 여기서 읽고 exchange_info()도 그대로 돌려줌
+        """
+        if symbol_info is not None:
+            tick_size, step_size, min_qty, min_notional = _filters_from_symbol_info(symbol_info)
+        self.symbol_info = symbol_info
+        self.symbol = symbol
+        self.b = {k: np.asarray(v) for k, v in bars.items()}
+        self.n = len(self.b["open_time"])
+        self.clock = clock or SimClock(self.b["open_time"][0] / 1000 + 60)
+        self.tick_size, self.step_size = tick_size, step_size
+        self.min_qty, self.min_notional = min_qty, min_notional
+        self.leverage = leverage
+        self.margin_type = "ISOLATED"
+
+        self.wallet = float(balance)
+        self.pos_amt = 0.0
+        self.entry_price = 0.0
+        self.pos_margin = 0.0
+
+        self._orders: dict[int, dict] = {}
+        self._open: list[int] = []
+        self._trades: list[dict] = []
+        self._ids = itertools.count(1)
+        self._trade_ids = itertools.count(1)
+        self._cursor = 0  # 다음에 처리할 봉 인덱스
+        self._lock = threading.RLock()
+        self.clock.on_advance(lambda t: self._advance_to(int(t * 1000)))
+        self._advance_to(int(self.clock.time() * 1000))
+
+    # ---------- 재생/매칭 ----------
+    @property
+    def now_ms(self) -> int:
+        return int(self.clock.time() * 1000)
+
+    @property
+    def last_price(self) -> float:
+        i = max(self._cursor - 1, 0)
+        return float(self.b["close"][i])
+
+    @property
+    def exhausted(self) -> bool:
+        return self._cursor >= self.n
+
+    def _advance_to(self, t_ms: int):
+        """close_time ≤ t_ms 인 봉들을 순서대로 닫으며 주문 매칭"""
+        with self._lock:
+            ot = self.b["open_time"]
+            while self._cursor < self.n and ot[self._cursor] + STEP_MS - 1 <= t_ms:
+                self._match_bar(self._cursor)
+                self._cursor += 1
+
+    def _match_bar(self, i: int):
+        if not self._open:
+            return
+        o, h, l = float(self.b["open"][i]), float(self.b["high"][i]), float(self.b["low"][i])
+        bar_end = int(self.b["open_time"][i]) + STEP_MS - 1
+        # SL(STOP_MARKET)을 먼저 처리해 같은 봉 동시 터치 시 보수적으로 평가
+        order_rank = {"STOP_MARKET": 0, "TAKE_PROFIT_MARKET": 1, "LIMIT": 2}
+        for oid in sorted(self._open, key=lambda x: order_rank.get(self._orders[x]["type"], 3)):
+            od = self._orders[oid]
+            if od["status"] not in ("NEW", "PARTIALLY_FILLED"):
+                continue
+            side, typ = od["side"], od["type"]
+            if typ == "LIMIT":
+                px = float(od["price"])
+                if (side == "BUY" and l <= px) or (side == "SELL" and h >= px):
+                    qty = float(od["origQty"])
+                    if od["reduceOnly"]:
+                        # 대기 중 포지션이 사라졌으면 거래소처럼 만료
+                        qty = min(qty, self._reducible(side))
+                        if qty <= 0:
+                            od["status"], od["updateTime"] = "EXPIRED", bar_end
+                            continue
+                    self._fill(od, qty, px, MAKER_FEE, bar_end)
+            elif typ in ("STOP_MARKET", "TAKE_PROFIT_MARKET"):
+                sp = float(od["stopPrice"])
+                up_trigger = (typ == "STOP_MARKET") == (side == "BUY")
+                if (up_trigger and h >= sp) or (not up_trigger and l <= sp):
+                    # 갭으로 시가가 이미 넘어선 경우 시가 체결
+                    px = max(o, sp) if up_trigger else min(o, sp)
+                    self._trigger(od, px, bar_end)
+        self._open = [x for x in self._open if self._orders[x]["status"] in ("NEW", "PARTIALLY_FILLED")]
+
+    def _reducible(self, side: str) -> float:
+        """side 주문이 줄일 수 있는 포지션 수량 (포지션이 없거나 같은 방향이면 0)"""
+        if (side == "SELL") == (self.pos_amt > 0):
+            return abs(self.pos_amt)
+        return 0.0
+
+    def _trigger(self, od: dict, px: float, t_ms: int):
+        if od["closePosition"] or od["reduceOnly"]:
+            qty = self._reducible(od["side"])
+            if qty <= 0:
+                od["status"], od["updateTime"] = "EXPIRED", t_ms
+                return
+            if not od["closePosition"]:
+                qty = min(qty, float(od["origQty"]))
+        else:
+            qty = float(od["origQty"])
+        self._fill(od, qty, px, TAKER_FEE, t_ms)
+
+    def _fill(self, od: dict, qty: float, px: float, fee_rate: float, t_ms: int):
+        signed = qty if od["side"] == "BUY" else -qty
+        realized = 0.0
+        amt = self.pos_amt
+        if amt != 0 and (amt > 0) != (signed > 0):
+            closed = min(abs(signed), abs(amt))
+            realized = closed * (px - self.entry_price) * (1 if amt > 0 else -1)
+            self.pos_margin *= (abs(amt) - closed) / abs(amt)
+            self.wallet += realized
+            rest = abs(signed) - closed
+            self.pos_amt = amt + (closed if amt < 0 else -closed)
+            if abs(self.pos_amt) < 1e-12:
+                self.pos_amt, self.entry_price, self.pos_margin = 0.0, 0.0, 0.0
+            if rest > 0:  # 반대 방향으로 넘어간 잔량은 새 포지션
+                self.pos_amt = rest if signed > 0 else -rest
+                self.entry_price = px
+                self.pos_margin = rest * px / self.leverage
+        else:
+            new_abs = abs(amt) + qty
+            self.entry_price = (abs(amt) * self.entry_price + qty * px) / new_abs
+            self.pos_amt = amt + signed
+            self.pos_margin += qty * px / self.leverage
+
+        fee = qty * px * fee_rate
+        self.wallet -= fee
+        od.update(status="FILLED", executedQty=_s(qty), avgPrice=_s(px), updateTime=t_ms)
+        self._trades.append({
+            "symbol": self.symbol, "id": next(self._trade_ids), "orderId": od["orderId"],
+            "side": od["side"], "price": _s(px), "qty": _s(qty), "quoteQty": _s(qty * px),
+            "commission": _s(fee), "commissionAsset": "USDT", "realizedPnl": _s(realized),
+            "maker": fee_rate == MAKER_FEE, "time": t_ms,
+        })
+
+    # ---------- 주문 ----------
+    def _check_symbol(self, symbol):
+        if symbol != self.symbol:
+            raise _err(-1121, "Invalid symbol.")
+
+    def _check_filters(self, price: float | None, qty: float | None,
+                       check_tick: bool = True, check_notional: bool = True):
+        def off_grid(v, step):
+            return abs(round(v / step) * step - v) > step * 1e-6
+        if price is not None and check_tick and off_grid(price, self.tick_size):
+            raise _err(-4014, "Price not increased by tick size.")
+        if qty is not None:
+            if off_grid(qty, self.step_size):
+                raise _err(-1111, "Precision is over the maximum defined for this asset.")
+            if qty < self.min_qty:
+                raise _err(-4003, "Quantity less than or equal to zero.")
+            if price is not None and check_notional and price * qty < self.min_notional:
+                raise _err(-4164, f"Order's notional must be no smaller than {self.min_notional}")
+
+    def new_order(self, symbol: str, side: str, type: str, quantity=None, price=None,
+                  stopPrice=None, timeInForce=None, closePosition=None, reduceOnly=None,
+                  workingType=None, **kwargs):
+        self._check_symbol(symbol)
+        with self._lock:
+            side, typ = side.upper(), type.upper()
+            qty = float(quantity) if quantity is not None else None
+            px = float(price) if price is not None else None
+            sp = float(stopPrice) if stopPrice is not None else None
+            close_pos = str(closePosition).lower() == "true"
+            reduce = str(reduceOnly).lower() == "true"
+
+            if typ == "LIMIT":
+                self._check_filters(px, qty)
+                if timeInForce == "GTX" and ((side == "BUY" and px >= self.last_price) or
+                                             (side == "SELL" and px <= self.last_price)):
+                    raise _err(-5022, "Due to the order could not be executed as maker, the Post Only order will be rejected.")
+            elif typ == "MARKET":
+                # 시장가는 가격 tick 검사 없음, reduceOnly는 최소 명목가 면제 (거래소와 동일)
+                self._check_filters(self.last_price, qty, check_tick=False, check_notional=not reduce)
+            elif typ in ("STOP_MARKET", "TAKE_PROFIT_MARKET"):
+                self._check_filters(sp, None if close_pos else qty)
+            else:
+                raise _err(-1116, "Invalid orderType.")
+            if reduce and not close_pos and typ in ("MARKET", "LIMIT") and self._reducible(side) <= 0:
+                # 포지션이 없거나 같은 방향 reduceOnly (qty=0 체결 방지)
+                raise _err(-2022, "ReduceOnly Order is rejected.")
+
+            oid = next(self._ids)
+            od = {
+                "orderId": oid, "symbol": symbol, "clientOrderId": f"sim_{oid}",
+                "side": side, "type": typ, "origType": typ, "status": "NEW",
+                "price": _s(px or 0), "avgPrice": "0", "stopPrice": _s(sp or 0),
+                "origQty": _s(qty or 0), "executedQty": "0",
+                "reduceOnly": reduce or close_pos, "closePosition": close_pos,
+                "timeInForce": timeInForce or "GTC", "workingType": workingType or "CONTRACT_PRICE",
+                "positionSide": "BOTH", "updateTime": self.now_ms,
+            }
+            self._orders[oid] = od
+
+            if typ == "MARKET":
+                if reduce:
+                    qty = min(qty, self._reducible(side))
+                self._fill(od, qty, self.last_price, TAKER_FEE, self.now_ms)
+            elif typ == "LIMIT" and ((side == "BUY" and px >= self.last_price) or
+                                     (side == "SELL" and px <= self.last_price)):
+                self._fill(od, qty, self.last_price, TAKER_FEE, self.now_ms)  # 즉시 체결(taker)
+            else:
+                self._open.append(oid)
+            return dict(od)
+
+    def new_batch_order(self, batchOrders: list, **kwargs):
+        out = []
+        for params in batchOrders:
+            try:
+                out.append(self.new_order(**params))
+            except ClientError as e:
+                out.append({"code": e.error_code, "msg": e.error_message})
+        return out
+
+    def get_order(self, symbol: str, orderId=None, **kwargs):
+        self._check_symbol(symbol)
+        with self._lock:
+            od = self._orders.get(int(orderId))
+            if od is None:
+                raise _err(-2013, "Order does not exist.")
+            return dict(od)
+
+    def cancel_order(self, symbol: str, orderId=None, **kwargs):
+        self._check_symbol(symbol)
+        with self._lock:
+            od = self._orders.get(int(orderId))
+            if od is None or od["status"] not in ("NEW", "PARTIALLY_FILLED"):
+                raise _err(-2011, "Unknown order sent.")
+            od.update(status="CANCELED", updateTime=self.now_ms)
+            self._open.remove(od["orderId"])
+            return dict(od)
+
+    def cancel_batch_order(self, symbol: str, orderIdList: list = None, origClientOrderIdList=None, **kwargs):
+        out = []
+        for oid in orderIdList or []:
+            try:
+                out.append(self.cancel_order(symbol=symbol, orderId=oid))
+            except ClientError as e:
+                out.append({"code": e.error_code, "msg": e.error_message})
+        return out
+
+    def cancel_open_orders(self, symbol: str, **kwargs):
+        self._check_symbol(symbol)
+        for oid in list(self._open):
+            self.cancel_order(symbol=symbol, orderId=oid)
+        return {"code": 200, "msg": "The operation of cancel all open order is done."}
+
+    def get_open_orders(self, symbol: str, orderId=None, **kwargs):
+        self._check_symbol(symbol)
+        with self._lock:
+            return [dict(self._orders[x]) for x in self._open]
+
+    def get_orders(self, symbol: str, limit: int = 500, **kwargs):
+        self._check_symbol(symbol)
+        with self._lock:
+            return [dict(o) for o in list(self._orders.values())[-limit:]]
+
+    # ---------- 계정/포지션 ----------
+    def change_margin_type(self, symbol: str, marginType: str, **kwargs):
+        self.margin_type = marginType.upper()
+        return {"code": 200, "msg": "success"}
+
+    def change_leverage(self, symbol: str, leverage: int, **kwargs):
+        self.leverage = int(leverage)
+        return {"symbol": symbol, "leverage": self.leverage, "maxNotionalValue": "1000000"}
+
+    def get_position_risk(self, symbol: str | None = None, **kwargs):
+        with self._lock:
+            mark = self.last_price
+            upnl = self.pos_amt * (mark - self.entry_price) if self.pos_amt else 0.0
+            liq = 0.0
+            if self.pos_amt:
+                liq = self.entry_price * (1 - 1 / self.leverage) if self.pos_amt > 0 \
+                    else self.entry_price * (1 + 1 / self.leverage)
+            return [{
+                "symbol": self.symbol, "positionAmt": _s(self.pos_amt), "entryPrice": _s(self.entry_price),
+                "breakEvenPrice": _s(self.entry_price * (1 + 2 * TAKER_FEE * math.copysign(1, self.pos_amt or 1))
+                                     if self.pos_amt else 0),
+                "markPrice": _s(mark), "unRealizedProfit": _s(upnl), "liquidationPrice": _s(liq),
+                "leverage": str(self.leverage), "marginType": self.margin_type.lower(),
+                "isolatedWallet": _s(self.pos_margin), "positionSide": "BOTH", "updateTime": self.now_ms,
+            }]
+
+    def balance(self, **kwargs):
+        with self._lock:
+            mark = self.last_price
+            upnl = self.pos_amt * (mark - self.entry_price) if self.pos_amt else 0.0
+            return [{
+                "accountAlias": "sim", "asset": "USDT", "balance": _s(self.wallet),
+                "crossWalletBalance": _s(self.wallet - self.pos_margin), "crossUnPnl": "0",
+                "availableBalance": _s(self.wallet - self.pos_margin),
+                "maxWithdrawAmount": _s(self.wallet - self.pos_margin), "updateTime": self.now_ms,
+                "unrealizedProfit": _s(upnl),
+            }]
+
+    def get_account_trades(self, symbol: str, orderId=None, fromId=None, limit: int = 500, **kwargs):
+        self._check_symbol(symbol)
+        with self._lock:
+            rows = self._trades
+            if orderId is not None:
+                rows = [t for t in rows if t["orderId"] == int(orderId)]
+            if fromId is not None:
+                rows = [t for t in rows if t["id"] >= int(fromId)]
+            return [dict(t) for t in rows[:limit]]
+
+    # ---------- 시세 ----------
+    def exchange_info(self, **kwargs):
+        if self.symbol_info is not None:
+            return {"symbols": [self.symbol_info]}
+        return {"symbols": [{
+            "symbol": self.symbol, "status": "TRADING",
+            "filters": [
+                {"filterType": "PRICE_FILTER", "tickSize": _s(self.tick_size), "minPrice": "0.1", "maxPrice": "4529764"},
+                {"filterType": "LOT_SIZE", "stepSize": _s(self.step_size), "minQty": _s(self.min_qty), "maxQty": "1000"},
+                {"filterType": "MARKET_LOT_SIZE", "stepSize": _s(self.step_size), "minQty": _s(self.min_qty), "maxQty": "120"},
+                {"filterType": "MIN_NOTIONAL", "notional": _s(self.min_notional)},
+            ],
+        }]}
+
+    def ticker_price(self, symbol: str | None = None, **kwargs):
+        return {"symbol": self.symbol, "price": _s(self.last_price), "time": self.now_ms}
+
+    def depth(self, symbol: str, limit: int = 5, **kwargs):
+        """마지막 종가 주변의 합성 호가 (1 tick 스프레드)"""
+        bid0 = math.floor(self.last_price / self.tick_size) * self.tick_size
+        dec = max(0, -int(math.floor(math.log10(self.tick_size))))
+        bids = [[f"{bid0 - i * self.tick_size:.{dec}f}", "1.000"] for i in range(limit)]
+        asks = [[f"{bid0 + (i + 1) * self.tick_size:.{dec}f}", "1.000"] for i in range(limit)]
+        return {"lastUpdateId": self._cursor, "E": self.now_ms, "T": self.now_ms, "bids": bids, "asks": asks}
+
+    def klines(self, symbol: str, interval: str, startTime=None, endTime=None, limit: int = 500, **kwargs):
+        """현재 가상 시각까지 '닫힌' 봉만 반환 (1m만 지원)"""
+        self._check_symbol(symbol)
+        if interval != "1m":
+            raise _err(-1120, "Invalid interval.")
+        ot = self.b["open_time"]
+        hi = self._cursor
+        if endTime is not None:
+            hi = min(hi, int(np.searchsorted(ot, int(endTime), side="right")))
+        lo = int(np.searchsorted(ot, int(startTime), side="left")) if startTime is not None else 0
+        if startTime is None:
+            lo = max(lo, hi - limit)
+        hi = min(hi, lo + limit)
+        b = self.b
+        return [[int(ot[i]), _s(b["open"][i]), _s(b["high"][i]), _s(b["low"][i]), _s(b["close"][i]),
+                 _s(b["volume"][i]), int(ot[i]) + STEP_MS - 1, "0", 0, _s(b["taker_buy_base"][i]), "0", "0"]
+                for i in range(lo, hi)]
+
+def create_sim_exchange(start: str | None = None, end: str | None = None,
+                        warmup_bars: int = 1000, balance: float = 10_000.0,
+                        klines_path: str | None = None, exchange_info_path: str | None = None):
+    """
+    설정의 분봉 저장소로 SimExchange + SimClock 생성.
+    start: 재생 시작 시각(없으면 처음부터 warmup_bars 이후), end: 재생 종료 시각
+    klines_path: 저장소 대신 읽을 분봉 파일(.parquet/.csv, 저장소와 같은 컬럼) — 벤치마크 fixture 등
+    exchange_info_path: 녹화한 exchange_info JSON (심볼 필터를 기본값 대신 여기서)
+    """
+    import json
+    import pandas as pd
+    from AI.utils import load_config
+    from AI.kline_store import open_kline_store
+
+    cfg = load_config()
+    end_ts = pd.Timestamp(end, tz="UTC") if end else None
+    if klines_path:
+        df = pd.read_csv(klines_path) if klines_path.endswith((".csv", ".csv.gz")) else pd.read_parquet(klines_path)
+        df["time"] = pd.to_datetime(df["time"], utc=True)
+        if end_ts is not None:
+            df = df[df["time"] <= end_ts]
+    else:
+        df = open_kline_store(cfg).read(end=end_ts)
+    if df.empty:
+        raise RuntimeError("sim exchange: 분봉 저장소가 비어 있음. fetch_klines 먼저 실행")
+    df = df.sort_values("time")
+    bars = {
+        "open_time": df["time"].dt.tz_convert(None).to_numpy().astype("datetime64[ms]").astype(np.int64),
+        **{c: df[c].to_numpy(float) for c in ("open", "high", "low", "close", "volume", "taker_buy_base")},
+    }
+    if start:
+        start_ms = int(pd.Timestamp(start, tz="UTC").timestamp() * 1000)
+    else:
+        start_ms = int(bars["open_time"][min(warmup_bars, len(df) - 1)])
+    symbol_info = None
+    if exchange_info_path:
+        with open(exchange_info_path) as f:
+            symbol_info = next(s for s in json.load(f)["symbols"] if s["symbol"] == cfg.symbol)
+    clock = SimClock(start_ms / 1000)
+    return SimExchange(bars, symbol=cfg.symbol, clock=clock, balance=balance, symbol_info=symbol_info), clock
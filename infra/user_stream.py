@@ -0,0 +1,207 @@
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict
+from infra.client import um, STREAM_URL
+
+# 스트림 끊김을 구독자에게 알리는 내부 이벤트
+STREAM_CLOSED = "STREAM_CLOSED"
+TERMINAL_STATUSES = ("FILLED", "CANCELED", "EXPIRED", "REJECTED")
+
+def order_from_event(o: dict) -> dict:
+    """ORDER_TRADE_UPDATE의 "o" 페이로드 → get_order 응답과 같은 키 구조"""
+    return {
+        "symbol": o.get("s"),
+        "orderId": int(o.get("i")),
+        "clientOrderId": o.get("c"),
+        "side": o.get("S"),
+        "type": o.get("o"),
+        "status": o.get("X"),
+        "price": o.get("p"),
+        "avgPrice": o.get("ap"),
+        "stopPrice": o.get("sp"),
+        "origQty": o.get("q"),
+        "executedQty": o.get("z"),
+        "reduceOnly": bool(o.get("R", False)),
+        "closePosition": bool(o.get("cp", False)),
+        "workingType": o.get("wt"),
+        "timeInForce": o.get("f"),
+        "updateTime": o.get("T"),
+    }
+
+class UserDataStream:
+    """
+    listenKey 기반 user-data stream.
+    ORDER_TRADE_UPDATE / ACCOUNT_UPDATE 이벤트를 subscribe()로 받은 큐에 push 하고,
+    주문별 최신 상태를 (symbol, orderId) 키로 메모리에 유지한다.
+    - 종료 상태(FILLED/CANCELED/EXPIRED/REJECTED) 주문은 열린 주문 표에서 빼고,
+      구독 직전 체결 확인용으로 최근 done_max건만 따로 보관
+    - stream_url을 로컬 WebSocket 대역 서버로 지정하면 녹화된 이벤트로 재생 가능
+    - 끊기면 구독 큐에 STREAM_CLOSED를 넣고, keepalive 스레드가 재접속을 시도
+      (재접속 전에 이전 WebSocket을 멈추고 이전 listenKey를 닫음)
+    - ws_cls: WebSocket 클라이언트 클래스 (기본 UMFuturesWebsocketClient, 테스트에서는 대역)
+    """
+    def __init__(self, client=None, stream_url: str = STREAM_URL,
+                 keepalive_sec: float = 1800.0, reconnect_sec: float = 5.0, ws_cls=None,
+                 done_max: int = 256):
+        self._client = client or um
+        self._ws_cls = ws_cls
+        self.stream_url = stream_url
+        self.keepalive_sec = keepalive_sec
+        self.reconnect_sec = reconnect_sec
+        self.listen_key = None
+        self.connected = False
+        self._ws = None
+        self._gen = 0  # 연결 세대: 이전 연결의 늦은 콜백은 무시
+        self._orders: dict[tuple[str, int], dict] = {}
+        self._done: OrderedDict[tuple[str, int], dict] = OrderedDict()
+        self.done_max = done_max
+        self._subs: list[queue.Queue] = []
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._keepalive = None
+
+    # ---------- 연결 관리 ----------
+    def start(self):
+        if self._ws_cls is None:
+            from binance.websocket.um_futures.websocket_client import UMFuturesWebsocketClient
+            self._ws_cls = UMFuturesWebsocketClient
+
+        self._stop.clear()
+        self._connect()
+        if self._keepalive is None or not self._keepalive.is_alive():
+            self._keepalive = threading.Thread(target=self._keepalive_loop, daemon=True)
+            self._keepalive.start()
+        return self
+
+    def _connect(self):
+        self._teardown()  # 재접속: 이전 소켓 스레드/listenKey가 남지 않도록
+        self.listen_key = self._client.new_listen_key()["listenKey"]
+        self._gen += 1
+        gen = self._gen
+        self._ws = self._ws_cls(
+            stream_url=self.stream_url,
+            on_message=lambda ws, raw: gen == self._gen and self._on_message(ws, raw),
+            on_close=lambda *a: gen == self._gen and self._on_close(*a),
+            on_error=lambda ws, err: gen == self._gen and self._on_error(ws, err),
+        )
+        self.connected = True  # 구독 직후 바로 끊겨도 on_close가 반영되도록 먼저
+        self._ws.user_data(listen_key=self.listen_key)
+        print("[STREAM] user-data stream 연결")
+
+    def _teardown(self):
+        """현재 WebSocket을 멈추고 listenKey를 닫음 (실패는 무시)"""
+        ws, key = self._ws, self.listen_key
+        self._ws, self.listen_key = None, None
+        self._gen += 1  # 멈추는 중에 오는 on_close 등은 이전 세대로 취급
+        if ws is not None:
+            try:
+                ws.stop()
+            except Exception:
+                pass
+        if key:
+            try:
+                self._client.close_listen_key(listenKey=key)
+            except Exception:
+                pass
+
+    def stop(self):
+        self._stop.set()
+        self.connected = False
+        self._teardown()
+
+    def _keepalive_loop(self):
+        last_renew = time.monotonic()
+        while not self._stop.wait(self.reconnect_sec):
+            try:
+                # 수신 스레드가 예외로 끝나면 on_close가 오지 않으므로 직접 확인
+                sm = getattr(self._ws, "socket_manager", None)
+                if self.connected and sm is not None and not sm.is_alive():
+                    self._mark_closed("socket thread exited")
+                if not self.connected:
+                    self._connect()
+                    last_renew = time.monotonic()
+                elif time.monotonic() - last_renew >= self.keepalive_sec:
+                    self._client.renew_listen_key(listenKey=self.listen_key)
+                    last_renew = time.monotonic()
+            except Exception as e:
+                print("[STREAM] keepalive/재접속 실패:", e)
+
+    def _on_close(self, *_):
+        self._mark_closed("closed")
+
+    def _on_error(self, _, err):
+        self._mark_closed(f"error: {err}")
+
+    def _mark_closed(self, why: str):
+        if not self.connected:
+            return
+        self.connected = False
+        print(f"[STREAM] user-data stream 끊김 ({why}) → REST 폴링 대체")
+        self._publish({"e": STREAM_CLOSED})
+
+    # ---------- 이벤트 처리 ----------
+    def _on_message(self, _, raw):
+        try:
+            evt = json.loads(raw) if isinstance(raw, (str, bytes)) else raw
+        except ValueError:
+            return
+        self.handle(evt)
+
+    def handle(self, evt: dict):
+        """이벤트 1건 반영 (WebSocket 콜백 또는 녹화 이벤트 재생에서 호출)"""
+        etype = evt.get("e")
+        if etype == "ORDER_TRADE_UPDATE":
+            od = order_from_event(evt.get("o", {}))
+            key = (od["symbol"], od["orderId"])
+            with self._lock:
+                if od["status"] in TERMINAL_STATUSES:
+                    self._orders.pop(key, None)
+                    self._done[key] = od
+                    self._done.move_to_end(key)
+                    while len(self._done) > self.done_max:
+                        self._done.popitem(last=False)
+                else:
+                    self._orders[key] = od
+        elif etype == "listenKeyExpired":
+            self._mark_closed("listenKey expired")
+            return
+        elif etype != "ACCOUNT_UPDATE":
+            return  # 구독 응답/기타 이벤트는 무시
+        self._publish(evt)
+
+    def _publish(self, evt: dict):
+        with self._lock:
+            subs = list(self._subs)
+            listeners = list(self._listeners)
+        for fn in listeners:
+            try:
+                fn(evt)
+            except Exception as e:
+                print("[STREAM] listener 오류:", e)
+        for q in subs:
+            q.put(evt)
+
+    def add_listener(self, fn):
+        """발행되는 모든 이벤트(STREAM_CLOSED 포함)를 수신 스레드에서 동기 호출 (큐 구독보다 먼저)"""
+        with self._lock:
+            self._listeners.append(fn)
+
+    def subscribe(self) -> queue.Queue:
+        q = queue.Queue()
+        with self._lock:
+            self._subs.append(q)
+        return q
+
+    def unsubscribe(self, q: queue.Queue):
+        with self._lock:
+            if q in self._subs:
+                self._subs.remove(q)
+
+    def order(self, symbol: str, order_id: int) -> dict | None:
+        """스트림으로 마지막 수신한 주문 상태(get_order 형태), 없으면 None (종료 주문은 최근 done_max건만)"""
+        key = (symbol, int(order_id))
+        with self._lock:
+            return self._orders.get(key) or self._done.get(key)
@@ -1,7 +1,9 @@
 # status/history.py
+import asyncio
 from infra.client import um
+from status.trade_store import get_trade_store
 
-def get_order_trades_summary(symbol: str, order_id: int):
+def get_order_trades_summary(symbol: str, order_id: int, executed_qty: float | None = None):
     """
     체결 히스토리 합산:
       - avg_price: 체결가중평균
@@ -9,8 +11,31 @@ def get_order_trades_summary(symbol: str, order_id: int):
       - commission: 총 수수료
       - commission_asset: 수수료 자산(보통 USDT; 혼재 시 첫 값 반환)
       - realized_pnl: 실현손익(수수료 제외)
+    체결은 로컬 저장소(status.trade_store)에서 읽고, 없거나 합산 수량이 executed_qty(주문의 executedQty)에
+    못 미칠 때(부분 체결만 저장된 경우) 증분 동기화(fromId) 후 다시 읽음
     """
-    trades = um.get_account_trades(symbol=symbol, orderId=order_id) or []
+    return summarize_trades(_order_trades(symbol, order_id, executed_qty))
+
+async def get_order_trades_summary_async(symbol: str, order_id: int, executed_qty: float | None = None):
+    """get_order_trades_summary의 async 버전 (SQLite/동기화는 스레드에서)"""
+    return summarize_trades(await asyncio.to_thread(_order_trades, symbol, order_id, executed_qty))
+
+def _order_trades(symbol: str, order_id: int, executed_qty: float | None = None) -> list:
+    store = get_trade_store()
+    rows = store.order_trades(symbol, order_id)
+    if not rows or (executed_qty and _filled_qty(rows) < executed_qty):
+        store.sync(symbol)
+        rows = store.order_trades(symbol, order_id)
+    if not rows:
+        # 저장소 동기화 범위 밖(예: 처음 동기화 이전의 오래된 주문) → 주문 단위 조회
+        rows = um.get_account_trades(symbol=symbol, orderId=order_id) or []
+    return rows
+
+def _filled_qty(trades: list) -> float:
+    return sum(float(t.get("qty", 0) or 0) for t in trades)
+
+def summarize_trades(trades: list) -> dict:
+    """userTrades 응답 → get_order_trades_summary 반환 형식"""
     if not trades:
         return {"avg_price": None, "filled_qty": 0.0, "commission": 0.0,
                 "commission_asset": None, "realized_pnl": 0.0}
@@ -41,13 +66,24 @@ def get_order_trades_summary(symbol: str, order_id: int):
     }
 
 def calc_pnl_roi_from_order(symbol: str, order_id: int,
-                            entry_price_ref: float, iso_wallet_ref: float | None):
+                            entry_price_ref: float, iso_wallet_ref: float | None,
+                            executed_qty: float | None = None):
     """
     get_order_trades_summary 기반으로 Net PnL/ROI 계산
     - realized: 실현손익(수수료 제외)
     - net: realized - commission
     """
-    s = get_order_trades_summary(symbol, order_id)
+    return pnl_roi_from_summary(get_order_trades_summary(symbol, order_id, executed_qty), iso_wallet_ref)
+
+async def calc_pnl_roi_from_order_async(symbol: str, order_id: int,
+                                        entry_price_ref: float, iso_wallet_ref: float | None,
+                                        executed_qty: float | None = None):
+    """calc_pnl_roi_from_order의 async 버전"""
+    return pnl_roi_from_summary(await get_order_trades_summary_async(symbol, order_id, executed_qty),
+                                iso_wallet_ref)
+
+def pnl_roi_from_summary(s: dict, iso_wallet_ref: float | None) -> dict:
+    """체결 요약 → Net PnL/ROI"""
     avg = s["avg_price"]
     qty = s["filled_qty"]
     realized = s["realized_pnl"]            # 수수료 제외 실현손익
@@ -0,0 +1,199 @@
+# status/journal.py
+"""
+거래 저널 (SQLite).
+거래 1건 = trades 테이블 1행 (진입/청산 시각·가격, 수량, 수수료, 순손익, ROI, 청산 이유, 모델 버전, 결정 신뢰도).
+- append()는 큐에 넣고 바로 반환. 백그라운드 스레드가 모아서 한 트랜잭션으로 기록(flush_sec/batch 단위)
+- 조회는 호출 스레드에서 별도 읽기 연결로 (WAL 모드라 기록 중에도 읽기 가능)
+
+  TRADE_JOURNAL=data/trades.sqlite3   (기본값, data/는 .gitignore)
+  python -m status.journal --daily [--symbol BTCUSDT] [--days 30]
+"""
+import argparse
+import os
+import queue
+import sqlite3
+import threading
+import typing
+from dataclasses import dataclass, fields
+from infra.client import clock, EXCHANGE
+
+JOURNAL_PATH = os.getenv("TRADE_JOURNAL", os.path.join("data", "trades.sqlite3"))
+
+@dataclass
+class TradeRecord:
+    symbol: str
+    side: str                 # LONG / SHORT
+    reason: str               # TP / SL / IDLE
+    opened_at: float          # epoch 초 (sim이면 가상 시계)
+    closed_at: float
+    entry_price: float
+    exit_price: float | None
+    qty: float | None
+    margin: float
+    leverage: int
+    fee: float
+    fee_asset: str | None
+    realized: float           # 수수료 제외 실현손익
+    net: float                # 수수료 포함 순손익
+    roi: float | None         # net / margin
+    close_order_id: int | None
+    model_version: str | None
+    confidence: float | None
+    exchange: str = EXCHANGE
+
+_COLUMNS = [f.name for f in fields(TradeRecord)]
+_SQL_TYPES = {float: "REAL", int: "INTEGER", str: "TEXT"}
+
+def _sql_type(t) -> str:
+    """필드 타입 → SQLite 컬럼 타입 (X | None은 X로)"""
+    args = [a for a in typing.get_args(t) if a is not type(None)]
+    return _SQL_TYPES[args[0] if args else t]
+
+def _schema() -> str:
+    cols = [f"{f.name} {_sql_type(f.type)}" for f in fields(TradeRecord)]
+    return f"CREATE TABLE IF NOT EXISTS trades (id INTEGER PRIMARY KEY AUTOINCREMENT, {', '.join(cols)})"
+
+def record_from_close(symbol: str, pos: dict, reason: str, close_order_id, stats: dict | None,
+                      decision: dict | None, opened_at: float) -> TradeRecord:
+    """main/engine 루프의 청산 결과(calc_pnl_roi_from_order) → TradeRecord"""
+    stats = stats or {}
+    decision = decision or {}
+    return TradeRecord(
+        symbol=symbol, side=pos["side"], reason=reason,
+        opened_at=opened_at, closed_at=clock.time(),
+        entry_price=pos["entryPrice"], exit_price=stats.get("avg"), qty=stats.get("qty"),
+        margin=pos["isolatedWallet"], leverage=pos["leverage"],
+        fee=stats.get("fee") or 0.0, fee_asset=stats.get("fee_asset"),
+        realized=stats.get("realized") or 0.0, net=stats.get("net") or 0.0, roi=stats.get("roi"),
+        close_order_id=close_order_id,
+        model_version=decision.get("model_version"), confidence=decision.get("confidence"),
+    )
+
+class TradeJournal:
+    def __init__(self, path: str = JOURNAL_PATH, flush_sec: float = 1.0, batch: int = 100):
+        self.path = path
+        self.flush_sec = flush_sec
+        self.batch = batch
+        self._q: queue.SimpleQueue = queue.SimpleQueue()
+        self._stop = object()
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        with self._connect() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(_schema())
+            con.execute("CREATE INDEX IF NOT EXISTS trades_closed ON trades(symbol, closed_at)")
+        self._thread = threading.Thread(target=self._writer, name="trade-journal", daemon=True)
+        self._thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    # ---------- 기록 ----------
+    def append(self, rec: TradeRecord):
+        """논블로킹. 실제 기록은 writer 스레드가 한다"""
+        self._q.put(rec)
+
+    def _writer(self):
+        con = self._connect()
+        sql = f"INSERT INTO trades ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})"
+        done = False
+        while not done:
+            try:
+                items = [self._q.get(timeout=self.flush_sec)]
+            except queue.Empty:
+                continue
+            while len(items) < self.batch:
+                try:
+                    items.append(self._q.get_nowait())
+                except queue.Empty:
+                    break
+            if self._stop in items:
+                done = True
+                items = [x for x in items if x is not self._stop]
+            if not items:
+                continue
+            try:
+                with con:
+                    con.executemany(sql, [tuple(getattr(r, c) for c in _COLUMNS) for r in items])
+            except sqlite3.Error as e:
+                print(f"[JOURNAL] 기록 실패({len(items)}건):", e)
+        con.close()
+
+    def close(self, timeout: float | None = 10.0):
+        """남은 행을 모두 기록하고 writer 종료"""
+        self._q.put(self._stop)
+        self._thread.join(timeout)
+
+    # ---------- 조회 ----------
+    def _query(self, sql: str, args=()) -> list[dict]:
+        con = self._connect()
+        try:
+            con.row_factory = sqlite3.Row
+            return [dict(r) for r in con.execute(sql, args)]
+        finally:
+            con.close()
+
+    @staticmethod
+    def _where(symbol: str | None, since: float | None) -> tuple[str, list]:
+        cond, args = [], []
+        if symbol:
+            cond.append("symbol = ?")
+            args.append(symbol)
+        if since is not None:
+            cond.append("closed_at >= ?")
+            args.append(since)
+        return (" WHERE " + " AND ".join(cond)) if cond else "", args
+
+    def daily_pnl(self, symbol: str | None = None, since: float | None = None) -> list[dict]:
+        """UTC 일자별: 거래 수, 순손익, 수수료, 승/패, 승률"""
+        where, args = self._where(symbol, since)
+        rows = self._query(
+            "SELECT date(closed_at, 'unixepoch') AS day, COUNT(*) AS trades, SUM(net) AS net, "
+            "SUM(fee) AS fee, SUM(net > 0) AS wins, SUM(net <= 0) AS losses "
+            f"FROM trades{where} GROUP BY day ORDER BY day", args)
+        for r in rows:
+            r["win_rate"] = r["wins"] / r["trades"] if r["trades"] else None
+        return rows
+
+    def summary(self, symbol: str | None = None, since: float | None = None) -> dict:
+        """전체 누적: 거래 수, TP/SL/IDLE, 총 순손익, 승률, 평균 ROI"""
+        where, args = self._where(symbol, since)
+        r = self._query(
+            "SELECT COUNT(*) AS trades, COALESCE(SUM(net), 0) AS total_net, SUM(net > 0) AS wins, "
+            "SUM(reason = 'TP') AS tp, SUM(reason = 'SL') AS sl, SUM(reason = 'IDLE') AS idle, "
+            f"AVG(roi) AS avg_roi FROM trades{where}", args)[0]
+        r["win_rate"] = (r["wins"] or 0) / r["trades"] if r["trades"] else None
+        return r
+
+    def win_rate(self, symbol: str | None = None, since: float | None = None) -> float | None:
+        return self.summary(symbol, since)["win_rate"]
+
+_journal: TradeJournal | None = None
+_journal_lock = threading.Lock()
+
+def get_journal() -> TradeJournal:
+    """프로세스 공용 저널 (최초 호출 시 생성, 경로는 TRADE_JOURNAL)"""
+    global _journal
+    if _journal is None:
+        with _journal_lock:
+            if _journal is None:
+                _journal = TradeJournal()
+    return _journal
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--path", default=JOURNAL_PATH)
+    ap.add_argument("--symbol", default=None)
+    ap.add_argument("--days", type=int, default=None, help="최근 N일만")
+    ap.add_argument("--daily", action="store_true")
+    args = ap.parse_args()
+
+    j = TradeJournal(args.path)
+    since = clock.time() - args.days * 86400 if args.days else None
+    if args.daily:
+        for r in j.daily_pnl(args.symbol, since):
+            print(f"{r['day']}  trades={r['trades']:4d}  net={r['net']:+.4f}  fee={r['fee']:.4f}  "
+                  f"win={r['win_rate']:.1%}")
+    print(j.summary(args.symbol, since))
+    j.close()
@@ -1,5 +1,6 @@
 from binance.error import ParameterRequiredError
 from infra.client import um
+from status.state import account_state
 
 def get_open_orders_safe(symbol: str):
     """
@@ -15,9 +16,28 @@ def get_open_orders_safe(symbol: str):
         return [o for o in hist if (o.get("status") in OPEN_STATUSES)]
 
 def get_open_orders(symbol: str):
-    """심볼의 모든 미체결 주문(보호주문 + 일반 지정가 등) 리스트 반환. 없으면 []"""
-    oo = get_open_orders_safe(symbol)
+    """
+    심볼의 모든 미체결 주문(보호주문 + 일반 지정가 등) 리스트 반환. 없으면 []
+    로컬 상태(status.state)가 최신이면 REST 없이 메모리에서 답함
+    """
+    rows = account_state.open_order_rows(symbol)
+    if rows is None:
+        rows = get_open_orders_safe(symbol)
+        account_state.sync_open_orders(symbol, rows)
+    return parse_open_orders(rows)
+
+async def get_open_orders_async(symbol: str):
+    """get_open_orders의 async 버전 (비동기 클라이언트는 /openOrders를 바로 호출)"""
+    from infra.aio_client import aum
+
+    rows = account_state.open_order_rows(symbol)
+    if rows is None:
+        rows = await aum().get_open_orders(symbol=symbol) or []
+        account_state.sync_open_orders(symbol, rows)
+    return parse_open_orders(rows)
 
+def parse_open_orders(oo: list) -> list[dict]:
+    """openOrders 응답 → get_open_orders 반환 형식"""
     def classify_kind(t: str) -> str:
         t = (t or "").upper()
         if t == "LIMIT": return "limit"
@@ -1,4 +1,5 @@
 from infra.client import um
+from status.state import account_state
 
 def get_position(symbol: str):
     """
@@ -6,8 +7,26 @@ def get_position(symbol: str):
     ROI:
       - roiByMargin = uPnL / isolatedWallet
       - roiByNotional = uPnL / (abs(positionAmt)*entryPrice)
+    로컬 상태(status.state)가 최신이면 REST 없이 메모리에서 답함
     """
-    data = um.get_position_risk(symbol=symbol)
+    rows = account_state.position_rows(symbol)
+    if rows is None:
+        rows = um.get_position_risk(symbol=symbol)
+        account_state.sync_position(symbol, rows)
+    return parse_position(symbol, rows)
+
+async def get_position_async(symbol: str):
+    """get_position의 async 버전"""
+    from infra.aio_client import aum
+
+    rows = account_state.position_rows(symbol)
+    if rows is None:
+        rows = await aum().get_position_risk(symbol=symbol)
+        account_state.sync_position(symbol, rows)
+    return parse_position(symbol, rows)
+
+def parse_position(symbol: str, data):
+    """positionRisk 응답 → get_position 반환 형식 (열린 포지션 없으면 None)"""
     rows = data if isinstance(data, list) else [data]
     opened = [r for r in rows if abs(float(r.get("positionAmt", "0"))) > 0]
     if not opened:
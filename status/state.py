@@ -0,0 +1,207 @@
+# status/state.py
+"""
+로컬 포지션/미체결 주문 상태.
+주문 응답(new/batch/cancel/get_order)과 user-data stream 이벤트(ORDER_TRADE_UPDATE, ACCOUNT_UPDATE)로
+심볼별 포지션 행과 미체결 주문 집합을 메모리에 유지하고, 아래 경우에만 REST로 다시 맞춘다.
+- 아직 REST로 받은 적 없음
+- 체결이 일어났는데 아직 포지션 변화(ACCOUNT_UPDATE)를 못 받음 / 모르는 주문 이벤트 (불일치)
+- 스트림 없음: 마지막 동기화가 ttl_sec보다 오래됨 (거래소 쪽 체결을 알 수 없으므로 짧게)
+- 스트림 연결: 마지막 동기화가 reconcile_sec보다 오래됨 (주기적 대조), 끊겼다 붙으면 다시 동기화
+
+status.positions.get_position / status.open_orders.get_open_orders가 먼저 여기서 답을 찾는다.
+"""
+import threading
+from infra.client import um, clock
+from infra.user_stream import STREAM_CLOSED, order_from_event
+
+TERMINAL_STATUSES = {"FILLED", "CANCELED", "EXPIRED", "REJECTED", "EXPIRED_IN_MATCH"}
+
+# ACCOUNT_UPDATE "P" 항목 → positionRisk 키
+_POS_EVENT_KEYS = {"pa": "positionAmt", "ep": "entryPrice", "bep": "breakEvenPrice",
+                   "up": "unRealizedProfit", "mt": "marginType", "iw": "isolatedWallet"}
+
+class _SymbolState:
+    __slots__ = ("pos", "pos_at", "pos_tx_time", "fill_pending", "orders", "orders_at")
+
+    def __init__(self):
+        self.pos: dict | None = None      # positionRisk 행 1개 (one-way 모드)
+        self.pos_at: float | None = None  # 마지막 REST 동기화 시각 (None이면 모름)
+        self.pos_tx_time = 0              # 마지막으로 반영한 ACCOUNT_UPDATE 거래 시각(ms)
+        self.fill_pending = 0             # 반영 안 된 체결의 거래 시각(ms), 0이면 없음
+        self.orders: dict[int, dict] = {}  # 미체결 주문 (orderId → 주문 응답 형태)
+        self.orders_at: float | None = None
+
+class AccountState:
+    def __init__(self, ttl_sec: float = 1.0, reconcile_sec: float = 60.0):
+        self.ttl_sec = ttl_sec
+        self.reconcile_sec = reconcile_sec
+        self.stream = None
+        self._stream_since: float | None = None  # 이 시각 이후의 동기화만 스트림으로 이어서 신뢰
+        self._sym: dict[str, _SymbolState] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "rest": 0, "mismatches": 0}
+
+    def _get(self, symbol: str) -> _SymbolState:
+        st = self._sym.get(symbol)
+        if st is None:
+            st = self._sym[symbol] = _SymbolState()
+        return st
+
+    # ---------- 스트림 ----------
+    def attach_stream(self, stream):
+        """UserDataStream 이벤트를 받아 상태를 갱신 (연결 이전 상태는 다음 조회 때 REST로 다시 맞춤)"""
+        self.stream = stream
+        self._stream_since = None
+        stream.add_listener(self.on_event)
+
+    def _streaming(self, now: float) -> bool:
+        s = self.stream
+        if s is None or not s.connected:
+            return False
+        if self._stream_since is None:
+            self._stream_since = now  # (재)연결 직후 → 이전 동기화분은 신뢰하지 않음
+        return True
+
+    def _fresh(self, at: float | None, now: float) -> bool:
+        if at is None:
+            return False
+        if self._streaming(now):
+            return at >= self._stream_since and now - at < self.reconcile_sec
+        return now - at < self.ttl_sec
+
+    def _tracked(self, at: float | None, now: float) -> bool:
+        """스트림으로 계속 따라온 값인지 (아니면 REST와 달라도 불일치가 아님)"""
+        return at is not None and self._streaming(now) and at >= self._stream_since
+
+    def on_event(self, evt: dict):
+        etype = evt.get("e")
+        with self._lock:
+            if etype == "ORDER_TRADE_UPDATE":
+                self._apply_order_event(evt.get("o", {}))
+            elif etype == "ACCOUNT_UPDATE":
+                self._apply_account_event(evt)
+            elif etype == STREAM_CLOSED:
+                self._stream_since = None
+
+    def _apply_order_event(self, o: dict):
+        symbol = o.get("s")
+        st = self._get(symbol)
+        od = order_from_event(o)
+        if float(o.get("l", 0) or 0) > 0 and int(o.get("T", 0) or 0) > st.pos_tx_time:
+            # 체결 → 포지션 변화는 ACCOUNT_UPDATE로 올 때까지 REST로 답함
+            st.fill_pending = max(st.fill_pending, int(o.get("T", 0) or 0))
+        self._apply_order(st, od)
+
+    def _apply_account_event(self, evt: dict):
+        tx_time = int(evt.get("T", 0) or 0)
+        for p in (evt.get("a") or {}).get("P", []):
+            st = self._get(p.get("s"))
+            st.pos_tx_time = max(st.pos_tx_time, tx_time)
+            if st.fill_pending and tx_time >= st.fill_pending:
+                st.fill_pending = 0
+            if st.pos is None:
+                st.pos_at = None  # 레버리지/청산가 등을 모르므로 REST로 다시 받음
+                continue
+            for k, key in _POS_EVENT_KEYS.items():
+                if k in p:
+                    st.pos[key] = p[k]
+
+    # ---------- 주문 응답 ----------
+    def on_order(self, resp):
+        """new_order/batch/cancel/get_order 응답(dict) 반영. ClientError 등은 무시"""
+        if not isinstance(resp, dict) or resp.get("orderId") is None or not resp.get("symbol"):
+            return
+        with self._lock:
+            st = self._get(resp["symbol"])
+            prev = st.orders.get(int(resp["orderId"]))
+            filled = float(resp.get("executedQty", 0) or 0) > 0 and \
+                (prev is None or prev.get("executedQty") != resp.get("executedQty"))
+            # 새 진입 주문은 바로 체결될 수 있음 (보호주문은 포지션을 늘리지 않으므로 제외)
+            entry = prev is None and resp.get("status") == "NEW" and \
+                not resp.get("reduceOnly") and not resp.get("closePosition")
+            if filled or entry:
+                st.pos_at = None
+            self._apply_order(st, resp)
+
+    def on_cancel_all(self, symbol: str):
+        """cancel_open_orders(심볼 전체 취소) 성공"""
+        with self._lock:
+            self._get(symbol).orders.clear()
+
+    def _apply_order(self, st: _SymbolState, od: dict):
+        oid = int(od["orderId"])
+        if od.get("status") in TERMINAL_STATUSES:
+            st.orders.pop(oid, None)
+        elif st.orders_at is not None:
+            st.orders[oid] = {**st.orders.get(oid, {}), **{k: v for k, v in od.items() if v is not None}}
+
+    # ---------- 조회 ----------
+    def position_rows(self, symbol: str) -> list | None:
+        """메모리로 답할 수 있으면 positionRisk 형태 행 리스트, 아니면 None(REST 필요)"""
+        now = clock.time()
+        with self._lock:
+            st = self._sym.get(symbol)
+            if st is None or st.fill_pending or not self._fresh(st.pos_at, now):
+                return None
+            self.stats["hits"] += 1
+            return [dict(st.pos)] if st.pos else []
+
+    def open_order_rows(self, symbol: str) -> list | None:
+        now = clock.time()
+        with self._lock:
+            st = self._sym.get(symbol)
+            if st is None or not self._fresh(st.orders_at, now):
+                return None
+            self.stats["hits"] += 1
+            return [dict(o) for o in st.orders.values()]
+
+    # ---------- REST 동기화 ----------
+    def sync_position(self, symbol: str, data):
+        """get_position_risk 응답으로 포지션 교체 (스트림으로 유지하던 값과 다르면 불일치로 기록)"""
+        rows = data if isinstance(data, list) else [data]
+        rows = [r for r in rows if r.get("symbol", symbol) == symbol]
+        row = max(rows, key=lambda r: abs(float(r.get("positionAmt", "0") or 0)), default=None)
+        now = clock.time()
+        with self._lock:
+            st = self._get(symbol)
+            self.stats["rest"] += 1
+            self._streaming(now)
+            if self._tracked(st.pos_at, now) and st.pos is not None and row is not None and \
+                    float(st.pos.get("positionAmt", 0) or 0) != float(row.get("positionAmt", 0) or 0):
+                self.stats["mismatches"] += 1
+                print(f"[STATE] {symbol} 포지션 불일치 memory={st.pos.get('positionAmt')} "
+                      f"rest={row.get('positionAmt')} → REST 값으로 교체")
+            st.pos = dict(row) if row is not None else None
+            st.pos_at = now
+            st.fill_pending = 0
+
+    def sync_open_orders(self, symbol: str, rows: list):
+        now = clock.time()
+        with self._lock:
+            st = self._get(symbol)
+            self.stats["rest"] += 1
+            self._streaming(now)
+            fresh = {int(o["orderId"]): dict(o) for o in rows or []}
+            if self._tracked(st.orders_at, now) and set(fresh) != set(st.orders):
+                self.stats["mismatches"] += 1
+                print(f"[STATE] {symbol} 미체결 불일치 memory={sorted(st.orders)} rest={sorted(fresh)}")
+            st.orders = fresh
+            st.orders_at = now
+
+    def invalidate(self, symbol: str | None = None):
+        """다음 조회는 REST로 (symbol=None이면 전체)"""
+        with self._lock:
+            for sym, st in self._sym.items():
+                if symbol is None or sym == symbol:
+                    st.pos_at = None
+                    st.orders_at = None
+
+    def reconcile(self, symbol: str):
+        """포지션/미체결을 즉시 REST로 다시 맞춤"""
+        from status.open_orders import get_open_orders_safe
+
+        self.sync_position(symbol, um.get_position_risk(symbol=symbol))
+        self.sync_open_orders(symbol, get_open_orders_safe(symbol))
+
+# 프로세스 공용 상태
+account_state = AccountState()
@@ -0,0 +1,190 @@
+# status/trade_store.py
+"""
+계정 체결(userTrades) 로컬 저장소 (SQLite).
+- sync(symbol): 마지막으로 받은 trade id 다음부터(fromId) 1000건 단위 페이지로 증분 동기화
+- attach_stream(stream): ORDER_TRADE_UPDATE(x=TRADE) 체결도 바로 저장 → 청산 직후 REST 조회 불필요
+  (스트림 체결은 last_id를 옮기지 않으므로 다음 sync가 빠진 체결을 채움, 중복은 기본키로 무시)
+- order_trades(symbol, order_id): 주문별 체결을 저장소에서 조회 (userTrades 응답과 같은 키)
+- pnl(symbol, start, end) / daily_pnl(...): 기간 실현손익·수수료 합계 (SQL 집계)
+status.history의 get_order_trades_summary / calc_pnl_roi_from_order가 이 저장소를 읽는다.
+sim 모드는 실행마다 trade id가 1부터 다시 시작하므로 기본값이 메모리 DB.
+
+  ACCOUNT_TRADES=data/account_trades.sqlite3   (실거래 기본값, data/는 .gitignore)
+  python -m status.trade_store --symbol BTCUSDT --days 7
+"""
+import argparse
+import os
+import sqlite3
+import threading
+from infra.client import um, clock, EXCHANGE
+
+STORE_PATH = os.getenv("ACCOUNT_TRADES",
+                       ":memory:" if EXCHANGE == "sim" else os.path.join("data", "account_trades.sqlite3"))
+PAGE_LIMIT = 1000  # GET /fapi/v1/userTrades 최대 limit
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    symbol TEXT NOT NULL, id INTEGER NOT NULL, order_id INTEGER NOT NULL,
+    side TEXT, price REAL, qty REAL, quote_qty REAL,
+    commission REAL, commission_asset TEXT, realized_pnl REAL,
+    maker INTEGER, position_side TEXT, time INTEGER,
+    PRIMARY KEY (symbol, id)
+);
+CREATE INDEX IF NOT EXISTS trades_order ON trades(symbol, order_id);
+CREATE INDEX IF NOT EXISTS trades_time ON trades(symbol, time);
+CREATE TABLE IF NOT EXISTS sync_state (symbol TEXT PRIMARY KEY, last_id INTEGER, synced_at REAL);
+"""
+
+def _row(symbol: str, t: dict) -> tuple:
+    return (symbol, int(t["id"]), int(t["orderId"]), t.get("side"),
+            float(t.get("price", 0) or 0), float(t.get("qty", 0) or 0), float(t.get("quoteQty", 0) or 0),
+            float(t.get("commission", 0) or 0), t.get("commissionAsset"),
+            float(t.get("realizedPnl", 0) or 0), int(bool(t.get("maker"))),
+            t.get("positionSide"), int(t.get("time", 0) or 0))
+
+class AccountTradeStore:
+    def __init__(self, path: str = STORE_PATH, client=None):
+        self.path = path
+        self.client = client or um
+        d = os.path.dirname(path) if path != ":memory:" else ""
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self._con = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._con.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._con:
+            if path != ":memory:":
+                self._con.execute("PRAGMA journal_mode=WAL")
+            self._con.executescript(_SCHEMA)
+
+    def last_id(self, symbol: str) -> int | None:
+        with self._lock:
+            r = self._con.execute("SELECT last_id FROM sync_state WHERE symbol = ?", (symbol,)).fetchone()
+        return r["last_id"] if r else None
+
+    # ---------- 동기화 ----------
+    def sync(self, symbol: str, start_ms: int | None = None) -> int:
+        """
+        새 체결을 받아 저장하고 추가된 건수를 반환.
+        처음이면 start_ms(없으면 거래소 기본 범위)부터, 이후에는 fromId=last_id+1부터 페이지 단위로.
+        """
+        last = self.last_id(symbol)
+        added = 0
+        while True:
+            if last is None:
+                page = self.client.get_account_trades(symbol=symbol, startTime=start_ms, limit=PAGE_LIMIT) or []
+            else:
+                page = self.client.get_account_trades(symbol=symbol, fromId=last + 1, limit=PAGE_LIMIT) or []
+            page = [t for t in page if last is None or int(t["id"]) > last]
+            if page:
+                last = max(int(t["id"]) for t in page)
+                with self._lock, self._con:
+                    cur = self._con.executemany(
+                        "INSERT OR IGNORE INTO trades VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                        [_row(symbol, t) for t in page])
+                    added += cur.rowcount
+                    self._con.execute(
+                        "INSERT INTO sync_state VALUES (?,?,?) ON CONFLICT(symbol) "
+                        "DO UPDATE SET last_id = excluded.last_id, synced_at = excluded.synced_at",
+                        (symbol, last, clock.time()))
+            if len(page) < PAGE_LIMIT:
+                return added
+
+    def attach_stream(self, stream):
+        stream.add_listener(self.on_event)
+
+    def on_event(self, evt: dict):
+        if evt.get("e") != "ORDER_TRADE_UPDATE":
+            return
+        o = evt.get("o", {})
+        if o.get("x") != "TRADE":
+            return
+        price, qty = float(o.get("L", 0) or 0), float(o.get("l", 0) or 0)
+        t = {"id": o["t"], "orderId": o["i"], "side": o.get("S"), "price": price, "qty": qty,
+             "quoteQty": price * qty, "commission": o.get("n"), "commissionAsset": o.get("N"),
+             "realizedPnl": o.get("rp"), "maker": o.get("m"), "positionSide": o.get("ps"), "time": o.get("T")}
+        with self._lock, self._con:
+            self._con.execute("INSERT OR IGNORE INTO trades VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                              _row(o.get("s"), t))
+
+    # ---------- 조회 ----------
+    def order_trades(self, symbol: str, order_id: int) -> list[dict]:
+        """주문의 체결들 (userTrades 응답과 같은 키: price/qty/commission/commissionAsset/realizedPnl)"""
+        with self._lock:
+            rows = self._con.execute(
+                "SELECT id, order_id, side, price, qty, quote_qty, commission, commission_asset, "
+                "realized_pnl, time FROM trades WHERE symbol = ? AND order_id = ? ORDER BY id",
+                (symbol, int(order_id))).fetchall()
+        return [{"id": r["id"], "orderId": r["order_id"], "side": r["side"], "price": r["price"],
+                 "qty": r["qty"], "quoteQty": r["quote_qty"], "commission": r["commission"],
+                 "commissionAsset": r["commission_asset"], "realizedPnl": r["realized_pnl"],
+                 "time": r["time"]} for r in rows]
+
+    def pnl(self, symbol: str | None = None, start_ms: int | None = None, end_ms: int | None = None) -> dict:
+        """[start_ms, end_ms) 구간 실현손익/수수료/순손익/체결 수"""
+        where, args = self._where(symbol, start_ms, end_ms)
+        with self._lock:
+            r = self._con.execute(
+                "SELECT COUNT(*) AS fills, COUNT(DISTINCT order_id) AS orders, "
+                "COALESCE(SUM(realized_pnl), 0) AS realized, COALESCE(SUM(commission), 0) AS fee "
+                f"FROM trades{where}", args).fetchone()
+        out = dict(r)
+        out["net"] = out["realized"] - out["fee"]
+        return out
+
+    def daily_pnl(self, symbol: str | None = None, start_ms: int | None = None,
+                  end_ms: int | None = None) -> list[dict]:
+        """UTC 일자별 실현손익/수수료/순손익"""
+        where, args = self._where(symbol, start_ms, end_ms)
+        with self._lock:
+            rows = self._con.execute(
+                "SELECT date(time / 1000, 'unixepoch') AS day, COUNT(*) AS fills, "
+                "SUM(realized_pnl) AS realized, SUM(commission) AS fee, "
+                "SUM(realized_pnl) - SUM(commission) AS net "
+                f"FROM trades{where} GROUP BY day ORDER BY day", args).fetchall()
+        return [dict(r) for r in rows]
+
+    @staticmethod
+    def _where(symbol, start_ms, end_ms) -> tuple[str, list]:
+        cond, args = [], []
+        if symbol:
+            cond.append("symbol = ?")
+            args.append(symbol)
+        if start_ms is not None:
+            cond.append("time >= ?")
+            args.append(int(start_ms))
+        if end_ms is not None:
+            cond.append("time < ?")
+            args.append(int(end_ms))
+        return (" WHERE " + " AND ".join(cond)) if cond else "", args
+
+    def close(self):
+        with self._lock:
+            self._con.close()
+
+_store: AccountTradeStore | None = None
+_store_lock = threading.Lock()
+
+def get_trade_store() -> AccountTradeStore:
+    """프로세스 공용 저장소 (최초 호출 시 생성, 경로는 ACCOUNT_TRADES)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = AccountTradeStore()
+    return _store
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--symbol", required=True)
+    ap.add_argument("--path", default=STORE_PATH)
+    ap.add_argument("--days", type=int, default=7, help="최근 N일 집계 (처음 동기화 시작점도 동일)")
+    args = ap.parse_args()
+
+    store = AccountTradeStore(args.path)
+    start_ms = int((clock.time() - args.days * 86400) * 1000)
+    print(f"[SYNC] {args.symbol} +{store.sync(args.symbol, start_ms=start_ms)} trades (last_id={store.last_id(args.symbol)})")
+    for r in store.daily_pnl(args.symbol, start_ms):
+        print(f"{r['day']}  fills={r['fills']:4d}  realized={r['realized']:+.4f}  fee={r['fee']:.4f}  net={r['net']:+.4f}")
+    print(store.pnl(args.symbol, start_ms))
+    store.close()
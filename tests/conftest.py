@@ -0,0 +1,6 @@
+# tests/conftest.py
+import os
+import sys
+
+# 저장소 루트를 import 경로에 (python -m pytest / pytest 어디서 실행해도 AI.*, infra.* import)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
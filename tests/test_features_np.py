@@ -0,0 +1,45 @@
+# tests/test_features_np.py
+"""
+compute_features_np(NumPy 커널) vs compute_features(pandas/ta) — 경계 입력 포함.
+픽스처 klines_synthetic_1m.csv는 합성 분봉 600개(로컬에서 생성한 분봉 저장소에서 추출, 실거래 녹화 아님)
+"""
+import os
+import pandas as pd
+import pytest
+from AI.features_np import check_parity, random_bars
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "klines_synthetic_1m.csv")
+
+def _fixture() -> pd.DataFrame:
+    df = pd.read_csv(FIXTURE)
+    df["time"] = pd.to_datetime(df["time"], utc=True)
+    return df
+
+def _flat(n: int) -> pd.DataFrame:
+    df = random_bars(n)
+    df[["open", "high", "low", "close"]] = 30000.0
+    return df
+
+def _mixed() -> pd.DataFrame:
+    """중간에 가격이 멈춘 구간과 거래량 0 구간이 낀 분봉"""
+    df = random_bars(300, seed=3)
+    df.loc[50:120, ["open", "high", "low", "close"]] = 30000.0
+    df.loc[150:200, ["volume", "taker_buy_base"]] = 0.0
+    return df
+
+CASES = {
+    "fixture": _fixture,
+    "flat_prices": lambda: _flat(200),
+    "zero_volume": lambda: random_bars(200).assign(volume=0.0, taker_buy_base=0.0),
+    "shorter_than_window": lambda: random_bars(8),
+    "single_bar": lambda: random_bars(1),
+    "no_taker_buy_base": lambda: random_bars(200).drop(columns="taker_buy_base"),
+    "flat_and_zero_volume_runs": _mixed,
+}
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+@pytest.mark.parametrize("name", list(CASES))
+def test_parity(name):
+    res = check_parity(CASES[name]())
+    bad = {k: v for k, v in res.items() if not v["ok"]}
+    assert not bad, bad
@@ -0,0 +1,36 @@
+# tests/test_history.py
+"""청산 체결 합산: 저장소에 부분 체결만 있으면 다시 동기화"""
+import status.history as history
+
+class FakeStore:
+    """order_trades는 sync 이후에만 나머지 체결을 돌려준다"""
+    def __init__(self, before: list, after: list):
+        self.rows, self.after, self.syncs = before, after, 0
+
+    def order_trades(self, symbol, order_id):
+        return list(self.rows)
+
+    def sync(self, symbol):
+        self.syncs += 1
+        self.rows = self.after
+
+def _trade(qty: float, price: float) -> dict:
+    return {"qty": str(qty), "price": str(price), "commission": "0.01",
+            "commissionAsset": "USDT", "realizedPnl": "1.0"}
+
+def test_partial_rows_trigger_sync(monkeypatch):
+    first = _trade(0.002, 100.0)
+    store = FakeStore([first], [first, _trade(0.001, 103.0)])
+    monkeypatch.setattr(history, "get_trade_store", lambda: store)
+    s = history.get_order_trades_summary("BTCUSDT", 1, executed_qty=0.003)
+    assert store.syncs == 1
+    assert abs(s["filled_qty"] - 0.003) < 1e-12
+    assert abs(s["avg_price"] - 101.0) < 1e-9
+
+def test_complete_rows_skip_sync(monkeypatch):
+    rows = [_trade(0.003, 100.0)]
+    store = FakeStore(rows, [])
+    monkeypatch.setattr(history, "get_trade_store", lambda: store)
+    assert history.get_order_trades_summary("BTCUSDT", 1, executed_qty=0.003)["filled_qty"] == 0.003
+    assert history.get_order_trades_summary("BTCUSDT", 1)["filled_qty"] == 0.003
+    assert store.syncs == 0
@@ -0,0 +1,94 @@
+# tests/test_market_feed.py
+"""MarketFeed를 로컬 대역 스트림(녹화 형식 kline 이벤트를 스레드에서 재생)과 가짜 REST로 검사"""
+import threading
+import time
+import pandas as pd
+from infra.market_feed import MarketFeed
+
+STEP = 60_000
+
+def _row(t: int, px: float) -> list:
+    """REST klines 응답 한 행"""
+    return [t, str(px), str(px + 5), str(px - 5), str(px), "10", t + STEP - 1, "0", 0, "4", "0", "0"]
+
+def _kline_evt(t: int, px: float, closed: bool = True) -> dict:
+    return {"e": "kline", "E": t + STEP, "s": "BTCUSDT",
+            "k": {"t": t, "T": t + STEP - 1, "o": str(px), "h": str(px + 5), "l": str(px - 5),
+                  "c": str(px), "v": "10", "V": "4", "x": closed}}
+
+class _FakeRest:
+    """klines만 흉내내는 REST 대역. 호출 시 피드 락을 잡고 있었는지 기록"""
+    def __init__(self, t0: int, n: int):
+        self.rows = [_row(t0 + i * STEP, 30000.0 + i) for i in range(n)]
+        self.feed = None
+        self.called_under_lock = False
+
+    def klines(self, symbol, interval, startTime=None, endTime=None, limit=500):
+        if self.feed is not None and self.feed._lock._is_owned():
+            self.called_under_lock = True
+        return [r for r in self.rows if startTime <= r[0] <= endTime][:limit]
+
+class _StandInStream:
+    """WebSocket 대신 이벤트 목록을 별도 스레드에서 feed.handle로 흘려보냄"""
+    def __init__(self, feed: MarketFeed, events: list):
+        self.thread = threading.Thread(target=lambda: [feed.handle(e) for e in events], daemon=True)
+
+    def run(self, timeout: float = 10.0) -> bool:
+        self.thread.start()
+        self.thread.join(timeout)
+        return not self.thread.is_alive()
+
+def _now_minute_ms() -> int:
+    return int(time.time() * 1000) // STEP * STEP
+
+def test_gap_is_backfilled_outside_lock_and_callbacks_see_no_lock():
+    t_last = _now_minute_ms() - STEP          # 마지막 마감 봉
+    t0 = t_last - 99 * STEP
+    rest = _FakeRest(t0, 100)
+    feed = MarketFeed(window=50, client=rest)
+    rest.feed = feed
+    feed.backfill(end_ms=t0 + 20 * STEP - 1)  # 처음 20개만
+    assert feed.last_open_ms == t0 + 19 * STEP
+
+    seen, locked = [], []
+    feed.on_bar(lambda b: (seen.append(b["time"]), locked.append(feed._lock._is_owned())))
+    # 스트림은 중간을 건너뛰고 마지막 봉을 보냄 → gap 보충 후 이어붙임, 중복/진행 중 봉은 무시
+    events = [_kline_evt(t_last, 30099.0, closed=False), _kline_evt(t_last, 30099.0),
+              _kline_evt(t0, 1.0), _kline_evt(t_last, 30099.0)]
+    assert _StandInStream(feed, events).run()
+
+    assert not rest.called_under_lock
+    assert not any(locked)
+    assert len(seen) == 80 and seen == sorted(seen)
+    df = feed.window_df()
+    assert len(df) == 50 and (df["time"].diff().iloc[1:] == pd.Timedelta(minutes=1)).all()
+    assert feed.last_open_ms == t_last and feed.price == 30099.0
+
+def test_listener_taking_its_own_lock_does_not_deadlock():
+    """콜백이 자기 락을 잡고, 다른 스레드는 그 락을 쥔 채 피드를 조회해도 교착이 없어야 함 (Decider 패턴)"""
+    t_last = _now_minute_ms() - STEP
+    t0 = t_last - 400 * STEP
+    rest = _FakeRest(t0, 1)
+    feed = MarketFeed(window=500, client=rest)
+    feed.backfill(end_ms=t0 + STEP - 1)
+
+    own = threading.Lock()
+    def on_bar(bar):
+        with own:
+            feed.window_df(10)
+    feed.on_bar(on_bar)
+
+    stop = threading.Event()
+    def reader():
+        while not stop.is_set():
+            with own:
+                feed.last_open_ms
+                feed.window_df(10)
+    r = threading.Thread(target=reader, daemon=True)
+    r.start()
+    events = [_kline_evt(t0 + i * STEP, 30000.0 + i) for i in range(1, 401)]
+    ok = _StandInStream(feed, events).run(timeout=20.0)
+    stop.set()
+    r.join(5.0)
+    assert ok and not r.is_alive()
+    assert feed.last_open_ms == t_last
@@ -0,0 +1,69 @@
+# tests/test_model_versions.py
+"""재학습 모델 버전/포인터 교체와 sim 학습 창 자르기"""
+import os
+import shutil
+from dataclasses import replace
+import numpy as np
+import pandas as pd
+import pytest
+from joblib import dump
+from xgboost import XGBClassifier
+from AI.utils import load_config, FEATURES, active_model_path, set_active_model, model_versions_dir
+from AI.retrainer import versioned_model_path
+from AI.pipeline import Pipeline
+from AI.kline_store import PartitionedStore
+
+def _tiny_model(seed: int) -> XGBClassifier:
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(90, len(FEATURES))).astype(np.float32)
+    return XGBClassifier(n_estimators=3, max_depth=2, objective="multi:softprob",
+                         num_class=3).fit(X, np.arange(90) % 3)
+
+@pytest.fixture
+def cfg(tmp_path):
+    base = tmp_path / "models" / "signal_1m_xgb.joblib"
+    base.parent.mkdir()
+    dump(_tiny_model(0), base)
+    return replace(load_config(), model_path=str(base))
+
+def test_pointer_falls_back_to_tracked_model(cfg):
+    assert active_model_path(cfg.model_path) == cfg.model_path
+    v = versioned_model_path(cfg.model_path)
+    assert os.path.dirname(v) == model_versions_dir(cfg.model_path)
+    shutil.copy(cfg.model_path, v)
+    set_active_model(cfg.model_path, v)
+    assert active_model_path(cfg.model_path) == v
+    os.remove(v)  # 가리키던 버전이 지워지면 원래 모델
+    assert active_model_path(cfg.model_path) == cfg.model_path
+    with pytest.raises(ValueError):
+        set_active_model(cfg.model_path, cfg.model_path)
+
+def test_install_switches_pointer_without_touching_tracked_file(cfg):
+    from AI.decide import Decider
+
+    with open(cfg.model_path, "rb") as f:
+        tracked = f.read()
+    d = Decider(cfg=cfg, client=object())
+    v = versioned_model_path(cfg.model_path)
+    dump(_tiny_model(1), v)
+    assert d.install(v)
+    assert active_model_path(cfg.model_path) == v
+    assert not d.maybe_reload()  # 방금 교체한 파일 그대로
+    with open(cfg.model_path, "rb") as f:
+        assert f.read() == tracked
+
+    # 다른 프로세스/새 Decider도 포인터를 따라감
+    d2 = Decider(cfg=cfg, client=object())
+    x = np.zeros(len(FEATURES), dtype=np.float32)
+    assert np.allclose(d2._model[3].predict_one(x), d._model[3].predict_one(x))
+
+def test_sim_training_window_stops_before_clock(tmp_path):
+    cfg = replace(load_config(), train_path=str(tmp_path / "train"), horizon=15, train_window_bars=50)
+    t = pd.date_range("2024-01-31 20:00", periods=600, freq="1min", tz="UTC")
+    PartitionedStore(cfg.train_path).append(
+        pd.DataFrame({"time": t, **{k: 0.0 for k in FEATURES}, "label": 0}))
+    until = pd.Timestamp("2024-02-01 01:30:30", tz="UTC")  # 월 경계를 넘는 창
+    frame = Pipeline(cfg)._frame_until(until)
+    assert len(frame) == 50
+    assert frame["time"].max() == pd.Timestamp("2024-02-01 01:14", tz="UTC")
+    assert frame["time"].is_monotonic_increasing
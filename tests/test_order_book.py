@@ -0,0 +1,65 @@
+# tests/test_order_book.py
+"""
+diff depth 픽스처 재생 + gap/스냅샷 실패 처리.
+픽스처 depth_diffs_synthetic.jsonl은 실거래 녹화가 아니라 합성 데이터(형식만 record() 출력과 같음):
+  infra.order_book.synth_recording(n_events=200, seed=11, gap_at=(100,), levels=20, check_every=10)
+"""
+import json
+import os
+from infra.order_book import LocalOrderBook, replay
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "depth_diffs_synthetic.jsonl")
+
+def _lines() -> list[dict]:
+    with open(FIXTURE) as f:
+        return [json.loads(l) for l in f if l.strip()]
+
+class _Depth:
+    """depth() 대역: snaps를 순서대로, 떨어지면 예외. 호출 수 기록"""
+    def __init__(self, snaps: list[dict]):
+        self.snaps = list(snaps)
+        self.calls = 0
+
+    def depth(self, symbol, limit=1000, **kwargs):
+        self.calls += 1
+        if not self.snaps:
+            raise RuntimeError("depth unavailable")
+        return self.snaps.pop(0)
+
+def test_replay_fixture_matches_checkpoints():
+    # 픽스처에는 합성 시 빠뜨린 이벤트(gap)가 1건 있음 → 초기 동기화 + gap resync
+    res = replay(_lines())
+    assert res["synced"] and res["checks"] > 0
+    assert res["mismatches"] == 0 and res["crossed"] == 0
+    assert res["gaps"] == 1 and res["resyncs"] == 2
+
+def test_injected_gap_triggers_resync():
+    lines = _lines()
+    snaps = [l["data"] for l in lines if l["kind"] == "snapshot"]
+    events = [l["data"] for l in lines if l["kind"] == "event"]
+    client = _Depth(snaps[:1])
+    book = LocalOrderBook(client=client, tick_size=0.1, resync_in_thread=False)
+    book.resync()
+    for evt in events[:30]:
+        book.handle(evt)
+    assert book.synced and book.gaps == 0 and client.calls == 1
+
+    book.handle(events[31])  # events[30] 누락 → pu 불일치
+    assert not book.synced and book.gaps == 1 and book.resyncs == 2 and client.calls == 2
+
+def test_failed_snapshot_backs_off_and_buffer_is_capped():
+    events = [l["data"] for l in _lines() if l["kind"] == "event"]
+    client = _Depth([])
+    book = LocalOrderBook(client=client, tick_size=0.1, resync_in_thread=False,
+                          backoff_sec=60.0, backoff_max_sec=600.0, buffer_max=50)
+    book.resync()
+    for evt in events:
+        book.handle(evt)
+    # 실패 후 backoff 동안은 이벤트마다 스냅샷을 다시 요청하지 않음
+    assert client.calls == 1 and not book.synced
+    assert len(book._buffer) == 50 and book._buffer[-1] is events[-1]
+
+    # backoff가 끝나면 다음 이벤트에서 재시도, 연속 실패면 대기가 두 배
+    book._retry_at = 0.0
+    book.handle(events[-1])
+    assert client.calls == 2 and book._backoff == 120.0
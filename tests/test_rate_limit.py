@@ -0,0 +1,24 @@
+# tests/test_rate_limit.py
+"""async 호출자도 RateGovernor 대기자로 잡혀 하위 우선순위가 양보하는지"""
+import asyncio
+from infra.rate_limit import RateGovernor, ORDER, POLL
+from infra.aio_client import AsyncUMFutures
+
+def test_async_waiter_blocks_lower_priority():
+    gov = RateGovernor(limit=10)
+    assert gov.try_acquire(10, ORDER) == 0.0
+    aum = AsyncUMFutures(key="k", secret="s", budget=gov)
+
+    async def scenario():
+        task = asyncio.create_task(aum._acquire(1, ORDER, 0))
+        await asyncio.sleep(0.05)  # 한도가 차 있으므로 재시도 대기 중
+        assert gov._waiting[ORDER] == 1
+        assert gov.try_acquire(0, POLL, 1) > 0  # 주문 대기자가 있으면 폴링은 양보
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(scenario())
+    assert gov._waiting == [0, 0, 0, 0]
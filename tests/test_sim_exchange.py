@@ -0,0 +1,41 @@
+# tests/test_sim_exchange.py
+import numpy as np
+import pytest
+from binance.error import ClientError
+from infra.sim_exchange import SimExchange, SimClock
+
+def _bars(n: int = 10, px: float = 30000.0) -> dict:
+    ot = np.arange(n, dtype=np.int64) * 60_000 + 1_700_000_000_000
+    close = np.full(n, px)
+    return {"open_time": ot, "open": close, "high": close + 5, "low": close - 5, "close": close,
+            "volume": np.ones(n), "taker_buy_base": np.full(n, 0.5)}
+
+def _ex() -> SimExchange:
+    bars = _bars()
+    return SimExchange(bars, clock=SimClock(bars["open_time"][0] / 1000 + 60))
+
+@pytest.mark.parametrize("pos_side", [None, "BUY"])
+def test_reduce_only_market_rejected_without_opposite_position(pos_side):
+    ex = _ex()
+    if pos_side:
+        ex.new_order(symbol="BTCUSDT", side=pos_side, type="MARKET", quantity=0.01)
+    with pytest.raises(ClientError) as e:
+        ex.new_order(symbol="BTCUSDT", side="BUY", type="MARKET", quantity=0.01, reduceOnly="true")
+    assert e.value.error_code == -2022
+
+def test_reduce_only_market_caps_to_position():
+    ex = _ex()
+    ex.new_order(symbol="BTCUSDT", side="BUY", type="MARKET", quantity=0.01)
+    od = ex.new_order(symbol="BTCUSDT", side="SELL", type="MARKET", quantity=0.05, reduceOnly="true")
+    assert od["status"] == "FILLED" and float(od["executedQty"]) == pytest.approx(0.01)
+    assert ex.pos_amt == 0.0
+
+def test_resting_reduce_only_limit_expires_when_position_gone():
+    ex = _ex()
+    ex.new_order(symbol="BTCUSDT", side="BUY", type="MARKET", quantity=0.01)
+    tp = ex.new_order(symbol="BTCUSDT", side="SELL", type="LIMIT", quantity=0.01, price=30004.0,
+                      timeInForce="GTC", reduceOnly="true")
+    ex.new_order(symbol="BTCUSDT", side="SELL", type="MARKET", quantity=0.01, reduceOnly="true")
+    ex.clock.sleep(60)
+    assert ex.get_order(symbol="BTCUSDT", orderId=tp["orderId"])["status"] == "EXPIRED"
+    assert ex.pos_amt == 0.0
@@ -0,0 +1,65 @@
+# tests/test_stream_features.py
+"""
+StreamingFeatures(봉 단위 갱신) vs compute_features(pandas/ta) 수치 일치.
+픽스처 klines_synthetic_1m.csv는 합성 분봉 600개(로컬에서 생성한 분봉 저장소에서 추출, 실거래 녹화 아님)
+"""
+import os
+import numpy as np
+import pandas as pd
+from AI.utils import compute_features, FEATURES
+from AI.stream_features import StreamingFeatures
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "klines_synthetic_1m.csv")
+RTOL, ATOL = 1e-6, 1e-8
+
+def _bars() -> pd.DataFrame:
+    df = pd.read_csv(FIXTURE)
+    df["time"] = pd.to_datetime(df["time"], utc=True)
+    return df
+
+def _rows(df: pd.DataFrame) -> list[dict]:
+    return [r._asdict() for r in df.itertuples(index=False)]
+
+def _assert_close(ref: pd.DataFrame, got: np.ndarray):
+    for j, k in enumerate(FEATURES):
+        a, b = ref[k].to_numpy(dtype=float), got[:, j]
+        assert np.array_equal(np.isfinite(a), np.isfinite(b)), f"{k}: NaN 위치 불일치"
+        m = np.isfinite(a)
+        err = np.abs(a[m] - b[m])
+        assert np.all(err <= ATOL + RTOL * np.abs(a[m])), f"{k}: max|Δ|={err.max():.3e}"
+
+def test_bar_by_bar_matches_compute_features():
+    df = _bars()
+    eng = StreamingFeatures()
+    got = np.array([[eng.update(r)[k] for k in FEATURES] for r in _rows(df)])
+    _assert_close(compute_features(df), got)
+    assert eng.ready
+
+def test_warmup_then_stream_matches_last_rows():
+    df = _bars()
+    ref = compute_features(df)
+    split = 100
+    eng = StreamingFeatures().warmup(df.iloc[:split])
+    got = np.array([[eng.update(r)[k] for k in FEATURES] for r in _rows(df.iloc[split:])])
+    _assert_close(ref.iloc[split:].reset_index(drop=True), got)
+
+def test_short_warmup_keeps_nan_until_ready():
+    df = _bars().iloc[:20]
+    eng = StreamingFeatures().warmup(df)
+    ref = compute_features(df).iloc[-1]
+    assert not eng.ready
+    for k in FEATURES:
+        assert np.isfinite(eng.features[k]) == np.isfinite(ref[k]), k
+
+def test_duplicate_and_stale_bars_are_ignored():
+    df = _bars()
+    rows = _rows(df)
+    eng = StreamingFeatures()
+    got = []
+    for i, r in enumerate(rows):
+        eng.update(r)
+        eng.update(dict(r, close=r["close"] * 2))          # 같은 시각 재전송(재접속 등)
+        if i:
+            eng.update(dict(rows[i - 1], close=1.0))       # 이미 지난 봉
+        got.append([eng.features[k] for k in FEATURES])
+    _assert_close(compute_features(df), np.array(got))
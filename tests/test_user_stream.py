@@ -0,0 +1,151 @@
+# tests/test_user_stream.py
+"""UserDataStream을 녹화 이벤트를 재생하는 로컬 WebSocket 대역으로 검사"""
+import json
+import os
+import threading
+import time
+from infra.client import clock
+from infra.user_stream import UserDataStream, STREAM_CLOSED
+from trading.orders import _wait_protective_on_stream
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "user_stream_events.jsonl")
+
+def _recorded() -> list[str]:
+    with open(FIXTURE) as f:
+        return [line.strip() for line in f if line.strip()]
+
+class _FakeRest:
+    def __init__(self):
+        self.issued, self.closed = [], []
+
+    def new_listen_key(self):
+        key = f"lk{len(self.issued) + 1}"
+        self.issued.append(key)
+        return {"listenKey": key}
+
+    def renew_listen_key(self, listenKey):
+        return {}
+
+    def close_listen_key(self, listenKey):
+        self.closed.append(listenKey)
+        return {}
+
+class _StandInWS:
+    """
+    UMFuturesWebsocketClient 대역: user_data() 호출 시 녹화 메시지(raw JSON 문자열)를 스레드에서 재생.
+    drop_after=True면 재생 뒤 연결이 끊긴 것처럼 on_close 호출. stop() 후에도 늦은 on_close를 한 번 보냄
+    """
+    instances = []
+    plans = []  # 연결마다 (messages, drop_after)
+
+    def __init__(self, stream_url, on_message, on_close, on_error):
+        self.on_message, self.on_close = on_message, on_close
+        self.stopped = False
+        self.listen_key = None
+        _StandInWS.instances.append(self)
+
+    def user_data(self, listen_key):
+        self.listen_key = listen_key
+        msgs, drop = _StandInWS.plans.pop(0) if _StandInWS.plans else ([], False)
+        def run():
+            for raw in msgs:
+                self.on_message(self, raw)
+            if drop:
+                self.on_close(self)
+        threading.Thread(target=run, daemon=True).start()
+
+    def push(self, msgs: list, delay: float = 0.1, drop: bool = False):
+        """연결 중에 delay초 뒤 메시지를 보냄 (대기 함수가 구독한 다음에 도착하도록)"""
+        def run():
+            time.sleep(delay)
+            for raw in msgs:
+                self.on_message(self, raw)
+            if drop:
+                self.on_close(self)
+        threading.Thread(target=run, daemon=True).start()
+
+    def stop(self):
+        self.stopped = True
+        self.on_close(self)  # 실제 클라이언트도 stop 중에 on_close를 부름
+
+def _drain(q, until, timeout: float = 5.0) -> list:
+    out, end = [], time.monotonic() + timeout
+    while time.monotonic() < end:
+        try:
+            evt = q.get(timeout=0.05)
+        except Exception:
+            continue
+        out.append(evt)
+        if until(out):
+            break
+    return out
+
+def test_replay_order_and_account_updates_then_reconnect():
+    msgs = _recorded()
+    first, second = msgs[:4], msgs[4:]
+    _StandInWS.instances, _StandInWS.plans = [], [(first, True), (second, False)]
+    rest = _FakeRest()
+    stream = UserDataStream(client=rest, stream_url="ws://stand-in", reconnect_sec=0.05, ws_cls=_StandInWS)
+    q = stream.subscribe()
+    seen = []
+    stream.add_listener(seen.append)
+    stream.start()
+    try:
+        # 1차 연결: 진입 주문 NEW → FILLED, 포지션 ACCOUNT_UPDATE, 그리고 끊김
+        evts = _drain(q, lambda out: out[-1].get("e") == STREAM_CLOSED)
+        assert [e["e"] for e in evts] == ["ORDER_TRADE_UPDATE", "ORDER_TRADE_UPDATE", "ACCOUNT_UPDATE", STREAM_CLOSED]
+        entry = stream.order("BTCUSDT", 4051234101)
+        assert entry["status"] == "FILLED" and entry["executedQty"] == "0.010" and entry["type"] == "LIMIT"
+
+        # 재접속: 이전 소켓은 멈추고 이전 listenKey는 닫고, 새 key로 이어서 수신
+        evts = _drain(q, lambda out: out[-1].get("e") == "ACCOUNT_UPDATE" and len(out) >= 4)
+        assert [e["e"] for e in evts] == ["ORDER_TRADE_UPDATE"] * 3 + ["ACCOUNT_UPDATE"]
+        assert len(_StandInWS.instances) == 2 and _StandInWS.instances[0].stopped
+        assert rest.closed == ["lk1"] and _StandInWS.instances[1].listen_key == "lk2"
+        assert stream.connected and stream.listen_key == "lk2"  # 이전 소켓의 늦은 on_close는 무시
+
+        tp = stream.order("BTCUSDT", 4051234103)
+        assert tp["status"] == "FILLED" and tp["reduceOnly"] and tp["closePosition"]
+        assert stream.order("BTCUSDT", 4051234102)["status"] == "NEW"
+        assert seen[-1]["e"] == "ACCOUNT_UPDATE" and seen[-1]["a"]["P"][0]["pa"] == "0"
+    finally:
+        stream.stop()
+    assert rest.closed == ["lk1", "lk2"] and _StandInWS.instances[1].stopped
+
+def test_recorded_fixture_is_valid_json():
+    for raw in _recorded():
+        json.loads(raw)
+
+def _otu(symbol: str, oid: int, status: str) -> str:
+    return json.dumps({"e": "ORDER_TRADE_UPDATE", "T": 1, "E": 1,
+                       "o": {"s": symbol, "i": oid, "X": status, "S": "SELL", "o": "TAKE_PROFIT_MARKET",
+                             "q": "0.010", "z": "0.010" if status == "FILLED" else "0"}})
+
+def test_wait_protective_on_stream():
+    _StandInWS.instances, _StandInWS.plans = [], []
+    stream = UserDataStream(client=_FakeRest(), stream_url="ws://stand-in", reconnect_sec=60, ws_cls=_StandInWS)
+    stream.start()
+    ws = _StandInWS.instances[0]
+    watch = [("TP", 11), ("SL", 12)]
+    try:
+        # 다른 심볼의 같은 orderId 체결은 무시, BTCUSDT TP 체결에서 반환
+        ws.push([_otu("ETHUSDT", 11, "FILLED"), _otu("BTCUSDT", 12, "NEW"), _otu("BTCUSDT", 11, "FILLED")])
+        hit = _wait_protective_on_stream(stream, "BTCUSDT", watch, clock.time() + 5)
+        assert hit["reason"] == "TP" and hit["filled_order_id"] == 11
+        assert hit["filled_order"]["symbol"] == "BTCUSDT" and hit["filled_order"]["status"] == "FILLED"
+        # 종료 주문은 열린 주문 표에서 빠지고, 최근 종료 목록으로 조회됨
+        assert set(stream._orders) == {("BTCUSDT", 12)}
+        assert stream.order("ETHUSDT", 11)["symbol"] == "ETHUSDT"
+
+        # 이벤트 없이 시간이 지나면 None (호출측이 REST로 마무리)
+        t0 = time.monotonic()
+        assert _wait_protective_on_stream(stream, "BTCUSDT", [("SL", 12)], clock.time() + 0.2) is None
+        assert time.monotonic() - t0 < 2
+
+        # 스트림이 끊기면 타임아웃 전이라도 None
+        ws.push([], drop=True)
+        t0 = time.monotonic()
+        assert _wait_protective_on_stream(stream, "BTCUSDT", [("SL", 12)], clock.time() + 5) is None
+        assert time.monotonic() - t0 < 2 and not stream.connected
+    finally:
+        stream.stop()
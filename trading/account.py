@@ -1,5 +1,6 @@
+import threading
 from binance.error import ClientError
-from infra.client import um
+from infra.client import um, clock
 
 def ensure_leverage(symbol: str, leverage: int = 50):
     """심볼 레버리지를 지정 배수로 맞춤(예: 50x) + ISOLATED 기본 설정"""
@@ -22,10 +23,85 @@ def get_available_balance(asset: str = "USDT") -> float:
         return 0.0
 
 def get_current_price(symbol: str = "BTCUSDT") -> float:
-    """특정 심볼의 현재 가격(마지막 체결 가격)"""
+    """특정 심볼의 현재 가격(마지막 체결 가격). 스트림 피드가 살아 있으면 메모리 값 사용"""
+    from infra.market_feed import get_market_feed
+
+    feed = get_market_feed(symbol)
+    if feed is not None and feed.is_fresh():
+        return feed.price
     try:
         ticker = um.ticker_price(symbol=symbol)
         return float(ticker["price"])
     except ClientError as e:
         print("Error fetching price:", e)
         return 0.0
+
+class BalanceView:
+    """
+    여러 심볼 루프가 공유하는 가용 잔고 뷰.
+    - balance()는 ttl_sec 동안 캐시 (루프마다 REST 호출하지 않음)
+    - reserve(amount): 주문 전 증거금을 선점해 동시에 진입하는 다른 루프가 같은 잔고를 쓰지 않게 함
+      진입이 끝나면(또는 실패하면) release() 후 invalidate()로 거래소 값을 다시 읽음
+    """
+    def __init__(self, asset: str = "USDT", ttl_sec: float = 2.0):
+        self.asset = asset
+        self.ttl_sec = ttl_sec
+        self._lock = threading.Lock()
+        self._value = None
+        self._at = 0.0
+        self.reserved = 0.0
+
+    def _refresh(self, now: float):
+        if self._value is None or now - self._at >= self.ttl_sec:
+            self._value = get_available_balance(self.asset)
+            self._at = now
+
+    def available(self) -> float:
+        """거래소 availableBalance(캐시) - 다른 루프가 선점한 증거금"""
+        with self._lock:
+            self._refresh(clock.time())
+            return max(self._value - self.reserved, 0.0)
+
+    def reserve(self, amount: float) -> bool:
+        """amount만큼 선점. 남은 가용 잔고가 부족하면 False"""
+        with self._lock:
+            self._refresh(clock.time())
+            if self._value - self.reserved < amount:
+                return False
+            self.reserved += amount
+            return True
+
+    def release(self, amount: float):
+        with self._lock:
+            self.reserved = max(self.reserved - amount, 0.0)
+
+    def invalidate(self):
+        with self._lock:
+            self._value = None
+
+async def get_available_balance_async(asset: str = "USDT") -> float:
+    """get_available_balance의 async 버전"""
+    from infra.aio_client import aum
+
+    try:
+        for b in await aum().balance():
+            if b["asset"] == asset:
+                return float(b["availableBalance"])
+        return 0.0
+    except ClientError as e:
+        print("Error fetching balance:", e)
+        return 0.0
+
+async def get_current_price_async(symbol: str = "BTCUSDT") -> float:
+    """get_current_price의 async 버전 (피드가 살아 있으면 네트워크 호출 없음)"""
+    from infra.aio_client import aum
+    from infra.market_feed import get_market_feed
+
+    feed = get_market_feed(symbol)
+    if feed is not None and feed.is_fresh():
+        return feed.price
+    try:
+        return float((await aum().ticker_price(symbol=symbol))["price"])
+    except ClientError as e:
+        print("Error fetching price:", e)
+        return 0.0
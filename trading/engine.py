@@ -0,0 +1,381 @@
+# trading/engine.py
+"""
+멀티 심볼 트레이딩 엔진.
+설정(AI/config.yaml의 symbols)의 심볼마다 독립된 open→wait→close 루프를 스레드로 돌린다.
+- 심볼별: 모델 경로(Decider), 레버리지, 증거금 비율, 신뢰도/TP/SL/대기 시간
+- 공용: Futures 클라이언트(um, 분당 weight 예산 공유), BalanceView(잔고 캐시 + 증거금 선점),
+        UserDataStream(계정 단위 1개), AccountState(포지션·미체결 로컬 상태),
+        TradeJournal(거래 1건 = SQLite 1행)
+한 심볼이 TP/SL 체결을 기다리는 동안(최대 timeout_sec) 다른 심볼 루프는 그대로 진행된다.
+
+  python -m trading.engine
+  python -m trading.engine --symbols BTCUSDT ETHUSDT
+"""
+import argparse
+import asyncio
+import pathlib
+import threading
+import time
+import yaml
+from dataclasses import dataclass, replace, fields
+from infra.client import (um, clock, EXCHANGE, LONG, SHORT, LEVERAGE, MIN_BUFFER,
+                          MIN_AMOUNT_PERCENTAGE, TIF, USE_USER_STREAM, USE_MARKET_STREAM,
+                          USE_ORDER_BOOK)
+from trading.account import ensure_leverage, BalanceView
+from trading.orders import (
+    open_position, cancel_limit_resting_orders, cancel_protective_orders, wait_protective_or_timeout,
+    force_close_on_timeout, get_limit_price_from_orderbook_async
+)
+from trading.precision import get_min_notional
+from infra.aio_client import run_sync
+from infra.metrics import metrics, start_exporters_from_env
+from status.positions import get_position
+from status.state import account_state
+from status.journal import TradeJournal, get_journal, record_from_close
+from status.trade_store import get_trade_store
+from status.history import calc_pnl_roi_from_order
+
+@dataclass
+class SymbolConfig:
+    symbol: str
+    model_path: str
+    leverage: int = LEVERAGE
+    margin_pct: float = MIN_AMOUNT_PERCENTAGE
+    min_conf: float = 0.7
+    window: int = 120
+    loss_pct: float = 0.3
+    gain_pct: float = 0.08
+    timeout_sec: int = 900
+    hold_wait_sec: float = 180
+    trade_wait_sec: float = 300
+    min_balance: float = 500
+    retrain_hours: float | None = None  # 설정하면 이 주기로 백그라운드 증분 재학습 후 결정 사이에 모델 교체
+    store_path: str | None = None  # 심볼 전용 분봉 저장소 (없으면 config.yaml의 기본 심볼 저장소)
+    train_path: str | None = None  # 심볼 전용 피처/라벨 저장소
+
+def symbol_config(sc: SymbolConfig, base):
+    """
+    기본 Config(AI/config.yaml)에 심볼별 모델/저장소 경로를 덮어씀.
+    기본 심볼이 아닌데 store_path/train_path가 없으면 기본 심볼 데이터를 쓰게 되므로 재학습(retrain_hours)은 거부
+    """
+    over = {"symbol": sc.symbol, "model_path": sc.model_path}
+    if sc.store_path:
+        over["store_path"] = sc.store_path
+        # (구) 단일 파일 마이그레이션이 기본 심볼 파일을 이 저장소로 끌어오지 않도록
+        over["data_path"] = str(pathlib.Path(sc.store_path).with_suffix(".parquet"))
+    if sc.train_path:
+        over["train_path"] = sc.train_path
+    if sc.retrain_hours and sc.symbol != base.symbol and not (sc.store_path and sc.train_path):
+        raise SystemExit(f"[ENGINE] {sc.symbol}: retrain_hours를 쓰려면 심볼 전용 store_path/train_path가 필요합니다.")
+    return replace(base, **over)
+
+def load_symbol_configs(path: str | None = None) -> list[SymbolConfig]:
+    """config.yaml의 symbols 목록 (없으면 기존 단일 symbol/model_path). 경로(model/store/train)는 config 기준 상대경로"""
+    if path is None:
+        path = pathlib.Path(__file__).resolve().parent.parent / "AI" / "config.yaml"
+    base = pathlib.Path(path).parent
+    with open(path, "r") as f:
+        raw = yaml.safe_load(f)
+
+    entries = raw.get("symbols") or [{"symbol": raw["symbol"], "model_path": raw["model_path"]}]
+    known = {f.name for f in fields(SymbolConfig)}
+    out = []
+    for e in entries:
+        e = {k: v for k, v in e.items() if k in known}
+        for k in ("model_path", "store_path", "train_path"):
+            if e.get(k):
+                e[k] = str(base / e[k])
+        out.append(SymbolConfig(**e))
+    return out
+
+class SymbolTrader:
+    """
+    한 심볼의 트레이딩 루프 (단일 심볼 main.py도 이 클래스로 실행, 심볼별 통계).
+    decider: 공용 Decider를 쓸 때 전달 (기본: 심볼 설정으로 새로 생성)
+    """
+    def __init__(self, sc: SymbolConfig, balance: BalanceView, stream=None, cfg=None,
+                 journal: TradeJournal | None = None, decider=None):
+        from AI.decide import Decider
+        from AI.utils import load_config
+
+        self.sc = sc
+        self.balance = balance
+        self.stream = stream
+        self.journal = journal or get_journal()
+        if decider is None:
+            decider = Decider(cfg=symbol_config(sc, cfg or load_config()), client=um)
+        elif sc.retrain_hours and decider.cfg.symbol != sc.symbol:
+            raise SystemExit(f"[ENGINE] {sc.symbol}: 전달된 결정기({decider.cfg.symbol})로는 재학습할 수 없습니다.")
+        self.decider = decider
+        self._dirty = False  # step() 예외 뒤 포지션/주문 상태를 확인하기 전까지 True
+        self.retrainer = None
+        self._next_retrain = None
+        self.stats = {"tx": 0, "tp": 0, "sl": 0, "idle": 0, "total_profit": 0.0}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _tag(self) -> str:
+        return f"[{self.sc.symbol}]"
+
+    async def _entry_inputs(self):
+        """호가 조회와 (캐시된) 잔고/최소 명목가 조회를 겹쳐서 실행"""
+        return await asyncio.gather(
+            get_limit_price_from_orderbook_async(self.sc.symbol, side="BUY", maker_mode=True,
+                                                 price_offset_ticks=1),
+            asyncio.to_thread(self.balance.available),
+            asyncio.to_thread(get_min_notional, self.sc.symbol),
+        )
+
+    def _retrain_tick(self):
+        """retrain_hours 주기마다 백그라운드 증분 재학습 시작, 검증 끝난 모델은 결정 전에 교체"""
+        hours = self.sc.retrain_hours
+        if not hours:
+            return
+        from AI.retrainer import Retrainer
+
+        now = clock.time()
+        if self._next_retrain is None:
+            self._next_retrain = (now // 60) * 60 + hours * 3600
+        if now >= self._next_retrain:
+            print(f"{self._tag()} [RETRAIN] 증분 재학습 시작")
+            if self.retrainer is None:
+                self.retrainer = Retrainer(self.decider.cfg)
+            self.retrainer.request("incremental")
+            self._next_retrain += hours * 3600
+        ready = self.retrainer.poll() if self.retrainer is not None else None
+        if ready:
+            path, res = ready
+            self.decider.install(path)
+            print(f"{self._tag()} [MODEL] swapped (cv≈{res['cv_score']:.4f}, retrain={res['retrain_sec']}s)")
+
+    def step(self) -> float | None:
+        """거래 1사이클. 다음 사이클까지 대기할 초, 루프를 끝내야 하면 None"""
+        sc, sym = self.sc, self.sc.symbol
+
+        self._retrain_tick()
+        with metrics.span("decide"):
+            result = self.decider.decide(sc.min_conf, sc.window)
+        action = result["action"]
+        if action == "HOLD":
+            print(f"{self._tag()} HOLD")
+            return sc.hold_wait_sec
+        side = LONG if action == "BUY" else SHORT
+
+        tx_lines = []
+        with metrics.span("price"):
+            order_price, bal, min_notional = run_sync(self._entry_inputs())
+        min_margin_needed = (min_notional / sc.leverage) * MIN_BUFFER
+        tx_lines.append(f"[BALANCE] availableBalance={bal:.2f} USDT (reserved by others={self.balance.reserved:.2f})")
+        if bal < min_margin_needed or bal < sc.min_balance:
+            print(f"{self._tag()} [EXIT] 가용 잔고가 최소 주문 기준에 미달합니다. 루프 종료.")
+            return None
+
+        margin_usdt = max(bal * sc.margin_pct, min_margin_needed)
+        if not self.balance.reserve(margin_usdt):
+            print(f"{self._tag()} [SKIP] 다른 심볼이 잔고를 선점 중")
+            return sc.hold_wait_sec
+        print(f"{self._tag()} ----------------TRANSACTION #{self.stats['tx'] + 1}")
+        try:
+            qty, resp_sl, resp_tp = open_position(
+                sym, side=side, margin_usdt=margin_usdt, leverage=sc.leverage,
+                price=order_price, loss_pct=sc.loss_pct, gain_pct=sc.gain_pct, tif=TIF
+            )
+        finally:
+            self.balance.release(margin_usdt)
+            self.balance.invalidate()
+
+        pos = get_position(sym)
+        if not pos:
+            print(f"{self._tag()} [ERROR] 포지션 오픈 실패 또는 즉시 체결 안 됨")
+            cancel_limit_resting_orders(sym, include_partially_filled=True)
+            return sc.hold_wait_sec
+
+        entry_ref, iso_ref = pos["entryPrice"], pos["isolatedWallet"]
+        opened_at = clock.time()
+        tx_lines.append(f"[POS] {pos['side']} amount={pos['isolatedWallet']:.2f}USDT "
+                        f"@ entry={pos['entryPrice']} (BEP={pos['breakEvenPrice']}, "
+                        f"liq={pos['liquidationPrice']}, lev={pos['leverage']}x)")
+
+        tp_id = resp_tp.get("orderId") if resp_tp else None
+        sl_id = resp_sl.get("orderId") if resp_sl else None
+        with metrics.span("hold"):
+            w = wait_protective_or_timeout(sym, tp_order_id=tp_id, sl_order_id=sl_id,
+                                           timeout_sec=sc.timeout_sec, poll_sec=0.5, stream=self.stream)
+        t_exit = time.perf_counter()
+        reason = w["reason"]
+        stats = None
+        if reason in ("TP", "SL"):
+            close_order_id, close_order = w["filled_order_id"], w["filled_order"]
+            self.stats["tp" if reason == "TP" else "sl"] += 1
+        else:
+            self.stats["idle"] += 1
+            fc = force_close_on_timeout(sym, order_ids=[tp_id, sl_id])
+            close_order_id, close_order = fc["close_order_id"], fc["close_resp"]
+
+        profit = 0.0
+        if close_order_id:
+            executed = float((close_order or {}).get("executedQty") or 0) or None
+            stats = calc_pnl_roi_from_order(sym, close_order_id, entry_ref, iso_ref, executed_qty=executed)
+            profit = stats["net"] if stats["net"] is not None else 0.0
+            roi_pct = f"{(stats['roi']*100):.2f}%" if stats["roi"] is not None else "N/A"
+            tx_lines.append(
+                f"[CLOSE] 이유={reason}, orderId={close_order_id}, "
+                f"avg={stats['avg']}, qty={stats['qty']}, "
+                f"fee={stats['fee']:.4f} {stats['fee_asset'] or 'USDT'}, "
+                f"realized(ex fee)={stats['realized']:.4f} USDT, net={profit:.4f} USDT"
+            )
+            tx_lines.append(f"[RESULT] Net PnL={profit:.4f} USDT, ROI(margin)={roi_pct}")
+        else:
+            print(f"{self._tag()} [ERROR] IDLE 청산 주문 없음(이미 청산되었을 수 있음)")
+        self.balance.invalidate()
+        metrics.observe_phase("exit", time.perf_counter() - t_exit)
+
+        st = self.stats
+        st["tx"] += 1
+        st["total_profit"] += profit
+        tx_lines.append(f"[STATS] tx={st['tx']}, TP={st['tp']}, SL={st['sl']}, IDLE={st['idle']}")
+        tx_lines.append(f"[STATS] last PnL={profit:.4f} USDT, total_profit={st['total_profit']:.4f} USDT")
+        self.journal.append(record_from_close(sym, pos, reason, close_order_id, stats, result, opened_at))
+        print("\n".join(f"{self._tag()} {line}" for line in tx_lines))
+        return sc.trade_wait_sec
+
+    def run(self):
+        ensure_leverage(self.sc.symbol, leverage=self.sc.leverage)
+        while not self._stop.is_set():
+            if getattr(um, "exhausted", False):
+                print(f"{self._tag()} [SIM] 재생할 분봉이 끝났습니다. 루프 종료.")
+                break
+            if self._dirty and not self._reconcile():
+                clock.sleep(self.sc.hold_wait_sec)  # 상태를 모르는 채로 다음 진입을 하지 않음
+                continue
+            try:
+                wait = self.step()
+            except Exception as e:
+                # 한 심볼의 오류가 다른 심볼 루프를 멈추지 않도록
+                print(f"{self._tag()} [ENGINE ERR] {type(e).__name__}: {e}")
+                self._dirty = True
+                self._reconcile()
+                wait = self.sc.hold_wait_sec
+            if wait is None:
+                break
+            clock.sleep(wait)
+
+    def _reconcile(self) -> bool:
+        """
+        step() 도중 예외 뒤 거래소 기준으로 상태 정리: 남은 포지션은 보호주문 취소 + 시장가 청산,
+        포지션이 없으면 남은 진입/보호 주문 취소. 포지션이 없는 것까지 확인되면 True
+        """
+        sym = self.sc.symbol
+        try:
+            pos = get_position(sym)
+            if pos:
+                print(f"{self._tag()} [RECONCILE] 남은 포지션 {pos['side']} → 보호주문 취소 + 시장가 청산")
+                force_close_on_timeout(sym)
+            cancel_limit_resting_orders(sym, include_partially_filled=True)
+            cancel_protective_orders(sym)
+            self.balance.invalidate()
+            if get_position(sym):
+                print(f"{self._tag()} [RECONCILE] 포지션이 아직 남아 있음 → 다음 루프에서 재시도")
+                return False
+        except Exception as e:
+            print(f"{self._tag()} [RECONCILE ERR] {type(e).__name__}: {e}")
+            return False
+        self._dirty = False
+        return True
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name=f"trader-{self.sc.symbol}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def join(self, timeout: float | None = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+class TradingEngine:
+    """심볼별 SymbolTrader를 만들고 함께 시작/정지"""
+    def __init__(self, symbols: list[SymbolConfig] | None = None, stream=None,
+                 balance: BalanceView | None = None, journal: TradeJournal | None = None):
+        symbols = symbols or load_symbol_configs()
+        if EXCHANGE == "sim" and len(symbols) > 1:
+            raise SystemExit("[ENGINE] sim 거래소는 단일 심볼만 지원합니다.")
+        self.balance = balance or BalanceView("USDT")
+        self.stream = stream
+        self.journal = journal or get_journal()
+        self.traders = [SymbolTrader(sc, self.balance, stream=stream, journal=self.journal) for sc in symbols]
+        self.feeds = []
+
+    def use_market_feeds(self):
+        """심볼마다 MarketFeed를 띄워 결정기/현재가 조회에 연결"""
+        from infra.market_feed import MarketFeed, set_market_feed
+
+        for t in self.traders:
+            feed = MarketFeed(t.sc.symbol, window=500).start()
+            set_market_feed(feed)
+            t.decider.attach_feed(feed)
+            self.feeds.append(feed)
+
+    def use_order_books(self):
+        """심볼마다 LocalOrderBook을 띄워 maker 주문가 계산에 사용"""
+        from infra.order_book import LocalOrderBook, set_order_book
+
+        for t in self.traders:
+            book = LocalOrderBook(t.sc.symbol).start()
+            set_order_book(book)
+            self.feeds.append(book)
+
+    def start(self):
+        for t in self.traders:
+            t.start()
+        print(f"[ENGINE] started {[t.sc.symbol for t in self.traders]}")
+        return self
+
+    def stop(self):
+        for t in self.traders:
+            t.stop()
+        for f in self.feeds:
+            f.stop()
+
+    def join(self):
+        for t in self.traders:
+            t.join()
+
+    def stats(self) -> dict:
+        return {t.sc.symbol: dict(t.stats) for t in self.traders}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--symbols", nargs="*", default=None, help="설정 중 실행할 심볼만 선택")
+    args = ap.parse_args()
+
+    symbols = load_symbol_configs()
+    if args.symbols:
+        symbols = [s for s in symbols if s.symbol in set(args.symbols)]
+
+    stream = None
+    if USE_USER_STREAM:
+        from infra.user_stream import UserDataStream
+        stream = UserDataStream().start()
+        account_state.attach_stream(stream)
+        get_trade_store().attach_stream(stream)
+    engine = TradingEngine(symbols, stream=stream)
+    if USE_MARKET_STREAM:
+        engine.use_market_feeds()
+    if USE_ORDER_BOOK:
+        engine.use_order_books()
+    start_exporters_from_env()
+    engine.start()
+    try:
+        engine.join()
+    except KeyboardInterrupt:
+        engine.stop()
+    engine.journal.close()
+    print(f"[ENGINE] stats={engine.stats()}")
+    print(f"[ENGINE] phases={metrics.snapshot()['phases']}")
+    print(f"[ENGINE] state={account_state.stats}")
+
+if __name__ == "__main__":
+    main()
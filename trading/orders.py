@@ -1,10 +1,14 @@
-import time
+import asyncio
 from binance.error import ClientError
-from infra.client import um
-from trading.precision import get_rounders, _get_precisions, _fmt
-from status.positions import get_position
-from trading.account import get_current_price
-from infra.client import SYMBOL
+from infra.client import um, clock
+from infra.aio_client import aum, run_sync, aio_sleep
+from infra.metrics import metrics
+from trading.precision import (get_rounders, _get_precisions, _fmt, get_tick_size, get_min_notional,
+                               symbol_filters, is_filter_error)
+from status.positions import get_position_async
+from status.open_orders import get_open_orders_async
+from status.state import account_state
+from trading.account import get_current_price, get_available_balance_async
 
 def prepare_order_params(symbol: str, raw_price: float, raw_qty: float):
     """라운딩 + 최소조건 검사 → (price, qty) or None"""
@@ -24,35 +28,152 @@ def prepare_order_params_from_margin(symbol: str, margin_usdt: float, leverage:
     raw_qty = notional / price
     return prepare_order_params(symbol, price, raw_qty)
 
+def _submit(symbol: str, make_params):
+    """
+    new_order 전송. 심볼 필터 위반으로 거절되면 필터 캐시를 무효화하고
+    make_params()로 파라미터를 다시 만들어 1회 재시도. 응답은 로컬 상태에 반영.
+    """
+    try:
+        resp = um.new_order(**make_params())
+    except ClientError as e:
+        if not is_filter_error(e):
+            raise
+        print(f"[FILTER] {symbol} 필터 위반 거절 → exchange_info 재조회 후 재시도: {e}")
+        symbol_filters.invalidate(symbol)
+        resp = um.new_order(**make_params())
+    account_state.on_order(resp)
+    return resp
+
+async def prefetch_filters_async(symbol: str):
+    """
+    심볼 필터가 캐시에 없거나 만료됐으면 스레드에서 미리 적재.
+    make_params/get_rounders가 이벤트 루프 안에서 exchange_info(블로킹 REST)를 부르지 않도록
+    """
+    if not symbol_filters.is_fresh(symbol):
+        await asyncio.to_thread(symbol_filters.get, symbol)
+
+async def _submit_async(symbol: str, make_params):
+    """_submit의 async 버전 (필터 조회/재조회는 블로킹 REST라 스레드에서)"""
+    await prefetch_filters_async(symbol)
+    try:
+        resp = await aum().new_order(**make_params())
+    except ClientError as e:
+        if not is_filter_error(e):
+            raise
+        print(f"[FILTER] {symbol} 필터 위반 거절 → exchange_info 재조회 후 재시도: {e}")
+        symbol_filters.invalidate(symbol)
+        params = await asyncio.to_thread(make_params)
+        resp = await aum().new_order(**params)
+    account_state.on_order(resp)
+    return resp
+
+BATCH_ORDER_MAX = 5     # POST /fapi/v1/batchOrders 한 번에 최대 5개
+BATCH_CANCEL_MAX = 10   # DELETE /fapi/v1/batchOrders 한 번에 최대 10개
+
+def _batch_item(params: dict) -> dict:
+    """batchOrders JSON 항목: 값은 문자열(불리언은 "true"/"false")"""
+    return {k: (str(v).lower() if isinstance(v, bool) else str(v))
+            for k, v in params.items() if v is not None}
+
+def _batch_result(item, status: int = 400):
+    """batch 응답 항목 → 성공이면 dict 그대로, 실패({"code","msg"})면 ClientError"""
+    if isinstance(item, dict) and "orderId" not in item and item.get("code") is not None:
+        return ClientError(status, item.get("code"), item.get("msg"), {})
+    return item
+
+async def _submit_batch_async(symbol: str, makers: list) -> list:
+    """
+    여러 주문을 batchOrders 한 번으로 전송. 반환: 입력 순서대로 응답 dict 또는 ClientError.
+    필터 위반으로 거절된 항목만 필터 캐시를 무효화하고 한 번 더 batch로 재시도.
+    요청 자체가 거절되면 모든 항목이 같은 ClientError.
+    """
+    async def send(idx):
+        params = await asyncio.to_thread(lambda: [_batch_item(makers[i]()) for i in idx])
+        try:
+            items = await aum().new_batch_order(batchOrders=params)
+        except ClientError as e:
+            return [e] * len(idx)
+        return [_batch_result(x) for x in items]
+
+    results = [None] * len(makers)
+    todo = list(range(len(makers)))
+    for attempt in range(2):
+        for k in range(0, len(todo), BATCH_ORDER_MAX):
+            chunk = todo[k:k + BATCH_ORDER_MAX]
+            for i, r in zip(chunk, await send(chunk)):
+                results[i] = r
+        retry = [i for i in todo if isinstance(results[i], ClientError) and is_filter_error(results[i])]
+        if attempt or not retry:
+            break
+        print(f"[FILTER] {symbol} batch 항목 필터 위반 거절 → exchange_info 재조회 후 재시도: {results[retry[0]]}")
+        symbol_filters.invalidate(symbol)
+        todo = retry
+    for r in results:
+        account_state.on_order(r)
+    return results
+
+async def _cancel_ids_async(symbol: str, order_ids: list[int]):
+    """
+    주문 id들을 batch 취소(10개 단위, 여러 묶음이면 동시에). 반환: (cancelled_ids, [(id, error_str), ...])
+    """
+    chunks = [order_ids[k:k + BATCH_CANCEL_MAX] for k in range(0, len(order_ids), BATCH_CANCEL_MAX)]
+    replies = await asyncio.gather(*(aum().cancel_batch_order(symbol=symbol, orderIdList=c, origClientOrderIdList=None)
+                                     for c in chunks), return_exceptions=True)
+    cancelled, errors = [], []
+    for chunk, reply in zip(chunks, replies):
+        if isinstance(reply, Exception):
+            errors += [(oid, str(reply)) for oid in chunk]
+            continue
+        for oid, item in zip(chunk, reply):
+            r = _batch_result(item)
+            if isinstance(r, ClientError):
+                errors.append((oid, str(r)))
+            else:
+                cancelled.append(oid)
+                account_state.on_order(r)
+    return cancelled, errors
+
 def order(symbol: str, side: str, type: str, price: float, qty: float, tif: str = "GTC"):
     """
     Futures 주문 전송 (LIMIT/MARKET 등) + precision 방어
     """
-    price_dec, qty_dec = _get_precisions(symbol)
-    ROUND_QTY, ROUND_PRICE, _ = get_rounders(symbol)
+    return _submit(symbol, _order_params(symbol, side, type, price, qty, tif))
 
-    price_r = ROUND_PRICE(price)
-    qty_r   = ROUND_QTY(qty)
+async def order_async(symbol: str, side: str, type: str, price: float, qty: float, tif: str = "GTC"):
+    """order의 async 버전"""
+    return await _submit_async(symbol, _order_params(symbol, side, type, price, qty, tif))
 
-    price_s = _fmt(price_r, price_dec)
-    qty_s   = _fmt(qty_r, qty_dec)
+def _order_params(symbol: str, side: str, type: str, price: float, qty: float, tif: str):
+    def make_params():
+        price_dec, qty_dec = _get_precisions(symbol)
+        ROUND_QTY, ROUND_PRICE, _ = get_rounders(symbol)
 
-    if type.upper() == "MARKET":
-        return um.new_order(
-            symbol=symbol, side=side, type="MARKET",
-            quantity=qty_s, timeInForce=tif
-        )
-    else:
-        return um.new_order(
-            symbol=symbol, side=side, type=type,
-            price=price_s, quantity=qty_s,
-            timeInForce=tif
-        )
+        price_s = _fmt(ROUND_PRICE(price), price_dec)
+        qty_s   = _fmt(ROUND_QTY(qty), qty_dec)
+
+        if type.upper() == "MARKET":
+            return dict(symbol=symbol, side=side, type="MARKET",
+                        quantity=qty_s, timeInForce=tif)
+        return dict(symbol=symbol, side=side, type=type,
+                    price=price_s, quantity=qty_s, timeInForce=tif)
+
+    return make_params
 
 def place_take_profit_by_roi_pct(symbol: str, side_open: str, entry_price: float,
                                  leverage: int, roi_gain_pct: float = 0.05,
                                  working_type: str = "MARK_PRICE"):
     """ROI +X%에서 전량 TAKE_PROFIT_MARKET"""
+    return _submit(symbol, _tp_params(symbol, side_open, entry_price, leverage, roi_gain_pct, working_type))
+
+async def place_take_profit_by_roi_pct_async(symbol: str, side_open: str, entry_price: float,
+                                             leverage: int, roi_gain_pct: float = 0.05,
+                                             working_type: str = "MARK_PRICE"):
+    """place_take_profit_by_roi_pct의 async 버전"""
+    return await _submit_async(symbol, _tp_params(symbol, side_open, entry_price, leverage,
+                                                  roi_gain_pct, working_type))
+
+def _tp_params(symbol: str, side_open: str, entry_price: float, leverage: int,
+               roi_gain_pct: float, working_type: str):
     roi = float(roi_gain_pct)
     side_open = side_open.upper()
 
@@ -65,24 +186,36 @@ def place_take_profit_by_roi_pct(symbol: str, side_open: str, entry_price: float
     else:
         raise ValueError("side_open must be 'BUY' or 'SELL'")
 
-    _, ROUND_PRICE, _ = get_rounders(symbol)
-    tp_price = ROUND_PRICE(raw_tp)
-    price_dec, _ = _get_precisions(symbol)
-    tp_price_s = _fmt(tp_price, price_dec)
+    def make_params():
+        _, ROUND_PRICE, _ = get_rounders(symbol)
+        price_dec, _ = _get_precisions(symbol)
+        tp_price_s = _fmt(ROUND_PRICE(raw_tp), price_dec)
+        return dict(
+            symbol=symbol,
+            side=close_side,
+            type="TAKE_PROFIT_MARKET",
+            stopPrice=tp_price_s,
+            closePosition=True,
+            workingType=working_type
+        )
 
-    return um.new_order(
-        symbol=symbol,
-        side=close_side,
-        type="TAKE_PROFIT_MARKET",
-        stopPrice=tp_price_s,
-        closePosition=True,
-        workingType=working_type
-    )
+    return make_params
 
 def place_stop_loss_by_roi_pct(symbol: str, side_open: str, entry_price: float,
                                leverage: int, roi_loss_pct: float = 0.70,
                                working_type: str = "MARK_PRICE"):
     """ROI -X%에서 전량 STOP_MARKET"""
+    return _submit(symbol, _sl_params(symbol, side_open, entry_price, leverage, roi_loss_pct, working_type))
+
+async def place_stop_loss_by_roi_pct_async(symbol: str, side_open: str, entry_price: float,
+                                           leverage: int, roi_loss_pct: float = 0.70,
+                                           working_type: str = "MARK_PRICE"):
+    """place_stop_loss_by_roi_pct의 async 버전"""
+    return await _submit_async(symbol, _sl_params(symbol, side_open, entry_price, leverage,
+                                                  roi_loss_pct, working_type))
+
+def _sl_params(symbol: str, side_open: str, entry_price: float, leverage: int,
+               roi_loss_pct: float, working_type: str):
     roi = float(roi_loss_pct)
     side_open = side_open.upper()
 
@@ -95,27 +228,35 @@ def place_stop_loss_by_roi_pct(symbol: str, side_open: str, entry_price: float,
     else:
         raise ValueError("side_open must be 'BUY' or 'SELL'")
 
-    _, ROUND_PRICE, _ = get_rounders(symbol)
-    stop_price = ROUND_PRICE(raw_stop)
-    price_dec, _ = _get_precisions(symbol)
-    stop_price_s = _fmt(stop_price, price_dec)
+    def make_params():
+        _, ROUND_PRICE, _ = get_rounders(symbol)
+        price_dec, _ = _get_precisions(symbol)
+        stop_price_s = _fmt(ROUND_PRICE(raw_stop), price_dec)
+        return dict(
+            symbol=symbol,
+            side=close_side,
+            type="STOP_MARKET",
+            stopPrice=stop_price_s,
+            closePosition=True,
+            workingType=working_type
+        )
 
-    return um.new_order(
-        symbol=symbol,
-        side=close_side,
-        type="STOP_MARKET",
-        stopPrice=stop_price_s,
-        closePosition=True,
-        workingType=working_type
-    )
+    return make_params
 
 def open_position(symbol: str, side: str, margin_usdt: float, leverage: int, price: float,
                   loss_pct: float = 0.70, gain_pct: float = 0.07, tif: str = "GTC"):
     """
     포지션 오픈(LIMIT) + entry 확인 후 SL/TP 등록(MARKET형)
     반환: (opened_qty, sl_response, tp_response)
+    (동기 shim: open_position_async를 공용 이벤트 루프에서 실행)
     """
-    params = prepare_order_params_from_margin(symbol, margin_usdt, leverage, price)
+    return run_sync(open_position_async(symbol, side, margin_usdt, leverage, price,
+                                        loss_pct=loss_pct, gain_pct=gain_pct, tif=tif))
+
+async def open_position_async(symbol: str, side: str, margin_usdt: float, leverage: int, price: float,
+                              loss_pct: float = 0.70, gain_pct: float = 0.07, tif: str = "GTC"):
+    """open_position의 async 버전. SL/TP는 batchOrders 한 번으로 전송(보호 없는 구간 최소화)"""
+    params = await asyncio.to_thread(prepare_order_params_from_margin, symbol, margin_usdt, leverage, price)
     if not params:
         print("[INFO] 주문 준비 실패(최소 수량/최소 명목가 미달 등)")
         return None, None, None
@@ -123,9 +264,8 @@ def open_position(symbol: str, side: str, margin_usdt: float, leverage: int, pri
     __price, qty = params
 
     try:
-        resp_open = order(symbol, side=side, type="LIMIT", price=__price, qty=qty, tif=tif)
-        #print("[ORDER] 주문 전송:", resp_open)
-        #print("[ORDER] 주문 전송")
+        with metrics.span("entry"):
+            resp_open = await order_async(symbol, side=side, type="LIMIT", price=__price, qty=qty, tif=tif)
     except ClientError as e:
         print("[ORDER ERROR]", e)
         return None, None, None
@@ -133,44 +273,40 @@ def open_position(symbol: str, side: str, margin_usdt: float, leverage: int, pri
     # 체결 진입가가 잡힐 때까지 대기
     entry_px = None
     retry=0
-    while entry_px is None:
-        pos = get_position(symbol)
-        if pos and pos["entryPrice"] > 0:
-            entry_px = pos["entryPrice"]
-        else:
-            print("[WAIT] 포지션 진입 대기 중...")
-            retry += 1
-            if retry >= 20:
-                print("[TIMEOUT] 포지션 진입 실패. 주문 확인 필요.")
-                return None, None, None
-            time.sleep(1)
-
-    # SL 등록
-    try:
-        resp_sl = place_stop_loss_by_roi_pct(
-            symbol=symbol, side_open=side, entry_price=entry_px,
-            leverage=leverage, roi_loss_pct=loss_pct, working_type="MARK_PRICE"
-        )
-        #print("[SL] 등록:", resp_sl)
-        print("[SL] 등록:",resp_sl["stopPrice"])
-    except ClientError as e:
-        print("[SL ERROR]", e)
+    with metrics.span("fill"):
+        while entry_px is None:
+            pos = await get_position_async(symbol)
+            if pos and pos["entryPrice"] > 0:
+                entry_px = pos["entryPrice"]
+            else:
+                print("[WAIT] 포지션 진입 대기 중...")
+                retry += 1
+                if retry >= 20:
+                    print("[TIMEOUT] 포지션 진입 실패. 주문 확인 필요.")
+                    return None, None, None
+                await aio_sleep(1)
+
+    # SL/TP 한 번에 등록
+    with metrics.span("protect"):
+        resp_sl, resp_tp = await _submit_batch_async(symbol, [
+            _sl_params(symbol, side, entry_px, leverage, loss_pct, "MARK_PRICE"),
+            _tp_params(symbol, side, entry_px, leverage, gain_pct, "MARK_PRICE"),
+        ])
+
+    if isinstance(resp_sl, ClientError):
+        print("[SL ERROR]", resp_sl)
         resp_sl = None
+    else:
+        print("[SL] 등록:", resp_sl["stopPrice"])
 
-    # TP 등록
-    try:
-        resp_tp = place_take_profit_by_roi_pct(
-            symbol=symbol, side_open=side, entry_price=entry_px,
-            leverage=leverage, roi_gain_pct=gain_pct, working_type="MARK_PRICE"
-        )
-        #print("[TP] 등록:", resp_tp)
-        print("[TP] 등록:",resp_tp["stopPrice"])
-    except ClientError as e:
-        print("[TP ERROR]", e)
-        res = close_position_market(SYMBOL)
-        res = cancel_limit_resting_orders(SYMBOL, include_partially_filled=True)
-        res = cancel_protective_orders(SYMBOL)
+    if isinstance(resp_tp, ClientError):
+        print("[TP ERROR]", resp_tp)
+        await close_position_market_async(symbol)
+        await asyncio.gather(cancel_limit_resting_orders_async(symbol, include_partially_filled=True),
+                             cancel_protective_orders_async(symbol))
         resp_tp = None
+    else:
+        print("[TP] 등록:", resp_tp["stopPrice"])
 
     return qty, resp_sl, resp_tp
 
@@ -182,16 +318,17 @@ def cancel_limit_resting_orders(symbol: str, include_partially_filled: bool = Fa
     - include_partially_filled=True 이면 PARTIALLY_FILLED 상태도 취소 시도
     반환: {"cancelled":[orderId...], "skipped":[orderId...], "errors":[(orderId, str(e))...] }
     """
-    from infra.client import um
-    from status.open_orders import get_open_orders
+    return run_sync(cancel_limit_resting_orders_async(symbol, include_partially_filled))
 
+async def cancel_limit_resting_orders_async(symbol: str, include_partially_filled: bool = False):
+    """cancel_limit_resting_orders의 async 버전 (대상 주문은 batch 취소)"""
     CANCELABLE_STATUSES = {"NEW", "PENDING_NEW"}
     if include_partially_filled:
         CANCELABLE_STATUSES |= {"PARTIALLY_FILLED"}
 
-    cancelled, skipped, errors = [], [], []
+    targets, skipped = [], []
 
-    orders = get_open_orders(symbol)  # 모든 미체결(보호+일반)
+    orders = await get_open_orders_async(symbol)  # 모든 미체결(보호+일반)
     for od in orders:
         # 보호주문(Stop/TP/Trailing or reduceOnly/closePosition)은 건너뜀
         protective = (
@@ -204,38 +341,52 @@ def cancel_limit_resting_orders(symbol: str, include_partially_filled: bool = Fa
 
         # LIMIT 주문만 대상으로, 취소 가능한 상태만
         if od["kind"] == "limit" and (od["status"] in CANCELABLE_STATUSES):
-            try:
-                um.cancel_order(symbol=symbol, orderId=od["orderId"])
-                cancelled.append(od["orderId"])
-            except Exception as e:
-                errors.append((od["orderId"], str(e)))
+            targets.append(od["orderId"])
         else:
             skipped.append(od["orderId"])
 
+    cancelled, errors = await _cancel_ids_async(symbol, targets)
     return {"cancelled": cancelled, "skipped": skipped, "errors": errors}
 
-def cancel_protective_orders(symbol: str):
+def cancel_protective_orders(symbol: str, order_ids: list[int] | None = None):
     """
     TP/SL/트레일링 등 '보호성' 주문만 모두 취소.
+    order_ids(예: 방금 등록한 TP/SL id)를 주면 미체결 목록 조회 없이 바로 batch 취소.
     반환: {"cancelled": [orderId...]}
     """
-    from infra.client import um
-    from status.open_orders import get_open_orders
+    return run_sync(cancel_protective_orders_async(symbol, order_ids))
 
-    cancelled = []
-    orders = get_open_orders(symbol)  # 모든 미체결
-    for od in orders:
-        otype = (od["type"] or "").upper()
-        is_protective = (
-            otype in {"STOP", "STOP_MARKET", "TAKE_PROFIT", "TAKE_PROFIT_MARKET", "TRAILING_STOP_MARKET"}
-            or od.get("reduceOnly") or od.get("closePosition")
-        )
-        if is_protective:
+async def cancel_protective_orders_async(symbol: str, order_ids: list[int] | None = None):
+    """
+    cancel_protective_orders의 async 버전.
+    미체결이 전부 보호주문이면 cancel-all 1회, 아니면 보호주문만 batch 취소
+    """
+    # 등록 실패한 TP/SL은 id가 None → 걸러내고, 남는 게 없으면 미체결 목록으로
+    targets = [int(x) for x in order_ids or [] if x is not None]
+    if not targets:
+        orders = await get_open_orders_async(symbol)  # 모든 미체결
+        targets = []
+        for od in orders:
+            otype = (od["type"] or "").upper()
+            is_protective = (
+                otype in {"STOP", "STOP_MARKET", "TAKE_PROFIT", "TAKE_PROFIT_MARKET", "TRAILING_STOP_MARKET"}
+                or od.get("reduceOnly") or od.get("closePosition")
+            )
+            if is_protective:
+                targets.append(od["orderId"])
+        if targets and len(targets) == len(orders):
             try:
-                um.cancel_order(symbol=symbol, orderId=od["orderId"])
-                cancelled.append(od["orderId"])
-            except Exception as e:
-                print(f"[CANCEL ERR] orderId={od['orderId']} {e}")
+                await aum().cancel_open_orders(symbol=symbol)
+                account_state.on_cancel_all(symbol)
+                return {"cancelled": targets}
+            except ClientError as e:
+                print(f"[CANCEL ERR] cancel-all 실패 → batch 취소: {e}")
+
+    if not targets:
+        return {"cancelled": []}
+    cancelled, errors = await _cancel_ids_async(symbol, targets)
+    for oid, err in errors:
+        print(f"[CANCEL ERR] orderId={oid} {err}")
     return {"cancelled": cancelled}
 
 def close_position_market(symbol: str):
@@ -243,16 +394,17 @@ def close_position_market(symbol: str):
     현재 열린 포지션이 있으면 전량 MARKET로 청산(reduceOnly=True)
     반환: {"close_resp": resp or None, "closed_qty": float}
     """
-    from infra.client import um
-    from status.positions import get_position
-    from trading.precision import get_rounders, _get_precisions, _fmt
+    return run_sync(close_position_market_async(symbol))
 
-    pos = get_position(symbol)
+async def close_position_market_async(symbol: str):
+    """close_position_market의 async 버전"""
+    pos = await get_position_async(symbol)
     if not pos:
         return {"close_resp": None, "closed_qty": 0.0}
 
     side_close = "SELL" if pos["side"] == "LONG" else "BUY"
     qty_raw = abs(float(pos["positionAmt"]))
+    await prefetch_filters_async(symbol)
     ROUND_QTY, _, _ = get_rounders(symbol)
     qty = ROUND_QTY(qty_raw)
 
@@ -260,18 +412,20 @@ def close_position_market(symbol: str):
         print("[WARN] 청산 수량이 0 입니다. 주문 스킵.")
         return {"close_resp": None, "closed_qty": 0.0}
 
-    # 정밀 포맷
-    _, qty_dec = _get_precisions(symbol)
-    qty_s = _fmt(qty, qty_dec)
-
-    try:
-        resp = um.new_order(
+    def make_params():
+        # 정밀 포맷
+        ROUND_QTY, _, _ = get_rounders(symbol)
+        _, qty_dec = _get_precisions(symbol)
+        return dict(
             symbol=symbol,
             side=side_close,
             type="MARKET",
-            quantity=qty_s,
+            quantity=_fmt(ROUND_QTY(qty_raw), qty_dec),
             reduceOnly=True
         )
+
+    try:
+        resp = await _submit_async(symbol, make_params)
     except Exception as e:
         print("[CLOSE ERR]", e)
         resp = None
@@ -279,40 +433,109 @@ def close_position_market(symbol: str):
     return {"close_resp": resp, "closed_qty": qty}
 
 def wait_protective_or_timeout(symbol: str, tp_order_id: int | None, sl_order_id: int | None,
-                               timeout_sec: int = 30, poll_sec: float = 0.5):
+                               timeout_sec: int = 30, poll_sec: float = 0.5, stream=None):
     """
-    TP/SL 주문이 FILLED 되는지 30초(기본) 동안 폴링.
+    TP/SL 주문이 FILLED 되는지 30초(기본) 동안 대기.
+    - stream(UserDataStream)이 연결돼 있으면 ORDER_TRADE_UPDATE 이벤트 큐에서 블로킹 대기,
+      스트림이 끊기면 남은 시간 동안 get_order 폴링으로 대체
     - TP/SL 중 하나가 FILLED 되면: {"reason":"TP"|"SL", "filled_order_id": int, "filled_order": dict, "timeout": False}
     - 타임아웃이면:               {"reason":"IDLE", "filled_order_id": None, "filled_order": None, "timeout": True}
     """
+    watch = []
+    if tp_order_id: watch.append(("TP", tp_order_id))
+    if sl_order_id: watch.append(("SL", sl_order_id))
 
+    end_t = clock.time() + timeout_sec
 
+    if stream is not None and stream.connected:
+        hit = _wait_protective_on_stream(stream, symbol, watch, end_t)
+        if hit is not None:
+            return hit
+
+    return run_sync(_poll_protective_async(symbol, watch, end_t, poll_sec))
+
+async def wait_protective_or_timeout_async(symbol: str, tp_order_id: int | None, sl_order_id: int | None,
+                                           timeout_sec: int = 30, poll_sec: float = 0.5, stream=None):
+    """wait_protective_or_timeout의 async 버전 (스트림 대기는 스레드에서)"""
     watch = []
     if tp_order_id: watch.append(("TP", tp_order_id))
     if sl_order_id: watch.append(("SL", sl_order_id))
 
-    end_t = time.time() + timeout_sec
-    last = {}
-    while time.time() < end_t:
-        for tag, oid in watch:
-            try:
-                od = um.get_order(symbol=symbol, orderId=oid)
-                last[(tag, oid)] = od
-                if od.get("status") == "FILLED":
-                    return {"reason": tag, "filled_order_id": oid, "filled_order": od, "timeout": False}
-            except Exception:
-                pass
-        time.sleep(poll_sec)
+    end_t = clock.time() + timeout_sec
+
+    if stream is not None and stream.connected:
+        hit = await asyncio.to_thread(_wait_protective_on_stream, stream, symbol, watch, end_t)
+        if hit is not None:
+            return hit
+
+    return await _poll_protective_async(symbol, watch, end_t, poll_sec)
+
+async def _poll_protective_async(symbol: str, watch, end_t: float, poll_sec: float):
+    """TP/SL get_order를 동시에 폴링"""
+    while clock.time() < end_t:
+        ods = await asyncio.gather(*(aum().get_order(symbol=symbol, orderId=oid) for _, oid in watch),
+                                   return_exceptions=True)
+        for (tag, oid), od in zip(watch, ods):
+            account_state.on_order(od)
+            if isinstance(od, dict) and od.get("status") == "FILLED":
+                return {"reason": tag, "filled_order_id": oid, "filled_order": od, "timeout": False}
+        await aio_sleep(poll_sec)
 
     return {"reason": "IDLE", "filled_order_id": None, "filled_order": None, "timeout": True}
 
-def force_close_on_timeout(symbol: str):
+def _wait_protective_on_stream(stream, symbol: str, watch, end_t: float):
+    """
+    스트림 이벤트로 symbol의 TP/SL 체결 대기 (다른 심볼의 같은 orderId는 무시).
+    체결 시 결과 dict, 스트림 끊김/타임아웃 시 None (호출측이 REST로 마무리)
+    """
+    from infra.user_stream import STREAM_CLOSED
+
+    q = stream.subscribe()
+    try:
+        # 구독 이전에 이미 체결된 경우
+        for tag, oid in watch:
+            od = stream.order(symbol, oid)
+            if od and od.get("status") == "FILLED":
+                return {"reason": tag, "filled_order_id": oid, "filled_order": od, "timeout": False}
+
+        ids = {int(oid): tag for tag, oid in watch}
+        while True:
+            remain = end_t - clock.time()
+            if remain <= 0:
+                return None
+            try:
+                evt = q.get(timeout=remain)
+            except Exception:  # queue.Empty
+                return None
+            if evt.get("e") == STREAM_CLOSED:
+                return None
+            if evt.get("e") != "ORDER_TRADE_UPDATE":
+                continue
+            o = evt["o"]
+            if o.get("s") != symbol:
+                continue
+            oid = int(o["i"])
+            if oid in ids and o.get("X") == "FILLED":
+                return {"reason": ids[oid], "filled_order_id": oid,
+                        "filled_order": stream.order(symbol, oid), "timeout": False}
+    finally:
+        stream.unsubscribe(q)
+
+def force_close_on_timeout(symbol: str, order_ids: list[int] | None = None):
     """
-    타임아웃 시: 보호주문 전부 취소 → 포지션 전량 시장가 청산.
+    타임아웃 시: 보호주문 전부 취소 + 포지션 전량 시장가 청산.
+    order_ids: 취소할 TP/SL id (주면 미체결 목록 조회 생략)
     반환: {"close_order_id": int|None, "close_resp": dict|None}
     """
-    _ = cancel_protective_orders(symbol)
-    res = close_position_market(symbol)
+    return run_sync(force_close_on_timeout_async(symbol, order_ids))
+
+async def force_close_on_timeout_async(symbol: str, order_ids: list[int] | None = None):
+    """
+    force_close_on_timeout의 async 버전.
+    청산은 reduceOnly라 보호주문 취소와 동시에 보내도 포지션을 반대로 열지 않는다
+    """
+    _, res = await asyncio.gather(cancel_protective_orders_async(symbol, order_ids),
+                                  close_position_market_async(symbol))
     close_resp = res.get("close_resp")
     return {
         "close_order_id": (close_resp.get("orderId") if close_resp else None),
@@ -330,17 +553,41 @@ def get_limit_price_from_orderbook(symbol: str, side: str, depth_limit: int = 5,
         ※ TIF는 GTX(Post Only)를 권장(즉시 체결 방지)
     반환: 라운딩된 price(float)
     """
-    from infra.client import um
-    from trading.precision import get_rounders
+    local = _local_book_price(symbol, side, maker_mode, price_offset_ticks)
+    if local is not None:
+        return local
+    ob = um.depth(symbol=symbol, limit=depth_limit)  # {"bids":[[price,qty],...], "asks":[[price,qty],...]}
+    return limit_price_from_book(symbol, ob, side, maker_mode, price_offset_ticks)
+
+async def get_limit_price_from_orderbook_async(symbol: str, side: str, depth_limit: int = 5,
+                                               maker_mode: bool = False, price_offset_ticks: int = 1):
+    """get_limit_price_from_orderbook의 async 버전"""
+    await prefetch_filters_async(symbol)
+    local = _local_book_price(symbol, side, maker_mode, price_offset_ticks)
+    if local is not None:
+        return local
+    ob = await aum().depth(symbol=symbol, limit=depth_limit)
+    return limit_price_from_book(symbol, ob, side, maker_mode, price_offset_ticks)
+
+def _local_book_price(symbol: str, side: str, maker_mode: bool, price_offset_ticks: int):
+    """
+    로컬 호가창(LocalOrderBook)이 동기화돼 있으면 REST 없이 주문가 계산, 아니면 None.
+    maker: BUY→최고 bid - n tick, SELL→최저 ask + n tick / 테이커: BUY→최저 ask, SELL→최고 bid
+    """
+    from infra.order_book import get_order_book
 
+    book = get_order_book(symbol)
+    if book is None or not book.is_fresh():
+        return None
     side_u = side.upper()
-    ob = um.depth(symbol=symbol, limit=depth_limit)  # {"bids":[[price,qty],...], "asks":[[price,qty],...]}
+    if maker_mode:
+        return book.price_ticks_away(side_u, price_offset_ticks)
+    return book.price_ticks_away("SELL" if side_u == "BUY" else "BUY", 0)
 
-    # tickSize 추출
-    ex = um.exchange_info()
-    s = next(x for x in ex["symbols"] if x["symbol"] == symbol)
-    pricef = next(f for f in s["filters"] if f["filterType"] == "PRICE_FILTER")
-    tick_size = float(pricef["tickSize"])
+def limit_price_from_book(symbol: str, ob: dict, side: str, maker_mode: bool, price_offset_ticks: int):
+    """depth 응답 → 라운딩된 LIMIT 주문가"""
+    side_u = side.upper()
+    tick_size = get_tick_size(symbol)
 
     if side_u == "BUY":
         if maker_mode:
@@ -370,3 +617,16 @@ def get_limit_price_from_orderbook(symbol: str, side: str, depth_limit: int = 5,
     _, round_price, _ = get_rounders(symbol)
     return round_price(raw_price)
 
+def prepare_entry(symbol: str, side: str = "BUY", maker_mode: bool = True, price_offset_ticks: int = 1):
+    """진입 전 필요한 값(가용 잔고, 호가 기반 주문가, 최소 명목가)을 한 번에. 반환: (balance, price, min_notional)"""
+    return run_sync(prepare_entry_async(symbol, side, maker_mode, price_offset_ticks))
+
+async def prepare_entry_async(symbol: str, side: str = "BUY", maker_mode: bool = True,
+                              price_offset_ticks: int = 1):
+    """prepare_entry의 async 버전: 세 요청을 동시에 전송"""
+    return tuple(await asyncio.gather(
+        get_available_balance_async("USDT"),
+        get_limit_price_from_orderbook_async(symbol, side=side, maker_mode=maker_mode,
+                                             price_offset_ticks=price_offset_ticks),
+        asyncio.to_thread(get_min_notional, symbol),
+    ))
@@ -1,19 +1,103 @@
+import math
+import threading
+import time
+from dataclasses import dataclass
 from infra.client import um
 
-def _get_precisions(symbol: str):
-    """심볼의 tickSize/stepSize로 가격/수량 허용 소수점 자리(decimals) 계산"""
-    ex = um.exchange_info()
-    s = next(x for x in ex["symbols"] if x["symbol"] == symbol)
+# 필터 위반으로 거절될 때 돌아오는 Binance 에러 코드 (캐시 무효화 대상)
+#  -1111: precision 초과, -1013: filter failure, -4003/-4004: 수량 범위,
+#  -4014/-4029: tickSize, -4023/-4024: stepSize, -4164: 최소 명목가 미달
+FILTER_ERROR_CODES = {-1111, -1013, -4003, -4004, -4014, -4023, -4024, -4029, -4164}
+
+@dataclass(frozen=True)
+class SymbolFilter:
+    symbol: str
+    tick_size: float
+    step_size: float
+    min_qty: float
+    min_notional: float
+    price_dec: int
+    qty_dec: int
+
+def _decimals(x: float) -> int:
+    txt = f"{x:.16f}".rstrip("0").rstrip(".")
+    return len(txt.split(".")[1]) if "." in txt else 0
+
+def _parse_symbol(s: dict) -> SymbolFilter:
     pricef = next(f for f in s["filters"] if f["filterType"] == "PRICE_FILTER")
     lot    = next(f for f in s["filters"] if f["filterType"] in ("MARKET_LOT_SIZE", "LOT_SIZE"))
-
-    def _decimals(x: float):
-        txt = f"{x:.16f}".rstrip("0").rstrip(".")
-        return len(txt.split(".")[1]) if "." in txt else 0
+    nf     = next((f for f in s["filters"] if f["filterType"] in ("MIN_NOTIONAL", "NOTIONAL")), {})
 
     tick_size = float(pricef["tickSize"])
     step_size = float(lot["stepSize"])
-    return _decimals(tick_size), _decimals(step_size)
+    return SymbolFilter(
+        symbol=s["symbol"],
+        tick_size=tick_size,
+        step_size=step_size,
+        min_qty=float(lot["minQty"]),
+        min_notional=float(nf.get("notional") or nf.get("minNotional") or 0.0),
+        price_dec=_decimals(tick_size),
+        qty_dec=_decimals(step_size),
+    )
+
+class SymbolFilters:
+    """
+    exchange_info 기반 심볼 필터(tickSize/stepSize/minQty/minNotional) 캐시.
+    - 한 번의 exchange_info 호출로 전체 심볼을 적재
+    - ttl_sec 경과 또는 invalidate() 호출(필터 위반 거절 등) 시 재조회
+    """
+    def __init__(self, client=None, ttl_sec: float = 3600.0):
+        self._client = client
+        self.ttl_sec = ttl_sec
+        self._filters: dict[str, SymbolFilter] = {}
+        self._loaded_at: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        client = self._client or um
+        ex = client.exchange_info()
+        now = time.monotonic()
+        for s in ex.get("symbols", []):
+            try:
+                self._filters[s["symbol"]] = _parse_symbol(s)
+                self._loaded_at[s["symbol"]] = now
+            except StopIteration:
+                continue  # 필터 정보가 불완전한 심볼은 건너뜀
+
+    def get(self, symbol: str) -> SymbolFilter:
+        with self._lock:
+            loaded = self._loaded_at.get(symbol)
+            if loaded is None or time.monotonic() - loaded > self.ttl_sec:
+                self._load()
+            try:
+                return self._filters[symbol]
+            except KeyError:
+                raise ValueError(f"unknown symbol: {symbol}") from None
+
+    def is_fresh(self, symbol: str) -> bool:
+        """캐시에 있고 ttl 이내면 True (get()이 REST 없이 바로 반환)"""
+        loaded = self._loaded_at.get(symbol)
+        return loaded is not None and time.monotonic() - loaded <= self.ttl_sec
+
+    def invalidate(self, symbol: str | None = None):
+        """다음 get()에서 재조회하도록 캐시 무효화 (symbol=None이면 전체)"""
+        with self._lock:
+            if symbol is None:
+                self._loaded_at.clear()
+            else:
+                self._loaded_at.pop(symbol, None)
+
+def is_filter_error(e: Exception) -> bool:
+    """주문 거절 사유가 심볼 필터 위반인지 여부"""
+    return getattr(e, "error_code", None) in FILTER_ERROR_CODES
+
+# 모든 모듈이 공유하는 필터 레지스트리
+symbol_filters = SymbolFilters()
+
+def _get_precisions(symbol: str):
+    """심볼의 tickSize/stepSize로 가격/수량 허용 소수점 자리(decimals) 계산"""
+    f = symbol_filters.get(symbol)
+    return f.price_dec, f.qty_dec
 
 def _fmt(v: float, decimals: int) -> str:
     """정확히 허용 자리수로 포맷"""
@@ -24,19 +108,12 @@ def get_rounders(symbol: str):
     지정 심볼의 수량/가격 라운딩 + 최소조건 검사 유틸 반환
     반환: (round_qty, round_price, check_minimums)
     """
-    ex = um.exchange_info()
-    s = next(x for x in ex["symbols"] if x["symbol"] == symbol)
-
-    lot = next(f for f in s["filters"] if f["filterType"] in ("MARKET_LOT_SIZE", "LOT_SIZE"))
-    pricef = next(f for f in s["filters"] if f["filterType"] == "PRICE_FILTER")
-    notionalf = next(f for f in s["filters"] if f["filterType"] in ("MIN_NOTIONAL", "NOTIONAL"))
+    f = symbol_filters.get(symbol)
+    step_size    = f.step_size
+    min_qty      = f.min_qty
+    tick_size    = f.tick_size
+    min_notional = f.min_notional
 
-    step_size    = float(lot["stepSize"])
-    min_qty      = float(lot["minQty"])
-    tick_size    = float(pricef["tickSize"])
-    min_notional = float(notionalf.get("notional") or notionalf.get("minNotional") or 0.0)
-
-    import math
     def round_qty(q: float) -> float:
         return math.floor(q / step_size) * step_size if step_size > 0 else q
 
@@ -56,7 +133,8 @@ def get_rounders(symbol: str):
 
 def get_min_notional(symbol: str) -> float:
     """심볼의 (MIN_)NOTIONAL을 가져온다."""
-    ex = um.exchange_info()
-    s = next(x for x in ex["symbols"] if x["symbol"] == symbol)
-    nf = next(f for f in s["filters"] if f["filterType"] in ("MIN_NOTIONAL", "NOTIONAL"))
-    return float(nf.get("notional") or nf.get("minNotional") or 0.0)
\ No newline at end of file
+    return symbol_filters.get(symbol).min_notional
+
+def get_tick_size(symbol: str) -> float:
+    """심볼의 PRICE_FILTER tickSize"""
+    return symbol_filters.get(symbol).tick_size